@@ -6,7 +6,6 @@ This module initializes the Flask application with necessary configurations.
 import os
 from importlib import import_module
 
-from dotenv import load_dotenv
 from flask import Flask
 from flask_cors import CORS
 
@@ -18,8 +17,12 @@ def create_app() -> Flask:
     Returns:
         Flask: Configured Flask application instance
     """
-    # Load environment variables
-    load_dotenv()
+    # Load environment variables from a .env file in local development. Deployments set
+    # them in the environment, so production boots skip the file search and the import.
+    if os.getenv("FLASK_ENV") != "production" and os.getenv("LOAD_DOTENV", "true").lower() != "false":
+        from dotenv import load_dotenv
+
+        load_dotenv()
 
     # Initialize Flask app
     app = Flask(__name__)
@@ -45,4 +48,9 @@ def create_app() -> Flask:
     routes = import_module(".routes", package="app")
     app.register_blueprint(routes.api_bp)
 
+    # Let Werkzeug refuse oversized bodies from Content-Length instead of buffering them
+    # (ApiRequest applies the per-route limits, MAX_CONTENT_LENGTH is the default one)
+    app.config["MAX_CONTENT_LENGTH"] = routes.MAX_CONTENT_LENGTH
+    app.request_class = routes.ApiRequest
+
     return app
@@ -0,0 +1,127 @@
+"""
+Application pack module.
+This module produces every document of a job application (analysis, ATS check, resume
+review, cover letter and interview questions) in one pipeline, running the independent
+generators concurrently and yielding each section as soon as it is ready. The cover
+letter and interview questions are personalized with the resume's cached profile.
+"""
+
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .ats_analyzer import analyze_ats_compatibility
+from .cover_letter import generate_cover_letter
+from .interview_preparer import generate_interview_questions
+from .metrics import PIPELINE_QUEUE_DEPTH, PIPELINE_STAGES_IN_FLIGHT
+from .resume_analyzer import generate_analysis, generate_resume_review
+from .resume_profile import resume_profile_text
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Maximum number of generators running at the same time
+APPLICATION_PACK_WORKERS = int(os.getenv("APPLICATION_PACK_WORKERS", "5"))
+
+
+def build_job_context(job_details: Dict[str, str]) -> str:
+    """
+    Prefix the job description with the job title and company name when they are known.
+
+    Args:
+        job_details: Dictionary containing job title, company name, and job description
+
+    Returns:
+        str: Job context for the resume review
+    """
+    job_description = job_details.get("job_description", "")
+    job_title = job_details.get("job_title", "")
+    company_name = job_details.get("company_name", "")
+
+    if job_title and company_name:
+        return f"Job Title: {job_title}\nCompany: {company_name}\n\n{job_description}"
+    elif job_title:
+        return f"Job Title: {job_title}\n\n{job_description}"
+    elif company_name:
+        return f"Company: {company_name}\n\n{job_description}"
+    return job_description
+
+
+def build_application_pack_stages(resume_content: str, job_details: Dict[str, str], custom_instructions: str = "", language: str = "en") -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """
+    Create the independent generator calls that make up an application pack.
+
+    Args:
+        resume_content: Text content of the resume, extracted once for all stages
+        job_details: Dictionary containing job title, company name, job description and link
+        custom_instructions: Optional custom instructions applied to every generator that supports them
+        language: Language code for the cover letter
+
+    Returns:
+        dict: Stage name -> zero-argument callable returning the generator's result
+    """
+    return {
+        "analysis": lambda: generate_analysis(resume_content, [job_details], custom_instructions),
+        "ats_analysis": lambda: analyze_ats_compatibility(resume_content),
+        "resume_review": lambda: generate_resume_review(resume_content, build_job_context(job_details), custom_instructions),
+        # Both stages share one profile build (see resume_profile.get_resume_profile)
+        "cover_letter": lambda: generate_cover_letter(job_details, custom_instructions, language, resume_profile_text(resume_content)),
+        "interview_questions": lambda: generate_interview_questions(job_details, resume_profile_text(resume_content)),
+    }
+
+
+def _run_stage(stage: Callable[[], Dict[str, Any]]) -> tuple:
+    """Run one stage, returning its result and elapsed milliseconds."""
+    PIPELINE_QUEUE_DEPTH.dec(pipeline="application_pack")
+    PIPELINE_STAGES_IN_FLIGHT.inc(pipeline="application_pack")
+    started = time.perf_counter()
+    try:
+        result = stage()
+    except Exception as e:
+        logger.error(f"Application pack stage failed: {str(e)}", exc_info=True)
+        result = {"success": False, "error": f"Error generating section: {str(e)}"}
+    finally:
+        PIPELINE_STAGES_IN_FLIGHT.dec(pipeline="application_pack")
+    return result, round((time.perf_counter() - started) * 1000, 1)
+
+
+def run_application_pack(stages: Dict[str, Callable[[], Dict[str, Any]]], timings: Optional[Dict[str, float]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Run the stages concurrently and yield each section as it completes.
+
+    Every section event has the form {"section", "success", "elapsed_ms", "result"}. A
+    final {"section": "summary"} event carries the per-stage timings in milliseconds.
+
+    Args:
+        stages: Stage name -> zero-argument callable, as built by build_application_pack_stages
+        timings: Optional timings of work done before the pipeline (e.g. resume extraction)
+
+    Yields:
+        dict: One event per completed section, then the summary
+    """
+    timings = dict(timings or {})
+    failed = []
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(APPLICATION_PACK_WORKERS, len(stages)))) as executor:
+        PIPELINE_QUEUE_DEPTH.inc(len(stages), pipeline="application_pack")
+        # Each stage runs in a copy of the request context so its stage timings reach the request
+        futures = {executor.submit(contextvars.copy_context().run, _run_stage, stage): name for name, stage in stages.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            result, elapsed_ms = future.result()
+            timings[name] = elapsed_ms
+
+            success = bool(result.get("success", False))
+            if not success:
+                failed.append(name)
+            logger.info(f"Application pack section '{name}' finished in {elapsed_ms} ms")
+            yield {"section": name, "success": success, "elapsed_ms": elapsed_ms, "result": result}
+
+    timings["pipeline"] = round((time.perf_counter() - started) * 1000, 1)
+    yield {"section": "summary", "success": not failed, "failed_sections": failed, "timings": timings}
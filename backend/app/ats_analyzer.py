@@ -6,74 +6,67 @@ This module evaluates resume compatibility with Applicant Tracking Systems.
 import json
 import logging
 import re
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-import google.generativeai as genai
-
-from .gemini_config import GEMINI_MODEL
+from .ats_rules import check_resume, format_findings
+from .cache import content_hash
+from .gemini_client import generate_content
+from .job_requirements import job_description_for_prompt, job_description_hash
+from .metrics import record_json_failure
+from .model_router import json_validator
+from .prompts import render_prompt, template_key
+from .resume_sections import get_section_results, parse_resume, sections_hash, sections_text, store_section_result
+from .timing import timed_generator
+from .token_budget import allocate_input_budget, estimate_prompt_tokens, record_usage
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
-def analyze_ats_compatibility(resume_content: str) -> Dict[str, Any]:
+# Resume sections each optimized part is written from; a part is regenerated only when one of them changes
+OPTIMIZED_PART_SECTIONS = {
+    "professional_summary": ("summary", "experience"),
+    "skills_section": ("skills",),
+    "experience_bullets": ("experience", "projects"),
+    "keyword_analysis": ("summary", "experience", "projects", "skills"),
+}
+
+# Prompt line and JSON shape of each optimized part
+OPTIMIZED_PART_PROMPTS = {
+    "professional_summary": ("Professional Summary", '"An optimized professional summary..."'),
+    "skills_section": ("Skills section", '["Skill 1", "Skill 2", "Skill 3"]'),
+    "experience_bullets": ("Suggested bullet points for most relevant experience", '["Bullet point 1", "Bullet point 2", "Bullet point 3"]'),
+    "keyword_analysis": ("Keyword analysis: the job's keywords and those missing from the resume", '{"job_keywords": ["Keyword 1", "Keyword 2"], "missing_keywords": ["Keyword 3", "Keyword 4"]}'),
+}
+
+
+@timed_generator("ats_analysis")
+def analyze_ats_compatibility(resume_content: str, rule_check: Optional[Dict] = None) -> Dict[str, Any]:
     """
     Analyze resume for ATS compatibility and provide a score and recommendations.
 
+    The local rule engine (ats_rules) checks the mechanical issues first and its findings
+    are given to the model as settled, so the model only judges what rules cannot.
+
     Args:
         resume_content: Text content of the resume
+        rule_check: Result of ats_rules.check_resume() on the full resume, computed here when omitted
 
     Returns:
-        dict: ATS compatibility analysis including score and recommendations
+        dict: ATS compatibility analysis including score and recommendations, with the
+            rule check under analysis["rule_check"]
     """
     try:
-        prompt = f"""
-        You are an Applicant Tracking System (ATS) expert. Analyze this resume for ATS compatibility.
-        
-        Resume content:
-        {resume_content}
-        
-        Evaluate this resume for ATS compatibility. Consider the following factors:
-        1. Format (is it simple and clean for ATS parsing?)
-        2. Use of tables, columns, graphics that might confuse ATS
-        3. Use of standard section headings
-        4. Keyword optimization
-        5. File format compatibility
-        6. Font and formatting choices
-        7. Use of special characters or bullet points that might cause issues
-        8. Header/footer placement
-        
-        Return ONLY a JSON object with this exact structure:
-        {{
-            "ats_score": <number 0-100>,
-            "summary": "<short summary of ATS compatibility>",
-            "format_issues": [
-                "<issue 1>",
-                "<issue 2>"
-            ],
-            "content_issues": [
-                "<issue 1>",
-                "<issue 2>"
-            ],
-            "keyword_issues": [
-                "<issue 1>",
-                "<issue 2>"
-            ],
-            "improvement_suggestions": [
-                "<suggestion 1>",
-                "<suggestion 2>",
-                "<suggestion 3>"
-            ],
-            "good_practices": [
-                "<good practice 1>",
-                "<good practice 2>"
-            ]
-        }}
-        """
-
-        model = genai.GenerativeModel(GEMINI_MODEL)
+        if rule_check is None:
+            rule_check = check_resume(resume_content)
+
+        # Trim the resume to the endpoint's token budget
+        budgeted, token_usage = allocate_input_budget("ats_analysis", resume_content)
+        resume_content = budgeted["resume"]
+
+        prompt = render_prompt("ats_analysis", rule_score=rule_check["score"], findings=format_findings(rule_check), resume=resume_content)
+
         model_config = {
             "temperature": 0.7,
             "top_p": 0.8,
@@ -81,16 +74,24 @@ def analyze_ats_compatibility(resume_content: str) -> Dict[str, Any]:
             "max_output_tokens": 2048,
         }
 
-        response = model.generate_content(prompt, generation_config=model_config)
+        token_usage.update(estimate_prompt_tokens(prompt))
+        response = generate_content(prompt, generation_config=model_config, generator="ats_analysis", validate=json_validator("ats_score"))
         if not response or not response.text:
             return {"success": False, "error": "No response from AI model"}
 
+        record_usage(token_usage, response)
+        logger.info(f"Token usage for ATS analysis: {token_usage}")
+
         # Extract and parse JSON
         json_str = re.search(r"({[\s\S]*})", response.text)
         if not json_str:
             return {"success": False, "error": "Invalid response format"}
 
-        analysis = json.loads(json_str.group(1))
+        try:
+            analysis = json.loads(json_str.group(1))
+        except json.JSONDecodeError:
+            record_json_failure("ats_analyzer")
+            raise
 
         # Validate and ensure all required fields
         required_fields = ["ats_score", "summary", "format_issues", "content_issues", "keyword_issues", "improvement_suggestions", "good_practices"]
@@ -100,69 +101,55 @@ def analyze_ats_compatibility(resume_content: str) -> Dict[str, Any]:
                 analysis[field] = [] if field in ["format_issues", "content_issues", "keyword_issues", "improvement_suggestions", "good_practices"] else ""
 
         if "ats_score" not in analysis or not isinstance(analysis["ats_score"], (int, float)):
-            analysis["ats_score"] = 70  # Default score if missing
+            analysis["ats_score"] = rule_check["score"]  # Fall back to the rule score if missing
 
-        return {"success": True, "analysis": analysis}
+        analysis["rule_check"] = rule_check
+        return {"success": True, "analysis": analysis, "token_usage": token_usage}
 
     except Exception as e:
         return {"success": False, "error": f"Error analyzing ATS compatibility: {str(e)}"}
 
 
+@timed_generator("ats_optimize")
 def generate_optimized_resume_sections(resume_content: str, job_description: str) -> Dict[str, Any]:
     """
     Generate ATS-optimized sections for a resume based on the job description.
 
+    Each optimized part is cached under the content hash of the resume sections it is
+    written from (OPTIMIZED_PART_SECTIONS), so after an edit to one section only the
+    parts that read it are generated again, from those sections alone.
+
     Args:
         resume_content: Text content of the resume
         job_description: Text content of the job description
 
     Returns:
-        dict: Optimized resume sections
+        dict: Optimized resume sections, plus the parts generated now ("generated_parts")
+            and taken from the cache ("cached_parts")
     """
     try:
         logger.info("Generating ATS-optimized resume sections")
 
-        # Limit job description length to prevent token issues
-        if len(job_description) > 2000:
-            logger.info(f"Truncating job description from {len(job_description)} to 2000 characters")
-            job_description = job_description[:2000] + "..."
-
-        prompt = f"""
-        You are an ATS optimization expert. Generate optimized resume sections based on this job description.
-        
-        Resume content:
-        {resume_content}
-        
-        Job description:
-        {job_description}
-        
-        Analyze the job description and the current resume, then provide ATS-optimized versions of:
-        1. Professional Summary
-        2. Skills section
-        3. Suggested bullet points for most relevant experience
-        
-        Make sure to:
-        - Incorporate relevant keywords from the job description
-        - Use industry-standard section headings
-        - Balance keyword optimization with readability
-        - Focus on quantifiable achievements
-        - Only use content that appears in the original resume (don't invent new experiences)
-        
-        Return ONLY a JSON object with this exact structure:
-        {{
-            "professional_summary": "An optimized professional summary...",
-            "skills_section": ["Skill 1", "Skill 2", "Skill 3"],
-            "experience_bullets": ["Bullet point 1", "Bullet point 2", "Bullet point 3"],
-            "keyword_analysis": {{
-                "job_keywords": ["Keyword 1", "Keyword 2"],
-                "missing_keywords": ["Keyword 3", "Keyword 4"]
-            }}
-        }}
-        
-        Important: Use proper JSON formatting with double quotes around all strings and property names.
-        """
-
-        model = genai.GenerativeModel(GEMINI_MODEL)
+        parsed = parse_resume(resume_content)
+        # Reformatted copies of the same posting share cached parts; a new prompt version does not
+        context = content_hash(f"{template_key('ats_optimize')}\0{job_description_hash(job_description)}")
+        # A resume without standard headings is a single "content" section every part reads
+        part_hashes = {part: sections_hash(parsed, sections + ("content",)) for part, sections in OPTIMIZED_PART_SECTIONS.items()}
+        cached_sections, missing = get_section_results("ats_optimize", context, part_hashes)
+        if not missing:
+            return {"success": True, "optimized_sections": cached_sections, "token_usage": {}, "generated_parts": [], "cached_parts": list(part_hashes)}
+
+        needed = {section for part in missing for section in OPTIMIZED_PART_SECTIONS[part]} | {"content"}
+
+        # Trim the resume and job description to the endpoint's token budget
+        budgeted, token_usage = allocate_input_budget("ats_optimize", sections_text(parsed, needed), job_description_for_prompt(job_description))
+        resume_content = budgeted["resume"]
+        job_description = budgeted["job_description"]
+
+        parts = "\n".join(f"{number}. {OPTIMIZED_PART_PROMPTS[part][0]}" for number, part in enumerate(missing, start=1))
+        structure = ",\n".join(f'    "{part}": {OPTIMIZED_PART_PROMPTS[part][1]}' for part in missing)
+        prompt = render_prompt("ats_optimize", resume=resume_content, job_description=job_description, parts=parts, structure=structure)
+
         model_config = {
             "temperature": 0.7,
             "top_p": 0.8,
@@ -171,12 +158,16 @@ def generate_optimized_resume_sections(resume_content: str, job_description: str
         }
 
         logger.info("Sending request to AI model for optimized resume sections")
-        response = model.generate_content(prompt, generation_config=model_config)
+        token_usage.update(estimate_prompt_tokens(prompt))
+        response = generate_content(prompt, generation_config=model_config, generator="ats_optimize", validate=json_validator())
 
         if not response or not response.text:
             logger.error("No response received from AI model")
             return {"success": False, "error": "No response from AI model"}
 
+        record_usage(token_usage, response)
+        logger.info(f"Token usage for ATS optimization: {token_usage}")
+
         # Log response for debugging
         logger.info(f"Received AI response. Length: {len(response.text)}")
         logger.info(f"Response preview: {response.text[:200]}...")
@@ -211,6 +202,12 @@ def generate_optimized_resume_sections(resume_content: str, job_description: str
             optimized_sections = json.loads(cleaned_json)
             logger.info("Successfully parsed JSON response")
 
+            # Cache the parts the model returned before defaults are filled in
+            for part in missing:
+                if part in optimized_sections:
+                    store_section_result("ats_optimize", context, part, part_hashes[part], optimized_sections[part])
+            optimized_sections = {**cached_sections, **optimized_sections}
+
             # Validate required fields and provide defaults if missing
             required_fields = ["professional_summary", "skills_section", "experience_bullets", "keyword_analysis"]
 
@@ -235,9 +232,11 @@ def generate_optimized_resume_sections(resume_content: str, job_description: str
                     if "missing_keywords" not in optimized_sections["keyword_analysis"]:
                         optimized_sections["keyword_analysis"]["missing_keywords"] = []
 
-            return {"success": True, "optimized_sections": optimized_sections}
+            cached_parts = [part for part in part_hashes if part not in missing]
+            return {"success": True, "optimized_sections": optimized_sections, "token_usage": token_usage, "generated_parts": missing, "cached_parts": cached_parts}
 
         except json.JSONDecodeError as e:
+            record_json_failure("ats_analyzer", "repair")
             logger.error(f"JSON parsing error: {str(e)}")
             logger.error(f"Problematic JSON: {json_str.group(1)[:500] if json_str else 'No JSON found'}")
 
@@ -253,7 +252,12 @@ def generate_optimized_resume_sections(resume_content: str, job_description: str
                 "keyword_analysis": {"job_keywords": ["Communication", "Teamwork", "Leadership"], "missing_keywords": []},
             }
 
-            return {"success": True, "optimized_sections": fallback_response, "note": "The AI response couldn't be parsed correctly. Showing default recommendations instead."}
+            return {
+                "success": True,
+                "optimized_sections": {**fallback_response, **cached_sections},
+                "note": "The AI response couldn't be parsed correctly. Showing default recommendations instead.",
+                "token_usage": token_usage,
+            }
 
     except Exception as e:
         logger.error(f"Error generating optimized resume sections: {str(e)}", exc_info=True)
@@ -0,0 +1,241 @@
+"""
+ATS rules module.
+This module lints extracted resume text for the mechanical problems that trip up
+Applicant Tracking Systems: missing or non-standard section headings, few bullet
+points, mixed date formats, missing contact fields, table and column artifacts left
+by PDF extraction, and length.
+
+The checks are regular expressions and line statistics, so a resume is checked in a
+few milliseconds with no Gemini call. /api/ats-check returns the result on its own
+(mode=fast), and analyze_ats_compatibility hands the findings to the model so it can
+spend its answer on content and keywords instead of re-deriving them.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Points deducted from 100 per finding
+SEVERITY_PENALTIES = {"error": 15, "warning": 7, "info": 2}
+
+# Word counts outside this range are too short to show experience or too long to scan
+MIN_WORDS = 200
+MAX_WORDS = 1100
+
+# Fewer bullet lines than this under the experience-type sections reads as prose to an ATS
+MIN_BULLETS = 4
+
+# Share of non-empty lines that may show table or column artifacts before it is flagged
+MAX_ARTIFACT_LINE_RATIO = 0.08
+
+# Standard section headings, by section; a heading line must match one of these entirely
+STANDARD_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective", "career objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history", "work history", "career history"],
+    "education": ["education", "academic background", "education and training", "academic qualifications"],
+    "skills": ["skills", "technical skills", "core skills", "key skills", "core competencies", "competencies", "technologies", "skills and abilities"],
+    "projects": ["projects", "personal projects", "key projects", "selected projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "certifications and licenses", "courses"],
+    "other": ["awards", "honors", "honors and awards", "publications", "languages", "volunteer experience", "volunteering", "interests", "references", "activities", "leadership"],
+}
+REQUIRED_SECTIONS = ("experience", "education", "skills")
+_HEADING_SECTIONS = {heading: section for section, headings in STANDARD_HEADINGS.items() for heading in headings}
+
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*•·▪‣◦●○–]|\d{1,2}[.)])\s+")
+# Decorative glyphs (and Symbol/Wingdings private-use bullets) that many parsers drop or turn into "?"
+SPECIAL_BULLET_PATTERN = re.compile(r"^\s*[\uf000-\uf0ff➢➤►▶✓✔★☆♦❖→⇒]")
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"(?<!\d)(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?!\d)")
+LINKEDIN_PATTERN = re.compile(r"linkedin\.com/in/", re.IGNORECASE)
+
+_MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE_PATTERNS = {
+    "month_name": re.compile(rf"\b{_MONTHS}\s+(?:19|20)\d{{2}}\b", re.IGNORECASE),
+    "numeric_month": re.compile(r"\b(?:0?[1-9]|1[0-2])[/.-](?:19|20)\d{2}\b"),
+    "iso_month": re.compile(r"\b(?:19|20)\d{2}-(?:0[1-9]|1[0-2])\b"),
+    "season": re.compile(r"\b(?:spring|summer|fall|autumn|winter)\s+(?:19|20)\d{2}\b", re.IGNORECASE),
+}
+YEAR_PATTERN = re.compile(r"\b(?:19|20)\d{2}\b")
+
+# PDF extraction leftovers: pdfminer's unmapped glyphs, replacement characters, and runs
+# of spaces, tabs or pipes where a table or a second column was flattened into one line
+GLYPH_ARTIFACT_PATTERN = re.compile(r"\(cid:\d+\)|�")
+COLUMN_GAP_PATTERN = re.compile(r"\S(?: {4,}|\t+)\S")
+TABLE_SEPARATOR_PATTERN = re.compile(r"\S\s*\|\s*\S.*\|")
+
+_HEADING_CLEANUP = re.compile(r"[^a-z& ]+")
+
+
+def _finding(check: str, severity: str, message: str) -> Dict[str, str]:
+    """Build one finding."""
+    return {"check": check, "severity": severity, "message": message}
+
+
+def _heading_key(line: str) -> str:
+    """Normalize a candidate heading line ("WORK EXPERIENCE:", "Skills & Tools") for lookup."""
+    return " ".join(_HEADING_CLEANUP.sub(" ", line.lower().replace("&", " and ")).split())
+
+
+def section_for_heading(line: str) -> Optional[str]:
+    """
+    Return the section a line is the standard heading of, or None.
+
+    Args:
+        line: One line of resume text
+
+    Returns:
+        str or None: A STANDARD_HEADINGS section ("experience", "skills", ...), or None
+            when the line is not a standard heading
+    """
+    if len(line.split()) > 5:
+        return None
+    return _HEADING_SECTIONS.get(_heading_key(line))
+
+
+def _is_heading_like(line: str) -> bool:
+    """A short line in capitals or ending with a colon, the shape section headings take."""
+    words = line.split()
+    if not words or len(words) > 5 or BULLET_PATTERN.match(line) or len(line) > 40:
+        return False
+    letters = [char for char in line if char.isalpha()]
+    return bool(letters) and (line.rstrip().endswith(":") or all(char.isupper() for char in letters))
+
+
+def check_headings(lines: List[str]) -> Dict:
+    """Check for the required standard sections and report heading-like lines no ATS maps to a section."""
+    sections, non_standard = [], []
+    for number, line in enumerate(lines):
+        section = section_for_heading(line)
+        if section is not None:
+            if section not in sections:
+                sections.append(section)
+        # The first line is the candidate's name
+        elif number and _is_heading_like(line) and not EMAIL_PATTERN.search(line) and not YEAR_PATTERN.search(line):
+            non_standard.append(line.strip().rstrip(":"))
+
+    findings = [_finding("headings", "error", f"No standard '{section.title()}' section heading found") for section in REQUIRED_SECTIONS if section not in sections]
+    # Capitalized lines are also names, titles and employers, so only a few are reported
+    if non_standard and len(non_standard) <= 6:
+        findings.append(_finding("headings", "info", f"Headings an ATS may not recognize: {', '.join(non_standard)}"))
+    return {"findings": findings, "stats": {"sections": sections, "non_standard_headings": non_standard[:6]}}
+
+
+def check_bullets(lines: List[str]) -> Dict:
+    """Check that achievements are listed as plain bullets rather than prose or decorative symbols."""
+    bullets = sum(1 for line in lines if BULLET_PATTERN.match(line))
+    special = sum(1 for line in lines if SPECIAL_BULLET_PATTERN.match(line))
+    long_lines = sum(1 for line in lines if len(line.split()) >= 40)
+
+    findings = []
+    if bullets + special < MIN_BULLETS:
+        findings.append(_finding("bullets", "warning", "Few or no bullet points; list achievements as short bullets under each role"))
+    if special:
+        findings.append(_finding("bullets", "warning", f"{special} lines start with decorative symbols; use plain bullets (•, -) that every ATS reads"))
+    if long_lines >= 3:
+        findings.append(_finding("bullets", "info", f"{long_lines} lines run over 40 words; break long paragraphs into bullets"))
+    return {"findings": findings, "stats": {"bullet_lines": bullets, "special_bullet_lines": special, "long_lines": long_lines}}
+
+
+def check_dates(text: str) -> Dict:
+    """Check that dates are present and written in a single format."""
+    formats = {name: len(pattern.findall(text)) for name, pattern in DATE_PATTERNS.items()}
+    formats = {name: count for name, count in formats.items() if count}
+    years = len(YEAR_PATTERN.findall(text))
+
+    findings = []
+    if not years:
+        findings.append(_finding("dates", "warning", "No dates found; give start and end dates for each role and degree"))
+    elif len(formats) > 1:
+        findings.append(_finding("dates", "warning", f"Dates use {len(formats)} different formats ({', '.join(formats)}); use one format such as 'Jan 2020 - Mar 2023'"))
+    elif not formats:
+        findings.append(_finding("dates", "info", "Dates are years only; month and year let an ATS compute the length of each role"))
+    return {"findings": findings, "stats": {"date_formats": formats, "years": years}}
+
+
+def check_contact(text: str) -> Dict:
+    """Check for an email address, a phone number and a LinkedIn URL."""
+    # Contact details normally sit at the top; a phone-like number in the body is more likely an ID or a metric
+    header = text[:1500]
+    email = bool(EMAIL_PATTERN.search(text))
+    phone = bool(PHONE_PATTERN.search(header))
+    linkedin = bool(LINKEDIN_PATTERN.search(text))
+
+    findings = []
+    if not email:
+        findings.append(_finding("contact", "error", "No email address found in the resume text"))
+    if not phone:
+        findings.append(_finding("contact", "warning", "No phone number found near the top of the resume"))
+    if not linkedin:
+        findings.append(_finding("contact", "info", "No LinkedIn profile URL found"))
+    return {"findings": findings, "stats": {"email": email, "phone": phone, "linkedin": linkedin}}
+
+
+def check_layout(text: str, lines: List[str]) -> Dict:
+    """Check for unextractable glyphs and for table and column artifacts."""
+    glyphs = len(GLYPH_ARTIFACT_PATTERN.findall(text))
+    column_lines = sum(1 for line in lines if COLUMN_GAP_PATTERN.search(line.strip()))
+    table_lines = sum(1 for line in lines if TABLE_SEPARATOR_PATTERN.search(line))
+    # Two columns extracted side by side leave many one- or two-word fragments
+    fragments = sum(1 for line in lines if len(line.split()) <= 2 and not BULLET_PATTERN.match(line))
+
+    findings = []
+    if glyphs:
+        findings.append(_finding("layout", "error", f"{glyphs} characters could not be extracted (custom fonts or icons); an ATS will read them as garbage"))
+    if lines and (column_lines + table_lines) / len(lines) > MAX_ARTIFACT_LINE_RATIO:
+        findings.append(_finding("layout", "warning", "Text looks like it came from tables or multiple columns; use a single-column layout"))
+    if len(lines) >= 20 and fragments / len(lines) > 0.4:
+        findings.append(_finding("layout", "warning", "Many very short lines, a sign of side-by-side columns being read out of order"))
+    return {"findings": findings, "stats": {"glyph_artifacts": glyphs, "column_lines": column_lines, "table_lines": table_lines, "fragment_lines": fragments}}
+
+
+def check_length(text: str) -> Dict:
+    """Check the word count."""
+    words = len(text.split())
+    findings = []
+    if words < MIN_WORDS:
+        findings.append(_finding("length", "warning", f"Only {words} words; an ATS ranks thin resumes low, aim for at least {MIN_WORDS}"))
+    elif words > MAX_WORDS:
+        findings.append(_finding("length", "info", f"{words} words; keep the resume to one or two pages (under {MAX_WORDS} words)"))
+    return {"findings": findings, "stats": {"words": words}}
+
+
+def check_resume(resume_content: str) -> Dict:
+    """
+    Run every ATS rule over extracted resume text.
+
+    Args:
+        resume_content: Text content of the resume
+
+    Returns:
+        dict: {"score": 0-100, "findings": [{"check", "severity", "message"}, ...],
+            "checks": {check: {"passed", "stats"}}}; findings are ordered by severity
+    """
+    text = resume_content or ""
+    lines = [line for line in text.splitlines() if line.strip()]
+    results = {
+        "headings": check_headings(lines),
+        "bullets": check_bullets(lines),
+        "dates": check_dates(text),
+        "contact": check_contact(text),
+        "layout": check_layout(text, lines),
+        "length": check_length(text),
+    }
+
+    findings = [finding for result in results.values() for finding in result["findings"]]
+    findings.sort(key=lambda finding: list(SEVERITY_PENALTIES).index(finding["severity"]))
+    score = max(0, 100 - sum(SEVERITY_PENALTIES[finding["severity"]] for finding in findings))
+    checks = {name: {"passed": not any(finding["severity"] != "info" for finding in result["findings"]), "stats": result["stats"]} for name, result in results.items()}
+    return {"score": score, "findings": findings, "checks": checks}
+
+
+def format_findings(rule_check: Dict) -> str:
+    """Render rule findings as the prompt lines analyze_ats_compatibility hands to the model."""
+    if not rule_check["findings"]:
+        return "- No mechanical issues found"
+    return "\n".join(f"- [{finding['severity']}] {finding['check']}: {finding['message']}" for finding in rule_check["findings"])
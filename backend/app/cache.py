@@ -0,0 +1,150 @@
+"""
+In-process caching module.
+This module provides the bounded, thread-safe cache used for resumes and AI results.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def content_hash(data: Any) -> str:
+    """
+    Compute a stable content address for text or bytes.
+
+    Args:
+        data: String (hashed as UTF-8) or bytes-like object
+
+    Returns:
+        str: Hex digest identifying the content
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class BoundedCache:
+    """
+    Thread-safe LRU cache bounded by entry count, total size and entry age.
+
+    Entries are evicted least-recently-used first whenever either bound is
+    exceeded, and expire `ttl_seconds` after they were stored.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None, sizeof: Callable[[Any], int] = len):
+        """
+        Args:
+            max_entries: Maximum number of entries kept
+            max_bytes: Optional maximum total size of the values, as measured by `sizeof`
+            ttl_seconds: Optional lifetime of an entry
+            sizeof: Function returning the size of a value (used with `max_bytes`)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        # Locks of the keys being built by get_or_build()
+        self._build_locks: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for `key` (marking it recently used), or `default`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`, evicting old entries to stay within bounds."""
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self._entries[key] = (value, size, time.monotonic())
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._total_bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, building and storing it on a miss.
+
+        Concurrent callers missing the same key wait for a single build instead of
+        each running their own. A build returning None is not cached.
+
+        Args:
+            key: Cache key
+            build: Zero-argument function computing the value
+
+        Returns:
+            The cached or newly built value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            lock = self._build_locks.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                # Another caller may have built it while this one waited
+                value = self.get(key)
+                if value is None:
+                    value = build()
+                    if value is not None:
+                        self.set(key, value)
+                return value
+        finally:
+            with self._lock:
+                self._build_locks.pop(key, None)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove `key` and return its value, or `default` if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._remove(key)
+            return default if self._expired(entry) else entry[0]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        """Return the entry count, total size and hit/miss counters."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes, "hits": self.hits, "misses": self.misses}
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, entry: Tuple[Any, int, float]) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - entry[2] > self.ttl_seconds
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
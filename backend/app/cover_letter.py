@@ -1,11 +1,14 @@
 from typing import Any, Dict
 
-import google.generativeai as genai
+from .gemini_client import generate_content
+from .job_requirements import job_description_for_prompt
+from .prompts import custom_instructions_text, render_prompt
+from .timing import timed_generator
+from .token_budget import allocate_input_budget
 
-from .gemini_config import GEMINI_MODEL
 
-
-def generate_cover_letter(job_details: Dict[str, str], custom_instruction: str = "", language: str = "en") -> Dict[str, Any]:
+@timed_generator("cover_letter")
+def generate_cover_letter(job_details: Dict[str, str], custom_instruction: str = "", language: str = "en", resume_profile: str = "") -> Dict[str, Any]:
     """
     Generate a cover letter based on the job details in the specified language
 
@@ -13,6 +16,7 @@ def generate_cover_letter(job_details: Dict[str, str], custom_instruction: str =
         job_details: Dictionary containing job title, company name, and job description
         custom_instruction: Custom instructions for the cover letter
         language: Language code (default: "en" for English)
+        resume_profile: Optional candidate profile (resume_profile.format_profile) to personalize the letter
 
     Returns:
         dict: Contains success status and either cover letter or error message
@@ -21,7 +25,10 @@ def generate_cover_letter(job_details: Dict[str, str], custom_instruction: str =
         # Extract job details
         job_title = job_details.get("job_title", "")
         company_name = job_details.get("company_name", "")
-        job_description = job_details.get("job_description", "")
+        # The posting's extracted requirements stand in for its full text, within the endpoint's token budget
+        budgeted, _ = allocate_input_budget("cover_letter", job_description=job_description_for_prompt(job_details.get("job_description", ""), job_title), instructions=custom_instruction)
+        job_description = budgeted["job_description"]
+        custom_instruction = budgeted["instructions"]
         job_link = job_details.get("job_link", "")
 
         # Determine language instruction
@@ -45,46 +52,28 @@ def generate_cover_letter(job_details: Dict[str, str], custom_instruction: str =
         if job_link:
             job_context += f"\nJob Posting URL: {job_link}\n"
 
-        # Create prompt for cover letter generation
-        base_prompt = f"""
-        You are a professional cover letter writer. Create a compelling cover letter for a position.
-
-        Job Details:
-        {job_context}
-
-        {language_instruction}
+        # The candidate's profile replaces generic claims with their actual background
+        candidate_context = ""
+        if resume_profile:
+            candidate_context = f"Candidate Profile (the applicant's actual background; draw on these facts and do not invent others):\n{resume_profile}"
 
-        Write a professional cover letter that:
-        1. Has a formal business letter format
-        2. Shows enthusiasm for the role and company
-        3. Mentions relevant skills for the position
-        4. Highlights leadership and team collaboration experience
-        5. Demonstrates problem-solving abilities and technical expertise
-        6. Includes:
-           - Professional greeting
-           - 3-4 strong paragraphs
-           - Professional closing
-           - Proper spacing and formatting
-
-        Keep the tone professional but enthusiastic. Focus on how the applicant's skills and experience 
-        match the job requirements.
-        """
-
-        # Add custom instructions if provided
-        if custom_instruction and custom_instruction.strip():
-            prompt = base_prompt + f"\n\nAdditional customization requirements:\n{custom_instruction}"
-        else:
-            prompt = base_prompt
+        # Create prompt for cover letter generation
+        prompt = render_prompt(
+            "cover_letter",
+            job_context=job_context,
+            candidate_context=candidate_context,
+            language_instruction=language_instruction,
+            custom_instructions=custom_instructions_text(custom_instruction),
+        )
 
         # Generate cover letter
-        model = genai.GenerativeModel(GEMINI_MODEL)
         model_config = {
             "temperature": 0.7,
             "top_p": 0.8,
             "top_k": 40,
             "max_output_tokens": 2048,
         }
-        response = model.generate_content(prompt, generation_config=model_config)
+        response = generate_content(prompt, generation_config=model_config, generator="cover_letter")
 
         if response and response.text:
             return {"success": True, "cover_letter": response.text.strip(), "language": language}
@@ -3,13 +3,22 @@ Email reply generation module.
 This module generates professional email replies based on input emails.
 """
 
+import logging
 from typing import Dict
 
-import google.generativeai as genai
+from .email_thread import compact_thread
+from .gemini_client import generate_content
+from .prompts import render_prompt
+from .timing import stage, timed_generator
+from .token_budget import estimate_prompt_tokens, record_usage
 
-from .gemini_config import GEMINI_MODEL
 
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
+
+@timed_generator("email_reply")
 def generate_email_reply(email_content: str, reply_tone: str = "professional", language: str = "en") -> Dict[str, any]:
     """
     Generate a professional email reply based on an input email.
@@ -20,9 +29,14 @@ def generate_email_reply(email_content: str, reply_tone: str = "professional", l
         language: Language code (default: "en" for English)
 
     Returns:
-        dict: Contains success status and either the email reply or error message
+        dict: Contains success status and either the email reply or error message,
+            with "compaction" (see email_thread.compact_thread) and "token_usage"
     """
     try:
+        # Pasted threads are reduced to the latest message and a summary of the earlier turns
+        with stage("email_compaction"):
+            email_text, compaction = compact_thread(email_content)
+
         # Determine language instruction
         language_instructions = {
             "en": "Write the email reply in English.",
@@ -50,39 +64,22 @@ def generate_email_reply(email_content: str, reply_tone: str = "professional", l
         tone_instruction = tone_instructions.get(reply_tone, tone_instructions["professional"])
 
         # Create prompt for email reply generation
-        prompt = f"""
-        You are a professional email writer. Create a well-crafted reply to the following email.
-
-        Original email:
-        {email_content}
-
-        {language_instruction}
-        {tone_instruction}
-
-        Your email reply should:
-        1. Include an appropriate greeting
-        2. Acknowledge the original email's content
-        3. Address all questions or requests from the original email
-        4. Be concise but thorough
-        5. Include a professional closing
-        6. Have proper formatting for a business email
-
-        IMPORTANT: If the original email is not clear or incomplete, make reasonable assumptions 
-        to craft a helpful response, but note any areas where more information might be needed.
-        """
+        prompt = render_prompt("email_reply", email=email_text, language_instruction=language_instruction, tone_instruction=tone_instruction)
+        token_usage = {"email_input": compaction["input_tokens"], "email_compacted": compaction["output_tokens"], **estimate_prompt_tokens(prompt)}
 
         # Generate email reply
-        model = genai.GenerativeModel(GEMINI_MODEL)
         model_config = {
             "temperature": 0.7,
             "top_p": 0.8,
             "top_k": 40,
             "max_output_tokens": 2048,
         }
-        response = model.generate_content(prompt, generation_config=model_config)
+        response = generate_content(prompt, generation_config=model_config, generator="email_reply")
+        record_usage(token_usage, response)
+        logger.info(f"Token usage for email reply: {token_usage}")
 
         if response and response.text:
-            return {"success": True, "reply": response.text.strip(), "language": language}
+            return {"success": True, "reply": response.text.strip(), "language": language, "compaction": compaction, "token_usage": token_usage}
         else:
             return {"success": False, "error": "Failed to generate email reply"}
 
@@ -0,0 +1,316 @@
+"""
+Email thread compaction module.
+This module reduces a pasted email thread to what a reply needs: the latest message,
+cleaned, and a one-line summary of each earlier turn.
+
+Users paste whole recruiter threads: quoted history ("> " lines, "On ... wrote:" headers,
+Outlook "From:/Sent:" blocks, forwarded messages), signatures, legal disclaimers and
+tracking links. The thread is split into messages at those markers, signatures,
+disclaimers and image placeholders are stripped, tracking links are shortened to their
+domain, and earlier messages are summarized extractively (their sender, date and opening
+or question sentences). Everything is local and takes a few milliseconds.
+"""
+
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+
+from .token_budget import estimate_tokens, truncate_to_tokens
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Token budget of the latest message and of the summary of the earlier turns
+EMAIL_LATEST_MAX_TOKENS = int(os.getenv("EMAIL_LATEST_MAX_TOKENS", "1200"))
+EMAIL_SUMMARY_MAX_TOKENS = int(os.getenv("EMAIL_SUMMARY_MAX_TOKENS", "250"))
+# Earlier turns summarized (the most recent ones), and words kept per turn
+EMAIL_SUMMARY_MAX_TURNS = 5
+EMAIL_SUMMARY_MAX_WORDS = 30
+
+# Lines starting an earlier message in the thread
+REPLY_HEADER_PATTERN = re.compile(r"^\s*(?:On|Le|Am|El)\s.{0,200}?(?:wrote|a écrit|schrieb|escribió)\s*:\s*$", re.IGNORECASE)
+FORWARD_HEADER_PATTERN = re.compile(r"^\s*(?:-{2,}\s*(?:Original Message|Forwarded message)\s*-{2,}|Begin forwarded message:)\s*$", re.IGNORECASE)
+OUTLOOK_FROM_PATTERN = re.compile(r"^\s*\*?(?:From|De|Von)\s*:\*?\s*(.+)$", re.IGNORECASE)
+OUTLOOK_FIELD_PATTERN = re.compile(r"^\s*\*?(?:Sent|Date|To|Cc|Subject|Envoyé|Gesendet|À|An|Objet|Betreff)\s*:\*?", re.IGNORECASE)
+REPLY_HEADER_START_PATTERN = re.compile(r"^\s*(?:On|Le|Am|El)\s", re.IGNORECASE)
+QUOTE_PREFIX_PATTERN = re.compile(r"^\s*> ?")
+# "On <date>[ at <time>], <name> [<address>] wrote:"; the date ends at its last digit
+SENDER_PATTERN = re.compile(
+    r"^\s*(?:On|Le|Am|El)\s+([^<]*\d(?:\s*[AP]M\b)?)[,\s]+(.+?)\s*(?:<[^>]*>)?\s*(?:wrote|a écrit|schrieb|escribió)\s*:\s*$",
+    re.IGNORECASE,
+)
+ADDRESS_PATTERN = re.compile(r"\s*<[^>]*>|\s*\[mailto:[^\]]*\]")
+
+# Signatures: the "-- " delimiter, mobile footers, and sign-offs followed by a short block
+SIGNATURE_DELIMITER_PATTERN = re.compile(r"^\s*--\s*$|^\s*_{5,}\s*$")
+MOBILE_FOOTER_PATTERN = re.compile(r"^\s*(?:Sent from my \w+|Get Outlook for \w+|Sent from (?:Mail|Yahoo Mail|Gmail) for \w+)", re.IGNORECASE)
+SIGN_OFF_PATTERN = re.compile(
+    r"^\s*(?:best(?: regards| wishes)?|kind regards|warm regards|regards|many thanks|thanks(?: again| so much)?|thank you|cheers|sincerely|talk soon|all the best)[,!.]?\s*$",
+    re.IGNORECASE,
+)
+# Lines after a sign-off kept as the signer's name
+SIGNATURE_NAME_LINES = 1
+# A sign-off only ends the message when at most this many lines follow it, and none of them
+# reads as body text: a sentence or question of at least SIGNATURE_BODY_MIN_WORDS words
+SIGNATURE_MAX_LINES = 10
+SIGNATURE_BODY_MIN_WORDS = 6
+
+# Disclaimer keywords, and the legal phrasing that marks a paragraph as a disclaimer on its own;
+# a keyword alone also appears in message text ("this search is confidential")
+DISCLAIMER_PATTERN = re.compile(r"confidential|disclaimer|unsubscribe|privacy (?:policy|notice)|privileged|manage your (?:email )?preferences", re.IGNORECASE)
+LEGAL_PHRASE_PATTERN = re.compile(
+    r"intended (?:solely |only )?for the (?:use of the )?(?:named )?(?:addressee|recipient|individual)|received this (?:e-?mail|message|communication) in error"
+    r"|this (?:e-?mail|message|communication) and any (?:attachments|files)|(?:this|the contents of this) (?:e-?mail|message|communication)\b[^.]{0,40}\b(?:confidential|privileged)"
+    r"|confidentiality (?:notice|statement)|legally privileged|is strictly prohibited|privacy (?:policy|notice)|(?:to )?unsubscribe (?:from|here|at any time)|manage your (?:email )?preferences",
+    re.IGNORECASE,
+)
+IMAGE_PLACEHOLDER_PATTERN = re.compile(r"\[(?:cid|image):[^\]]*\]", re.IGNORECASE)
+URL_PATTERN = re.compile(r"<?(https?://[^\s<>\]]+)>?")
+# Links worth shortening: tracking parameters, redirectors, or just long
+TRACKING_URL_PATTERN = re.compile(r"utm_|mc_eid|trk=|click\.|/ls/click|urldefense|safelinks|lnkd\.in|[?&][a-z_]+=[^&\s]{20,}", re.IGNORECASE)
+LONG_URL_CHARS = 80
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+GREETING_PATTERN = re.compile(r"^\s*(?:hi|hello|hey|dear|good (?:morning|afternoon|evening))\b[^.!?]{0,40}[,!:]?\s*$", re.IGNORECASE)
+# Sentences opening a summary line, before the questions of the message
+SUMMARY_LEAD_SENTENCES = 2
+
+
+def _shorten_links(line: str) -> Tuple[str, int]:
+    """Replace tracking and overlong links with their domain."""
+    shortened = 0
+
+    def replace(match: "re.Match") -> str:
+        nonlocal shortened
+        url = match.group(1)
+        if not TRACKING_URL_PATTERN.search(url) and len(url) <= LONG_URL_CHARS:
+            return match.group(0)
+        shortened += 1
+        return f"[link: {urlparse(url).netloc or 'url'}]"
+
+    return URL_PATTERN.sub(replace, line), shortened
+
+
+def split_thread(email_content: str) -> List[Dict[str, Any]]:
+    """
+    Split a pasted thread into its messages, latest first.
+
+    Args:
+        email_content: Email or thread as pasted by the user
+
+    Returns:
+        list: {"sender", "lines"} per message, the latest message first; a message
+            quoted with ">" prefixes is split off as the next one
+    """
+    messages: List[Dict[str, Any]] = [{"sender": "", "date": "", "lines": []}]
+    lines = (email_content or "").replace("\r\n", "\n").splitlines()
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        # "On Mon, Jan 6, 2025 at 9:14 AM Jane Doe <jane@acme.com>" often wraps before "wrote:"
+        header = line if REPLY_HEADER_PATTERN.match(line) else None
+        if header is None and REPLY_HEADER_START_PATTERN.match(line) and index + 1 < len(lines) and REPLY_HEADER_PATTERN.match(f"{line} {lines[index + 1]}"):
+            header = f"{line} {lines[index + 1]}"
+            index += 1
+        if header is not None:
+            sender = SENDER_PATTERN.match(header)
+            messages.append({"sender": sender.group(2).strip() if sender else "", "date": sender.group(1).strip() if sender else "", "lines": []})
+            index += 1
+            continue
+        if FORWARD_HEADER_PATTERN.match(line) or (OUTLOOK_FROM_PATTERN.match(line) and index + 1 < len(lines) and OUTLOOK_FIELD_PATTERN.match(lines[index + 1])):
+            sender = OUTLOOK_FROM_PATTERN.match(line)
+            messages.append({"sender": ADDRESS_PATTERN.sub("", sender.group(1)).strip() if sender else "", "date": "", "lines": []})
+            index += 1
+            # Skip the rest of the header block (From/Sent/To/Cc/Subject)
+            while index < len(lines) and (OUTLOOK_FIELD_PATTERN.match(lines[index]) or OUTLOOK_FROM_PATTERN.match(lines[index])):
+                sender = OUTLOOK_FROM_PATTERN.match(lines[index])
+                if sender and not messages[-1]["sender"]:
+                    messages[-1]["sender"] = ADDRESS_PATTERN.sub("", sender.group(1)).strip()
+                index += 1
+            continue
+        if QUOTE_PREFIX_PATTERN.match(line):
+            # A quoted block is an earlier message; nested quotes are split again
+            quoted = []
+            while index < len(lines) and QUOTE_PREFIX_PATTERN.match(lines[index]):
+                quoted.append(QUOTE_PREFIX_PATTERN.sub("", lines[index], count=1))
+                index += 1
+            earlier = split_thread("\n".join(quoted))
+            # A quote right under a reply header is that header's message
+            if len(messages) > 1 and not any(text.strip() for text in messages[-1]["lines"]):
+                header_message = messages.pop()
+                if not earlier[0]["sender"]:
+                    earlier[0]["sender"], earlier[0]["date"] = header_message["sender"], header_message["date"]
+            messages.extend(earlier)
+            continue
+        messages[-1]["lines"].append(line)
+        index += 1
+
+    return [message for message in messages if any(line.strip() for line in message["lines"]) or message is messages[0]]
+
+
+def _is_body_line(line: str) -> bool:
+    """Tell a line of message text (a sentence or a question) from a signature or disclaimer line."""
+    text = line.strip()
+    if len(text.split()) < SIGNATURE_BODY_MIN_WORDS or LEGAL_PHRASE_PATTERN.search(text):
+        return False
+    return text.endswith((".", "!", "?")) or "?" in text
+
+
+def _is_disclaimer(paragraph: str, after_sign_off: bool, latest: bool) -> bool:
+    """
+    Tell a disclaimer paragraph from message text that happens to use one of its words.
+
+    A paragraph with a disclaimer keyword is a disclaimer when it comes after the sign-off,
+    uses legal phrasing, or has no sentence that reads as body text. A question in the
+    latest message is always kept, as the reply has to answer it.
+    """
+    if len(paragraph) <= 60 or not DISCLAIMER_PATTERN.search(paragraph):
+        return False
+    sentences = [sentence.strip() for line in paragraph.splitlines() for sentence in SENTENCE_PATTERN.split(line) if sentence.strip()]
+    if latest and any(sentence.endswith("?") for sentence in sentences):
+        return False
+    return after_sign_off or bool(LEGAL_PHRASE_PATTERN.search(paragraph)) or not any(_is_body_line(sentence) for sentence in sentences)
+
+
+def clean_message(lines: List[str], latest: bool = False) -> Tuple[str, Dict[str, int]]:
+    """
+    Strip the signature, disclaimers, image placeholders and tracking links of one message.
+
+    Args:
+        lines: Lines of the message
+        latest: Whether this is the latest message, whose questions are never stripped
+
+    Returns:
+        tuple: (cleaned text, counts of "signatures", "disclaimers" and "links" removed or shortened)
+    """
+    stats = {"signatures": 0, "disclaimers": 0, "links": 0}
+    kept: List[str] = []
+    # Position in kept of a sign-off that body text follows, so did not end the message
+    sign_off_at = None
+    for position, line in enumerate(lines):
+        if SIGNATURE_DELIMITER_PATTERN.match(line) or MOBILE_FOOTER_PATTERN.match(line):
+            stats["signatures"] += 1
+            break
+        following = [text for text in lines[position + 1 :] if text.strip()]
+        if SIGN_OFF_PATTERN.match(line):
+            if len(following) <= SIGNATURE_MAX_LINES and not any(_is_body_line(text) for text in following):
+                # Keep the sign-off and the name under it; titles, phone numbers and addresses go
+                kept.extend([line] + following[:SIGNATURE_NAME_LINES])
+                if len(following) > SIGNATURE_NAME_LINES:
+                    stats["signatures"] += 1
+                break
+            if sign_off_at is None:
+                sign_off_at = len(kept)
+        kept.append(line)
+
+    # (paragraph, whether it starts after the sign-off); the lines under the sign-off and
+    # the name start a paragraph of their own, even without a blank line above them
+    paragraphs, current, current_start = [], [], 0
+    trailer_at = sign_off_at + 1 + SIGNATURE_NAME_LINES if sign_off_at is not None else None
+    for index, line in enumerate(kept + [""]):
+        if index == trailer_at and current:
+            paragraphs.append(("\n".join(current), False))
+            current = []
+        if line.strip():
+            if not current:
+                current_start = index
+            current.append(line.strip())
+        elif current:
+            paragraph = " ".join(current) if len(current) == 1 else "\n".join(current)
+            paragraphs.append((paragraph, sign_off_at is not None and current_start > sign_off_at))
+            current = []
+
+    cleaned_paragraphs = []
+    for paragraph, after_sign_off in paragraphs:
+        if _is_disclaimer(paragraph, after_sign_off, latest):
+            stats["disclaimers"] += 1
+            continue
+        paragraph = IMAGE_PLACEHOLDER_PATTERN.sub("", paragraph)
+        paragraph, shortened = _shorten_links(paragraph)
+        stats["links"] += shortened
+        if paragraph.strip():
+            cleaned_paragraphs.append(paragraph.strip())
+    return "\n\n".join(cleaned_paragraphs), stats
+
+
+def summarize_message(message: Dict[str, Any], text: str) -> str:
+    """
+    Summarize an earlier message in one line: its sender and date, its opening sentence and its questions.
+
+    Args:
+        message: Message from split_thread()
+        text: Cleaned text of the message
+
+    Returns:
+        str: Summary line, at most EMAIL_SUMMARY_MAX_WORDS words of content
+    """
+    lines = text.splitlines()
+    # Greetings and the sign-off with the name under it say nothing about the message
+    sign_off = next(
+        (position for position, line in enumerate(lines) if SIGN_OFF_PATTERN.match(line) and not any(_is_body_line(text) for text in lines[position + 1 :])),
+        len(lines),
+    )
+    body = " ".join(line for line in lines[:sign_off] if not GREETING_PATTERN.match(line))
+    sentences = [sentence.strip() for sentence in SENTENCE_PATTERN.split(body) if sentence.strip()]
+    picked = sentences[:SUMMARY_LEAD_SENTENCES] + [sentence for sentence in sentences[SUMMARY_LEAD_SENTENCES:] if sentence.endswith("?")]
+    words = " ".join(picked).split()
+    content = " ".join(words[:EMAIL_SUMMARY_MAX_WORDS]) + ("..." if len(words) > EMAIL_SUMMARY_MAX_WORDS else "")
+    who = " ".join(part for part in (message.get("sender"), f"({message['date']})" if message.get("date") else "") if part) or "Earlier message"
+    return f"- {who}: {content}"
+
+
+def compact_thread(email_content: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Reduce an email thread to its cleaned latest message and a summary of the earlier turns.
+
+    Args:
+        email_content: Email or thread as pasted by the user
+
+    Returns:
+        tuple: (compacted text, report with "input_tokens", "output_tokens", "messages",
+            "summarized_messages", "signatures_removed", "disclaimers_removed",
+            "links_shortened" and "elapsed_ms")
+    """
+    started = time.perf_counter()
+    messages = split_thread(email_content)
+    message_count = len(messages)
+
+    totals = {"signatures": 0, "disclaimers": 0, "links": 0}
+    cleaned = []
+    # The newest message with any text is the one the reply answers
+    latest_index = next((index for index, message in enumerate(messages) if any(line.strip() for line in message["lines"])), 0)
+    for index, message in enumerate(messages):
+        text, stats = clean_message(message["lines"], latest=index == latest_index)
+        cleaned.append(text)
+        for key, value in stats.items():
+            totals[key] += value
+
+    # A forwarded or quoted email pasted on its own has no new text above it: its newest message is the one to answer
+    while len(messages) > 1 and not cleaned[0].strip():
+        messages, cleaned = messages[1:], cleaned[1:]
+
+    latest = truncate_to_tokens(cleaned[0], EMAIL_LATEST_MAX_TOKENS)
+    # Summaries of the most recent earlier turns, oldest first so the thread reads in order
+    earlier = [(message, text) for message, text in zip(messages[1:], cleaned[1:]) if text.strip()][:EMAIL_SUMMARY_MAX_TURNS]
+    summary = truncate_to_tokens("\n".join(summarize_message(message, text) for message, text in reversed(earlier)), EMAIL_SUMMARY_MAX_TOKENS)
+
+    compacted = latest
+    if summary:
+        compacted += f"\n\nEarlier in the thread (oldest first):\n{summary}"
+
+    report = {
+        "input_tokens": estimate_tokens(email_content or ""),
+        "output_tokens": estimate_tokens(compacted),
+        "messages": message_count,
+        "summarized_messages": len(earlier),
+        "signatures_removed": totals["signatures"],
+        "disclaimers_removed": totals["disclaimers"],
+        "links_shortened": totals["links"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    logger.info(f"Compacted email thread from ~{report['input_tokens']} to ~{report['output_tokens']} tokens ({message_count} messages) in {report['elapsed_ms']} ms")
+    return compacted, report
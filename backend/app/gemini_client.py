@@ -0,0 +1,128 @@
+"""
+Gemini client module.
+This module is the single place where generators call Gemini, so every call is timed
+and its outcome and token usage are recorded in the metrics registry and the request's
+stage timings. The model is picked per call by model_router, and a response that fails
+the caller's validation is retried once on a stronger model. A routed model that is not
+found falls back to GEMINI_MODEL.
+
+google.generativeai is imported on the first call rather than at startup: it is by far
+the slowest import of the service, and health checks never need it.
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .gemini_config import GEMINI_MODEL
+from .metrics import GEMINI_REQUEST_DURATION, GEMINI_REQUESTS_IN_FLIGHT, GEMINI_TOKENS
+from .model_router import escalation_model, mark_model_unavailable, record_escalation, record_latency, select_model
+from .timing import record_model_call
+
+
+def configure(api_key: str) -> None:
+    """
+    Configure the Gemini client with an API key.
+
+    Args:
+        api_key: Gemini API key
+    """
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+
+
+def _response_text(response: Any) -> str:
+    """Return a response's text, or "" when it has none (blocked or empty candidates)."""
+    try:
+        return (response.text if response else "") or ""
+    except ValueError:
+        return ""
+
+
+def _call_model(prompt: str, generation_config: Optional[Dict[str, Any]], generator: str, model_name: str) -> Any:
+    """Call one Gemini model and record latency, outcome and token usage."""
+    import google.generativeai as genai
+
+    model = genai.GenerativeModel(model_name)
+    outcome = "error"
+    input_tokens = 0
+    GEMINI_REQUESTS_IN_FLIGHT.inc(generator=generator)
+    started = time.perf_counter()
+    try:
+        response = model.generate_content(prompt, generation_config=generation_config)
+        outcome = "success" if response and getattr(response, "candidates", True) else "empty"
+        usage_metadata = getattr(response, "usage_metadata", None)
+        if usage_metadata is not None:
+            input_tokens = getattr(usage_metadata, "prompt_token_count", 0) or 0
+            GEMINI_TOKENS.inc(input_tokens, generator=generator, direction="input")
+            GEMINI_TOKENS.inc(getattr(usage_metadata, "candidates_token_count", 0) or 0, generator=generator, direction="output")
+        return response
+    finally:
+        ended = time.perf_counter()
+        GEMINI_REQUESTS_IN_FLIGHT.dec(generator=generator)
+        GEMINI_REQUEST_DURATION.observe(ended - started, generator=generator, model=model_name, outcome=outcome)
+        record_latency(model_name, generator, ended - started, input_tokens, outcome)
+        record_model_call(started, ended)
+
+
+def _is_model_not_found(error: Exception) -> bool:
+    """Tell whether an error means the requested model does not exist (or is not enabled for the key)."""
+    from google.api_core.exceptions import NotFound
+
+    return isinstance(error, NotFound)
+
+
+def _call_routed_model(prompt: str, generation_config: Optional[Dict[str, Any]], generator: str, model_name: str) -> Tuple[Any, str]:
+    """
+    Call a routed model, retrying on GEMINI_MODEL when it is not found; returns (response, model used).
+
+    A model is not found when it was retired or is not enabled for the key; it is then
+    skipped for the rest of the process (model_router.mark_model_unavailable).
+    """
+    try:
+        return _call_model(prompt, generation_config, generator, model_name), model_name
+    except Exception as e:
+        if model_name == GEMINI_MODEL or not _is_model_not_found(e):
+            raise
+        mark_model_unavailable(generator, model_name)
+        return _call_model(prompt, generation_config, generator, GEMINI_MODEL), GEMINI_MODEL
+
+
+def generate_content(
+    prompt: str,
+    generation_config: Optional[Dict[str, Any]] = None,
+    generator: str = "unknown",
+    model_name: Optional[str] = None,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> Any:
+    """
+    Call generate_content on a Gemini model and record latency, outcome and token usage.
+
+    Args:
+        prompt: Prompt to send
+        generation_config: Generation settings (temperature, max_output_tokens...)
+        generator: Name of the calling generator, used as a metric label and routing key
+        model_name: Gemini model to use, or None to route by the model_router rules
+        validate: Optional check of the response text (e.g. model_router.json_validator);
+            a routed call whose response fails it is retried once on the next tier.
+            A routed model that is not found is replaced by GEMINI_MODEL
+
+    Returns:
+        The model response
+
+    Raises:
+        Exception: Any error raised by the Gemini client, after it has been counted
+    """
+    if model_name is not None:
+        return _call_model(prompt, generation_config, generator, model_name)
+
+    tier, model_name = select_model(generator, prompt, generation_config)
+    response, model_name = _call_routed_model(prompt, generation_config, generator, model_name)
+    if validate is None or validate(_response_text(response)):
+        return response
+
+    escalation = escalation_model(tier)
+    if escalation is None or escalation[1] == model_name:
+        return response
+    record_escalation(generator, model_name, escalation[1])
+    return _call_routed_model(prompt, generation_config, generator, escalation[1])[0]
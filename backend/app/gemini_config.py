@@ -13,3 +13,11 @@ import os
 
 # A current, widely-available GA model as of mid-2026. Override via env if needed.
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-3.5-flash")
+
+# Smaller, faster model for auxiliary calls such as condensing long resumes, from the same
+# generation as GEMINI_MODEL. Override via env.
+GEMINI_SMALL_MODEL = os.getenv("GEMINI_SMALL_MODEL", "gemini-3.5-flash-lite")
+
+# Stronger model that calls escalate to when a response fails JSON parsing or validation,
+# from the same generation as GEMINI_MODEL. Override via env.
+GEMINI_STRONG_MODEL = os.getenv("GEMINI_STRONG_MODEL", "gemini-3.5-pro")
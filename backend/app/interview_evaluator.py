@@ -8,9 +8,11 @@ import logging
 import re
 from typing import Any, Dict, List
 
-import google.generativeai as genai
-
-from .gemini_config import GEMINI_MODEL
+from .gemini_client import generate_content
+from .metrics import record_json_failure
+from .model_router import json_validator
+from .prompts import render_prompt
+from .timing import timed_generator
 
 
 # Configure logging
@@ -18,6 +20,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@timed_generator("answer_evaluation")
 def evaluate_answer(question: Dict[str, Any], answer: str) -> Dict[str, Any]:
     """
     Evaluate a user's answer to an interview question.
@@ -40,46 +43,9 @@ def evaluate_answer(question: Dict[str, Any], answer: str) -> Dict[str, Any]:
 
         # Create evaluation prompt
         key_points_text = "\n".join([f"- {point}" for point in key_points])
-
-        prompt = f"""
-        You are an expert interview coach evaluating a candidate's answer to an interview question.
-
-        Question: "{question_text}"
-        Category: {category}
-        Key points that should be addressed:
-        {key_points_text}
-
-        Candidate's answer: "{answer}"
-
-        Evaluate the answer on a scale of 1-10 based on the following criteria:
-        1. How well it addresses the key points (60%)
-        2. Clarity and conciseness (20%)
-        3. Relevance to the question (20%)
-
-        Provide a comprehensive analysis of the answer including:
-        1. Overall score (1-10)
-        2. Specific strengths (2-3 points)
-        3. Areas for improvement (2-3 points)
-        4. A sample strong answer for reference
-
-        Return ONLY a JSON object with this exact structure:
-        {{
-            "score": 7,
-            "feedback": "Your overall analysis of the answer",
-            "strengths": [
-                "Strength 1",
-                "Strength 2"
-            ],
-            "areas_for_improvement": [
-                "Improvement 1",
-                "Improvement 2"
-            ],
-            "sample_answer": "A sample strong answer to this question"
-        }}
-        """
+        prompt = render_prompt("answer_evaluation", question=question_text, category=category, key_points=key_points_text, answer=answer)
 
         # Generate evaluation
-        model = genai.GenerativeModel(GEMINI_MODEL)
         model_config = {
             "temperature": 0.4,
             "top_p": 0.8,
@@ -88,7 +54,7 @@ def evaluate_answer(question: Dict[str, Any], answer: str) -> Dict[str, Any]:
         }
 
         logger.info(f"Evaluating answer for question: {question_text[:50]}...")
-        response = model.generate_content(prompt, generation_config=model_config)
+        response = generate_content(prompt, generation_config=model_config, generator="answer_evaluation", validate=json_validator("score"))
 
         if not response or not response.text:
             logger.error("No response from AI model")
@@ -136,6 +102,7 @@ def evaluate_answer(question: Dict[str, Any], answer: str) -> Dict[str, Any]:
             return evaluation
 
         except json.JSONDecodeError as e:
+            record_json_failure("interview_evaluator", "repair")
             logger.error(f"JSON parsing error: {str(e)}")
             logger.error(f"Problematic JSON: {json_str.group(1)[:500] if json_str else 'No JSON found'}")
 
@@ -229,6 +196,7 @@ def evaluate_interview_answers(question_answers: List[Dict[str, Any]]) -> Dict[s
         return {"success": False, "error": f"Error evaluating interview answers: {str(e)}"}
 
 
+@timed_generator("overall_feedback")
 def generate_overall_feedback(evaluations: List[Dict[str, Any]], average_score: float, readiness_level: str) -> Dict[str, Any]:
     """
     Generate overall feedback based on individual answer evaluations.
@@ -278,50 +246,17 @@ def generate_overall_feedback(evaluations: List[Dict[str, Any]], average_score:
         weakest_categories = [cat for cat, score in sorted_categories[-2:]] if len(sorted_categories) >= 2 else [cat for cat, score in sorted_categories]
 
         # Create prompt for generating consolidated feedback
-        prompt = f"""
-        You are an expert interview coach. Based on the following interview evaluation data, provide comprehensive feedback to the candidate.
-
-        Overall Score: {average_score:.1f}/10
-        Readiness Level: {readiness_level}
-        
-        Strongest Categories: {', '.join(strongest_categories)}
-        Areas Needing Improvement: {', '.join(weakest_categories)}
-        
-        Individual Strengths Identified:
-        {', '.join(all_strengths[:10]) if all_strengths else 'None specified'}
-        
-        Individual Areas for Improvement:
-        {', '.join(all_improvement_areas[:10]) if all_improvement_areas else 'None specified'}
-        
-        Please provide:
-        1. An overall assessment of the candidate's interview performance
-        2. 3-5 key strengths consolidated from the evaluations
-        3. 3-5 key areas for improvement
-        4. 3-5 specific next steps or practice recommendations
-        
-        Return ONLY a JSON object with this exact structure:
-        {{
-            "overall_feedback": "Comprehensive assessment of the candidate's performance",
-            "strengths": [
-                "Key strength 1",
-                "Key strength 2",
-                "Key strength 3"
-            ],
-            "areas_for_improvement": [
-                "Area for improvement 1",
-                "Area for improvement 2",
-                "Area for improvement 3"
-            ],
-            "next_steps": [
-                "Specific recommendation 1",
-                "Specific recommendation 2",
-                "Specific recommendation 3"
-            ]
-        }}
-        """
+        prompt = render_prompt(
+            "overall_feedback",
+            average_score=f"{average_score:.1f}",
+            readiness_level=readiness_level,
+            strongest_categories=", ".join(strongest_categories),
+            weakest_categories=", ".join(weakest_categories),
+            strengths=", ".join(all_strengths[:10]) if all_strengths else "None specified",
+            improvement_areas=", ".join(all_improvement_areas[:10]) if all_improvement_areas else "None specified",
+        )
 
         # Generate consolidated feedback
-        model = genai.GenerativeModel(GEMINI_MODEL)
         model_config = {
             "temperature": 0.4,
             "top_p": 0.8,
@@ -329,7 +264,7 @@ def generate_overall_feedback(evaluations: List[Dict[str, Any]], average_score:
             "max_output_tokens": 2048,
         }
 
-        response = model.generate_content(prompt, generation_config=model_config)
+        response = generate_content(prompt, generation_config=model_config, generator="overall_feedback", validate=json_validator("overall_feedback"))
 
         if not response or not response.text:
             logger.error("No response from AI model for overall feedback")
@@ -364,6 +299,7 @@ def generate_overall_feedback(evaluations: List[Dict[str, Any]], average_score:
             return feedback_data
 
         except (json.JSONDecodeError, ValueError) as e:
+            record_json_failure("interview_evaluator")
             logger.error(f"Error parsing overall feedback: {str(e)}")
 
             # Provide default feedback
@@ -8,9 +8,13 @@ import logging
 import re
 from typing import Any, Dict
 
-import google.generativeai as genai
-
-from .gemini_config import GEMINI_MODEL
+from .gemini_client import generate_content
+from .job_requirements import job_description_for_prompt
+from .metrics import record_json_failure
+from .model_router import json_validator
+from .prompts import render_prompt
+from .timing import timed_generator
+from .token_budget import allocate_input_budget, estimate_prompt_tokens, record_usage
 
 
 # Configure logging
@@ -18,12 +22,14 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def generate_interview_questions(job_details: Dict[str, str]) -> Dict[str, Any]:
+@timed_generator("interview_questions")
+def generate_interview_questions(job_details: Dict[str, str], resume_profile: str = "") -> Dict[str, Any]:
     """
     Generate interview questions based on job details.
 
     Args:
         job_details: Dictionary containing job title, company name, and job description
+        resume_profile: Optional candidate profile (resume_profile.format_profile) to tailor the questions to
 
     Returns:
         dict: Contains success status and either the generated questions or error message
@@ -32,69 +38,25 @@ def generate_interview_questions(job_details: Dict[str, str]) -> Dict[str, Any]:
         # Extract job details
         job_title = job_details.get("job_title", "")
         company_name = job_details.get("company_name", "")
-        job_description = job_details.get("job_description", "")
+        # The posting's extracted requirements stand in for its full text
+        job_description = job_description_for_prompt(job_details.get("job_description", ""), job_title)
 
         logger.info(f"Generating interview questions for: {job_title} at {company_name}")
 
         # Create job context
         job_context = f"Job Title: {job_title}\nCompany Name: {company_name}\n"
+        # Trim the job description to the endpoint's token budget
+        budgeted, token_usage = allocate_input_budget("interview_questions", job_description=job_description)
         if job_description:
-            # Truncate job description if it's very long
-            if len(job_description) > 1000:  # Reduced from 2000 to 1000
-                logger.info(f"Truncating job description from {len(job_description)} to 1000 chars")
-                job_context += f"Job Description: {job_description[:1000]}...\n"
-            else:
-                job_context += f"Job Description: {job_description}\n"
+            job_context += f"Job Description: {budgeted['job_description']}\n"
+        if resume_profile:
+            job_context += f"\nCandidate Profile:\n{resume_profile}\n"
+            job_context += "\nTailor the behavioral and role-specific questions to this candidate's roles and achievements, and probe the gaps between their profile and the job.\n"
 
         # Create prompt for interview question generation - REDUCED NUMBER OF QUESTIONS
-        prompt = f"""
-        You are an expert interview coach preparing candidates for job interviews. Generate interview questions based on this job:
-
-        {job_context}
-
-        Create a set of 8 interview questions that would likely be asked for this position, organized into these categories:
-        1. Technical Skills Questions (2 questions): Questions about technical abilities and hard skills required
-        2. Behavioral Questions (2 questions): Scenario-based questions about past experiences
-        3. Role-Specific Questions (2 questions): Questions unique to this particular role
-        4. Company/Industry Knowledge (1 question): Questions testing understanding of the company or industry
-        5. Problem-Solving Questions (1 question): Questions that assess analytical thinking
-
-        For each question, include:
-        - The actual question
-        - The category it belongs to
-        - Difficulty level (Easy, Medium, Hard)
-        - 2-3 key points that should be addressed in an ideal answer
-        - A brief note on why this question matters for this role
-
-        Return ONLY a JSON object with this exact structure:
-        {{
-            "questions": [
-                {{
-                    "id": 1,
-                    "question": "Question text",
-                    "category": "Technical Skills|Behavioral|Role-Specific|Company Knowledge|Problem-Solving",
-                    "difficulty": "Easy|Medium|Hard",
-                    "key_points": ["Key point 1", "Key point 2", "Key point 3"],
-                    "importance": "Why this question matters for this role"
-                }},
-                // more questions...
-            ],
-            "preparation_tips": [
-                "General tip 1 for this interview",
-                "General tip 2 for this interview"
-            ],
-            "key_skills_to_emphasize": [
-                "Skill 1",
-                "Skill 2"
-            ]
-        }}
-
-        Ensure the JSON is properly formatted with exactly 8 questions total, distributed as specified across categories.
-        Use double quotes for all keys and string values. Ensure all arrays and objects are properly terminated with appropriate brackets and commas.
-        """
+        prompt = render_prompt("interview_questions", job_context=job_context)
 
         # Generate interview questions with lower temperature for more deterministic output
-        model = genai.GenerativeModel(GEMINI_MODEL)
         model_config = {
             "temperature": 0.3,  # Reduced from 0.7 to get more consistent outputs
             "top_p": 0.8,
@@ -103,12 +65,16 @@ def generate_interview_questions(job_details: Dict[str, str]) -> Dict[str, Any]:
         }
 
         logger.info("Sending request to AI model for interview questions")
-        response = model.generate_content(prompt, generation_config=model_config)
+        token_usage.update(estimate_prompt_tokens(prompt))
+        response = generate_content(prompt, generation_config=model_config, generator="interview_questions", validate=json_validator("questions"))
 
         if not response or not response.text:
             logger.error("No response from AI model")
             return {"success": False, "error": "No response from AI model"}
 
+        record_usage(token_usage, response)
+        logger.info(f"Token usage for interview questions: {token_usage}")
+
         # Extract and parse JSON with better error handling
         try:
             # Find the JSON content using regex
@@ -147,6 +113,7 @@ def generate_interview_questions(job_details: Dict[str, str]) -> Dict[str, Any]:
                 interview_data = json.loads(cleaned_json)
                 logger.info("Successfully parsed JSON response")
             except json.JSONDecodeError as e:
+                record_json_failure("interview_preparer")
                 logger.error(f"First JSON parsing attempt failed: {e}")
 
                 # If direct parsing fails, try more aggressive cleaning or fallback to a minimal structure
@@ -157,6 +124,7 @@ def generate_interview_questions(job_details: Dict[str, str]) -> Dict[str, Any]:
                     interview_data = json.loads(cleaned_json)
                     logger.info("JSON parsed after additional cleaning")
                 except json.JSONDecodeError as json_error:  # Specify the exception type
+                    record_json_failure("interview_preparer", "repair")
                     # If all parsing attempts fail, return a minimal structure
                     logger.error(f"All JSON parsing attempts failed: {str(json_error)}, using fallback structure")
                     interview_data = {
@@ -216,7 +184,7 @@ def generate_interview_questions(job_details: Dict[str, str]) -> Dict[str, Any]:
             interview_data["job_title"] = job_title
             interview_data["company_name"] = company_name
 
-            return {"success": True, "interview_data": interview_data}
+            return {"success": True, "interview_data": interview_data, "token_usage": token_usage}
 
         except Exception as e:
             logger.error(f"Error during interview question parsing: {str(e)}", exc_info=True)
@@ -253,6 +221,7 @@ def generate_interview_questions(job_details: Dict[str, str]) -> Dict[str, Any]:
         return {"success": False, "error": f"Error generating interview questions: {str(e)}"}
 
 
+@timed_generator("company_research")
 def generate_company_research(company_name: str) -> Dict[str, Any]:
     """
     Generate company research guidance for interview preparation.
@@ -276,31 +245,9 @@ def generate_company_research(company_name: str) -> Dict[str, Any]:
                 ],
             }
 
-        prompt = f"""
-        You are preparing a job candidate for an interview with {company_name}. 
-        
-        Generate a list of 5-8 company research points that would be helpful for the candidate to investigate before the interview.
-        
-        These points should help the candidate:
-        1. Understand the company's business model and products/services
-        2. Learn about the company's culture, values, and mission
-        3. Identify talking points that show interest in the company
-        4. Prepare for company-specific questions
-        
-        Format your response as a JSON array of research points:
-        [
-            "Research point 1",
-            "Research point 2",
-            "Research point 3",
-            "Research point 4",
-            "Research point 5"
-        ]
-        
-        Keep each point concise and actionable.
-        """
-
-        model = genai.GenerativeModel(GEMINI_MODEL)
-        response = model.generate_content(prompt, generation_config={"temperature": 0.2, "max_output_tokens": 1024})
+        prompt = render_prompt("company_research", company_name=company_name)
+
+        response = generate_content(prompt, generation_config={"temperature": 0.2, "max_output_tokens": 1024}, generator="company_research", validate=json_validator(array=True))
 
         if not response or not response.text:
             return {
@@ -343,6 +290,7 @@ def generate_company_research(company_name: str) -> Dict[str, Any]:
                         ],
                     }
         except json.JSONDecodeError as json_error:
+            record_json_failure("interview_preparer")
             # Fallback to default list
             logger.error(f"Error parsing company research JSON: {str(json_error)}")
             return {
@@ -361,19 +309,20 @@ def generate_company_research(company_name: str) -> Dict[str, Any]:
         return {"success": False, "error": f"Error generating company research: {str(e)}"}
 
 
-def generate_interview_preparation_materials(job_details: Dict[str, str]) -> Dict[str, Any]:
+def generate_interview_preparation_materials(job_details: Dict[str, str], resume_profile: str = "") -> Dict[str, Any]:
     """
     Generate comprehensive interview preparation materials.
 
     Args:
         job_details: Dictionary containing job title, company name, and job description
+        resume_profile: Optional candidate profile to tailor the questions to
 
     Returns:
         dict: Contains success status and preparation materials
     """
     try:
         # Generate interview questions
-        questions_result = generate_interview_questions(job_details)
+        questions_result = generate_interview_questions(job_details, resume_profile)
         if not questions_result["success"]:
             return questions_result
 
@@ -0,0 +1,240 @@
+"""
+Job description cleaning module.
+This module strips the boilerplate of a job posting (company blurb, benefits, equal
+opportunity statements, application instructions) and fits what remains to a token
+budget with the requirements first.
+
+Postings often open with the company and close with benefits and legal text, so cutting
+one at a fixed length keeps the blurb and loses the requirements. The cleaner splits a
+posting into blocks (a heading and its paragraphs, or a paragraph on its own), classifies
+each from its heading and its wording, drops the boilerplate and, when the rest is still
+over budget, keeps blocks by priority: requirements, responsibilities, preferred
+qualifications, then the remaining text. Kept blocks stay in posting order. Everything is
+local and takes about a millisecond per posting (`make bench-jd`).
+"""
+
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ats_rules import BULLET_PATTERN, SPECIAL_BULLET_PATTERN
+from .skill_taxonomy import extract_skills
+from .token_budget import estimate_tokens, truncate_to_tokens
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "drop" (default) removes boilerplate; "keep" keeps it, after everything else, when the budget allows
+JD_BOILERPLATE = os.getenv("JD_BOILERPLATE", "drop").strip().lower()
+
+# Blocks are kept in this order of priority when a posting is over budget
+BLOCK_PRIORITIES = {"required": 0, "responsibilities": 1, "preferred": 2, "summary": 3, "boilerplate": 4}
+
+# A block is cut rather than skipped when at least this many tokens of budget are left for it
+MIN_PARTIAL_TOKENS = 20
+
+# Section headings of a posting, tested in this order ("Preferred qualifications" is not a requirement)
+HEADING_MAX_CHARS = 60
+HEADING_PHRASES = (
+    ("preferred", r"nice[- ]to[- ]haves?|preferred(?: qualifications| skills)?|bonus(?: points)?|good to have|desirable|pluses|extra credit"),
+    ("responsibilities", r"responsibilities|what you(?:'ll| will) do|your role|the role|in this role|duties|day[- ]to[- ]day|your impact|what you(?:'ll| will) work on"),
+    (
+        "required",
+        r"requirements|qualifications|must[- ]haves?|what you(?:'ll| will)? (?:need|bring)|who you are|about you|you have"
+        r"|skills|skills (?:and|&) experience|experience|what we(?:'re| are) looking for",
+    ),
+    (
+        "boilerplate",
+        r"about(?: us| the company| the team)?|benefits|perks|compensation|salary|why join us|who we are"
+        r"|our (?:team|company|mission|values)|equal (?:employment )?opportunity(?: employer)?|how to apply|location|culture|what we offer",
+    ),
+)
+# A line ending with a colon is a heading wherever the phrase is; without one the line must be
+# the phrase itself, with at most one word before it ("Key Responsibilities", "Minimum Qualifications")
+_HEADING_SEARCH = [(kind, re.compile(phrases, re.IGNORECASE)) for kind, phrases in HEADING_PHRASES]
+_HEADING_FULL = [(kind, re.compile(rf"(?:[\w'&-]+\s+)?(?:{phrases})", re.IGNORECASE)) for kind, phrases in HEADING_PHRASES]
+
+# Wording of boilerplate paragraphs, whatever heading they are under
+BOILERPLATE_PATTERNS = {
+    "equal_opportunity": re.compile(
+        r"equal (?:employment )?opportunity|without regard to|race, colou?r|sexual orientation|gender identity|protected veteran|disability status"
+        r"|reasonable accommodation|affirmative action|e-verify|eeo\b",
+        re.IGNORECASE,
+    ),
+    "benefits": re.compile(
+        r"\bbenefits\b|401\(?k\)?|health(?:, dental)?(?: and vision)? insurance|dental|paid time off|\bpto\b|parental leave|stock options|wellness|stipend"
+        r"|unlimited vacation|competitive (?:salary|pay|compensation)|(?:salary|pay|compensation) range|bonus eligib",
+        re.IGNORECASE,
+    ),
+    "company": re.compile(
+        r"founded in|headquartered|our mission|we are (?:a|an) (?:leading|fast-growing|global)|backed by|series [a-e]\b|fortune \d+|award-winning"
+        r"|trusted by|industry leader|our customers|offices in",
+        re.IGNORECASE,
+    ),
+    "application": re.compile(r"how to apply|privacy (?:notice|policy)|recruit(?:ment|ing) agenc|background check|applicants? (?:will|must|who)|accommodations? during", re.IGNORECASE),
+}
+# Wording that ties a paragraph outside any section to the role rather than the company
+ROLE_CUE_PATTERN = re.compile(r"we(?:'re| are) (?:looking|hiring|seeking)|join (?:our|the)\b.{0,40}\bteam\b|th(?:is|e) (?:role|position)|responsib|\d+\+\s*years", re.IGNORECASE)
+# Wording that marks a paragraph as part of the job itself
+REQUIREMENT_CUE_PATTERN = re.compile(
+    r"\d+\+?\s*years|experience (?:with|in)|proficien|degree|knowledge of|familiar|you (?:will|have|are)|must|strong|ability to|responsible for",
+    re.IGNORECASE,
+)
+
+
+def heading_kind(line: str) -> Optional[str]:
+    """
+    Classify a line of a posting as a section heading.
+
+    Args:
+        line: One line of the posting
+
+    Returns:
+        str or None: "required", "preferred", "responsibilities" or "boilerplate" (About us,
+            Benefits...; any other line ending with a colon too), or None when the line is not a heading
+    """
+    if len(line) > HEADING_MAX_CHARS or BULLET_PATTERN.match(line) or SPECIAL_BULLET_PATTERN.match(line):
+        return None
+    stripped = line.strip()
+    if stripped.endswith(":"):
+        return next((kind for kind, pattern in _HEADING_SEARCH if pattern.search(stripped)), "boilerplate")
+    stripped = stripped.rstrip("!.")
+    return next((kind for kind, pattern in _HEADING_FULL if pattern.fullmatch(stripped)), None)
+
+
+def boilerplate_signals(text: str) -> List[str]:
+    """Return the kinds of boilerplate wording a text contains ("benefits", "equal_opportunity"...)."""
+    return [name for name, pattern in BOILERPLATE_PATTERNS.items() if pattern.search(text)]
+
+
+def strip_bullet(line: str) -> str:
+    """Remove the bullet of a posting line."""
+    return SPECIAL_BULLET_PATTERN.sub("", BULLET_PATTERN.sub("", line, count=1), count=1).strip()
+
+
+def split_blocks(job_description: str) -> List[Dict[str, Any]]:
+    """
+    Split a posting into classified blocks.
+
+    A heading starts a section; each paragraph of a section (lines up to a blank line) is
+    one block with the section's kind, unless its wording is boilerplate. Paragraphs
+    outside any section are a "summary" or boilerplate by their wording.
+
+    Args:
+        job_description: Text of the job posting
+
+    Returns:
+        list: Blocks in posting order, {"kind", "section": section index or None,
+            "heading": heading line of the section or "", "lines": [...], "signals": [...]}
+    """
+    blocks: List[Dict[str, Any]] = []
+    section, section_kind, section_heading = None, None, ""
+    current: Optional[Dict[str, Any]] = None
+
+    for raw_line in (job_description or "").splitlines():
+        line = " ".join(raw_line.split())
+        if not line:
+            current = None
+            continue
+        kind = heading_kind(line)
+        if kind is not None:
+            section = 0 if section is None else section + 1
+            section_kind, section_heading = kind, line
+            current = None
+            continue
+        if current is None:
+            current = {"kind": section_kind or "summary", "section": section, "heading": section_heading, "lines": []}
+            blocks.append(current)
+        current["lines"].append(line)
+
+    for block in blocks:
+        text = "\n".join(block["lines"])
+        block["signals"] = boilerplate_signals(text)
+        if block["kind"] == "boilerplate" or not block["signals"]:
+            continue
+        # Job-related wording outweighs a single boilerplate word ("experience with benefits platforms");
+        # outside any section, only a paragraph about the role itself is kept
+        if block["kind"] == "summary":
+            job_related = bool(ROLE_CUE_PATTERN.search(text))
+        else:
+            job_related = bool(REQUIREMENT_CUE_PATTERN.search(text) or extract_skills(text))
+        if len(block["signals"]) >= 2 or not job_related:
+            block["kind"] = "boilerplate"
+    return blocks
+
+
+def clean_job_description(job_description: str, max_tokens: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Drop the boilerplate of a posting and fit the rest to a token budget, requirements first.
+
+    Args:
+        job_description: Text of the job posting
+        max_tokens: Optional token budget of the cleaned text
+
+    Returns:
+        tuple: (cleaned text, report with "input_tokens", "output_tokens", "blocks" (kind -> count),
+            "dropped_tokens" (kind -> tokens left out) and "trimmed" (a block was cut to fit))
+    """
+    blocks = split_blocks(job_description)
+    report: Dict[str, Any] = {"input_tokens": estimate_tokens(job_description or ""), "blocks": {}, "dropped_tokens": {}, "trimmed": False}
+    for block in blocks:
+        block["text"] = "\n".join(block["lines"])
+        block["tokens"] = estimate_tokens(block["text"])
+        report["blocks"][block["kind"]] = report["blocks"].get(block["kind"], 0) + 1
+
+    remaining = max_tokens
+    kept: Dict[int, str] = {}
+    headed = set()
+    for index, block in sorted(enumerate(blocks), key=lambda item: (BLOCK_PRIORITIES[item[1]["kind"]], item[0])):
+        if block["kind"] == "boilerplate" and JD_BOILERPLATE != "keep":
+            continue
+        # A section's heading is paid for once, with its first kept block
+        heading_tokens = estimate_tokens(block["heading"]) if block["heading"] and block["section"] not in headed else 0
+        if remaining is not None:
+            if block["tokens"] + heading_tokens > remaining:
+                if remaining - heading_tokens < MIN_PARTIAL_TOKENS:
+                    break
+                kept[index] = truncate_to_tokens(block["text"], remaining - heading_tokens)
+                report["trimmed"] = True
+                headed.add(block["section"])
+                break
+            remaining -= block["tokens"] + heading_tokens
+        kept[index] = block["text"]
+        headed.add(block["section"])
+
+    parts, rendered_sections = [], set()
+    for index, block in enumerate(blocks):
+        if index not in kept:
+            report["dropped_tokens"][block["kind"]] = report["dropped_tokens"].get(block["kind"], 0) + block["tokens"]
+            continue
+        if block["heading"] and block["section"] not in rendered_sections:
+            parts.append(block["heading"])
+            rendered_sections.add(block["section"])
+        parts.append(kept[index])
+
+    cleaned = "\n".join(parts)
+    report["output_tokens"] = estimate_tokens(cleaned)
+    return cleaned, report
+
+
+def fit_job_description(job_description: str, max_tokens: int) -> str:
+    """
+    Fit a posting to a token budget (see clean_job_description), keeping it whole when it fits.
+
+    Falls back to a plain cut when nothing but boilerplate would remain, e.g. for a
+    posting that is a single paragraph about the company and the role.
+
+    Args:
+        job_description: Text of the job posting
+        max_tokens: Token budget
+
+    Returns:
+        str: Text of the posting within the budget
+    """
+    if not job_description or estimate_tokens(job_description) <= max_tokens:
+        return job_description
+    cleaned, _ = clean_job_description(job_description, max_tokens)
+    return cleaned if cleaned.strip() else truncate_to_tokens(job_description, max_tokens)
@@ -0,0 +1,332 @@
+"""
+Job requirements module.
+This module turns a job description into a compact list of requirements (title, seniority,
+required and preferred skills, requirements and responsibilities) that prompts carry
+instead of the raw posting.
+
+The same posting usually reaches the analysis, the ATS optimization, the resume review,
+the cover letter and the interview questions. It is processed once per normalized-text
+hash, so reformatted copies of a posting (whitespace, casing) share the result. The
+sections of a posting ("Requirements", "Nice to have", "What you'll do") are recognized
+locally and their skills matched against the skill taxonomy; only a posting without
+recognizable sections costs one call to the small model (GEMINI_SMALL_MODEL).
+"""
+
+import contextvars
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import BoundedCache, content_hash
+from .gemini_client import generate_content
+from .jd_cleaner import clean_job_description, heading_kind, split_blocks, strip_bullet
+from .metrics import record_json_failure
+from .model_router import json_validator
+from .prompts import render_prompt, template_key
+from .skill_taxonomy import extract_skills, normalize_skills, skill_name
+from .timing import timed_generator
+from .token_budget import estimate_tokens, truncate_to_tokens
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "requirements" (default) sends the extracted requirements to the prompts; "raw" sends the posting itself
+JOB_DESCRIPTION_INPUT = os.getenv("JOB_DESCRIPTION_INPUT", "requirements").strip().lower()
+
+# "model" (default) asks the small model about postings the local extraction cannot read; "local" never does
+JOB_REQUIREMENTS_SOURCE = os.getenv("JOB_REQUIREMENTS_SOURCE", "model").strip().lower()
+
+# Size of the rendered requirements, and of the posting text sent to the model
+JOB_REQUIREMENTS_MAX_TOKENS = int(os.getenv("JOB_REQUIREMENTS_MAX_TOKENS", "350"))
+JOB_REQUIREMENTS_INPUT_TOKENS = int(os.getenv("JOB_REQUIREMENTS_INPUT_TOKENS", "2500"))
+
+JOB_REQUIREMENTS_MAX_ITEMS = 6
+JOB_REQUIREMENTS_ITEM_MAX_CHARS = 140
+JOB_REQUIREMENTS_WORKERS = int(os.getenv("JOB_REQUIREMENTS_WORKERS", "4"))
+
+JOB_REQUIREMENTS_CACHE_MAX_ENTRIES = int(os.getenv("JOB_REQUIREMENTS_CACHE_MAX_ENTRIES", "1024"))
+JOB_REQUIREMENTS_CACHE_TTL_SECONDS = float(os.getenv("JOB_REQUIREMENTS_CACHE_TTL_SECONDS", str(6 * 60 * 60)))
+
+# A requirement line marked as optional inline ("Kafka is a plus")
+PREFERRED_LINE_PATTERN = re.compile(r"\b(?:a (?:big |huge |strong )?plus|nice to have|preferred|bonus|ideally)\b", re.IGNORECASE)
+# Sentences of a posting without sections, so its optional ones can be told apart
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+SENIORITY_LEVELS = (
+    ("intern", re.compile(r"\bintern(ship)?\b", re.IGNORECASE)),
+    ("principal", re.compile(r"\b(principal|distinguished)\b", re.IGNORECASE)),
+    ("staff", re.compile(r"\bstaff\b", re.IGNORECASE)),
+    ("lead", re.compile(r"\b(lead|head of|manager|director)\b", re.IGNORECASE)),
+    ("senior", re.compile(r"\b(senior|sr\.?)\b", re.IGNORECASE)),
+    ("junior", re.compile(r"\b(junior|jr\.?|entry[- ]level|graduate|new grad)\b", re.IGNORECASE)),
+    ("mid", re.compile(r"\b(mid[- ]level|intermediate)\b", re.IGNORECASE)),
+)
+YEARS_PATTERN = re.compile(r"(\d{1,2})\s*\+?\s*(?:-|to)?\s*(?:\d{1,2}\s*\+?\s*)?years?", re.IGNORECASE)
+TITLE_LINE_PATTERN = re.compile(r"^\s*(?:job\s+)?title\s*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+# "Job Title:" / "Company:" lines callers put before a posting (application_pack.build_job_context)
+CONTEXT_LINE_PATTERN = re.compile(r"^\s*(?:(?:job\s+)?title|company(?:\s+name)?)\s*:.*$", re.IGNORECASE)
+# A first line this short, without a sentence's full stop, is the posting's title
+TITLE_MAX_WORDS = 8
+
+_requirements = BoundedCache(max_entries=JOB_REQUIREMENTS_CACHE_MAX_ENTRIES, ttl_seconds=JOB_REQUIREMENTS_CACHE_TTL_SECONDS)
+
+
+def normalize_job_text(job_description: str) -> str:
+    """Collapse the whitespace of a posting and drop its blank lines, keeping its line structure."""
+    lines = (" ".join(line.split()) for line in (job_description or "").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _split_job_context(job_description: str, job_title: str = "") -> Tuple[str, str]:
+    """Separate a "Job Title:" / "Company:" header from a posting, so both forms of a posting are one posting."""
+    lines = (job_description or "").splitlines()
+    header = 0
+    while header < len(lines) and (not lines[header].strip() or CONTEXT_LINE_PATTERN.match(lines[header])):
+        header += 1
+    if not job_title:
+        title_line = TITLE_LINE_PATTERN.search("\n".join(lines[:header]))
+        job_title = title_line.group(1).strip() if title_line else ""
+    return "\n".join(lines[header:]), job_title
+
+
+def job_description_hash(job_description: str, job_title: str = "") -> str:
+    """Hash a posting by its normalized, lowercased text, so reformatted copies share a key."""
+    description, job_title = _split_job_context(job_description, job_title)
+    return content_hash(f"{normalize_job_text(job_title).lower()}\0{normalize_job_text(description).lower()}")
+
+
+def _clip(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= JOB_REQUIREMENTS_ITEM_MAX_CHARS else text[: JOB_REQUIREMENTS_ITEM_MAX_CHARS - 3].rstrip() + "..."
+
+
+def _seniority(text: str) -> Optional[str]:
+    for level, pattern in SENIORITY_LEVELS:
+        if pattern.search(text):
+            return level
+    return None
+
+
+def extract_requirements_locally(job_description: str, job_title: str = "") -> Dict[str, Any]:
+    """
+    Extract the requirements of a posting from its section headings and the skill taxonomy.
+
+    Args:
+        job_description: Text of the job posting
+        job_title: Job title, when known separately from the posting
+
+    Returns:
+        dict: {"title", "seniority", "min_years", "required_skills", "preferred_skills",
+            "requirements", "responsibilities", "source": "local", "sections_found": bool}
+    """
+    text, job_title = _split_job_context(job_description, job_title)
+    first_line = normalize_job_text(text).split("\n", 1)[0]
+    if not job_title and first_line and len(first_line.split()) <= TITLE_MAX_WORDS and not first_line.endswith(".") and heading_kind(first_line) is None:
+        job_title = first_line
+
+    items: Dict[str, List[str]] = {"required": [], "preferred": [], "responsibilities": []}
+    for block in split_blocks(text):
+        if block["kind"] not in items:
+            continue
+        for line in block["lines"]:
+            item = strip_bullet(line)
+            # Optional items listed among the requirements are preferences
+            items["preferred" if block["kind"] == "required" and PREFERRED_LINE_PATTERN.search(item) else block["kind"]].append(item)
+
+    sections_found = bool(items["required"] or items["responsibilities"])
+    if sections_found:
+        required_text = "\n".join(items["required"])
+    else:
+        sentences = SENTENCE_PATTERN.split(clean_job_description(text)[0])
+        required_text = "\n".join(sentence for sentence in sentences if not PREFERRED_LINE_PATTERN.search(sentence))
+        items["preferred"] = [sentence for sentence in sentences if PREFERRED_LINE_PATTERN.search(sentence)]
+    # Technologies named in the responsibilities are required to do the job
+    required = list(extract_skills(required_text + "\n" + "\n".join(items["responsibilities"])))
+    preferred = [skill for skill in extract_skills("\n".join(items["preferred"])) if skill not in required]
+
+    years = [int(match) for match in YEARS_PATTERN.findall(required_text) if 0 < int(match) < 30]
+    return {
+        "title": job_title,
+        "seniority": _seniority(job_title) or _seniority(required_text[:500]),
+        "min_years": min(years) if years else None,
+        "required_skills": [skill_name(skill) for skill in required],
+        "preferred_skills": [skill_name(skill) for skill in preferred],
+        "requirements": [_clip(item) for item in items["required"]][:JOB_REQUIREMENTS_MAX_ITEMS],
+        "responsibilities": [_clip(item) for item in items["responsibilities"]][:JOB_REQUIREMENTS_MAX_ITEMS],
+        "source": "local",
+        "sections_found": sections_found,
+    }
+
+
+@timed_generator("job_requirements")
+def _model_requirements(job_description: str, job_title: str) -> Optional[Dict[str, Any]]:
+    """Ask the small model for the requirements of a posting; None when it gives no usable answer."""
+    prompt = render_prompt(
+        "job_requirements",
+        max_items=JOB_REQUIREMENTS_MAX_ITEMS,
+        job_title=job_title or "Unknown",
+        job_description=truncate_to_tokens(job_description, JOB_REQUIREMENTS_INPUT_TOKENS),
+    )
+    response = generate_content(prompt, generation_config={"temperature": 0.1, "max_output_tokens": 1024}, generator="job_requirements", validate=json_validator())
+    if not response or not getattr(response, "text", None):
+        return None
+
+    json_match = re.search(r"({[\s\S]*})", response.text)
+    try:
+        data = json.loads(json_match.group(1) if json_match else response.text)
+    except json.JSONDecodeError:
+        record_json_failure("job_requirements")
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _merge_model_requirements(requirements: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Overlay the model's answer on the local extraction, keeping local values for missing or malformed fields."""
+    merged = dict(requirements, source="model")
+    if isinstance(data.get("title"), str) and data["title"].strip() and not merged["title"]:
+        merged["title"] = _clip(data["title"])
+    if isinstance(data.get("seniority"), str) and data["seniority"].strip().lower() in {level for level, _ in SENIORITY_LEVELS}:
+        merged["seniority"] = data["seniority"].strip().lower()
+    if isinstance(data.get("min_years"), int) and not isinstance(data["min_years"], bool) and 0 < data["min_years"] < 30:
+        merged["min_years"] = data["min_years"]
+
+    required = normalize_skills(data.get("required_skills") or [])
+    if required:
+        merged["required_skills"] = [skill["name"] for skill in required]
+        required_ids = {skill["id"] for skill in required}
+        merged["preferred_skills"] = [skill["name"] for skill in normalize_skills(data.get("preferred_skills") or []) if skill["id"] not in required_ids]
+    for field in ("requirements", "responsibilities"):
+        items = [_clip(item) for item in data.get(field) or [] if isinstance(item, str) and item.strip()]
+        if items:
+            merged[field] = items[:JOB_REQUIREMENTS_MAX_ITEMS]
+    return merged
+
+
+def _build_requirements(job_description: str, job_title: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Extract locally, asking the small model only when the posting has no recognizable sections.
+
+    Returns:
+        tuple: (requirements, whether to cache them); the local extraction standing in for a
+            failed model call is not cached, so the next request asks the model again
+    """
+    requirements = extract_requirements_locally(job_description, job_title)
+    if requirements["sections_found"] or JOB_REQUIREMENTS_SOURCE != "model":
+        return requirements, True
+
+    try:
+        # Boilerplate is left out of the model's input
+        data = _model_requirements(clean_job_description(job_description)[0] or normalize_job_text(job_description), requirements["title"])
+    except Exception as e:
+        logger.warning(f"Extracting job requirements with the model failed, using the local extraction: {str(e)}")
+        data = None
+    if data is None:
+        return requirements, False
+    return _merge_model_requirements(requirements, data), True
+
+
+def get_job_requirements(job_description: str, job_title: str = "") -> Dict[str, Any]:
+    """
+    Return the requirements of a posting, extracting them on first use.
+
+    Args:
+        job_description: Text of the job posting
+        job_title: Job title, when known separately from the posting
+
+    Returns:
+        dict: See extract_requirements_locally(); "source" is "model" when the small model
+            answered. Callers share the cached dict and must not modify it.
+    """
+    description, job_title = _split_job_context(job_description, job_title)
+    # Requirements extracted with an earlier version of the prompt are not reused
+    key = (template_key("job_requirements"), job_description_hash(description, job_title))
+    uncached: List[Dict[str, Any]] = []
+
+    def build() -> Optional[Dict[str, Any]]:
+        requirements, cacheable = _build_requirements(description, job_title)
+        if cacheable:
+            return requirements
+        # get_or_build does not store None
+        uncached.append(requirements)
+        return None
+
+    requirements = _requirements.get_or_build(key, build)
+    return requirements if requirements is not None else uncached[0]
+
+
+def format_requirements(requirements: Dict[str, Any], max_tokens: int = JOB_REQUIREMENTS_MAX_TOKENS) -> str:
+    """
+    Render job requirements as compact prompt text.
+
+    Args:
+        requirements: Result of get_job_requirements()
+        max_tokens: Maximum length of the text
+
+    Returns:
+        str: One line per field, requirements and responsibilities as "- " lines
+    """
+    lines = []
+    if requirements.get("title"):
+        lines.append(f"Title: {requirements['title']}")
+    level = " ".join(part for part in (requirements.get("seniority") or "", f"({requirements['min_years']}+ years)" if requirements.get("min_years") else "") if part)
+    if level:
+        lines.append(f"Seniority: {level}")
+    if requirements.get("required_skills"):
+        lines.append("Required skills: " + ", ".join(requirements["required_skills"]))
+    if requirements.get("preferred_skills"):
+        lines.append("Preferred skills: " + ", ".join(requirements["preferred_skills"]))
+    for field, label in (("requirements", "Requirements"), ("responsibilities", "Responsibilities")):
+        if requirements.get(field):
+            lines.append(f"{label}:\n" + "\n".join(f"- {item}" for item in requirements[field]))
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+
+def job_description_for_prompt(job_description: str, job_title: str = "") -> str:
+    """
+    Return the text a prompt should carry for a posting: its requirements, or the posting
+    without its boilerplate when that is shorter (always when JOB_DESCRIPTION_INPUT is "raw",
+    and when the posting has no sections and the model did not extract its requirements:
+    the local extraction of such a posting keeps little more than its skills).
+
+    Args:
+        job_description: Text of the job posting
+        job_title: Job title, when known separately from the posting
+
+    Returns:
+        str: Text standing in for the job description
+    """
+    if not job_description or not job_description.strip():
+        return job_description
+    cleaned = clean_job_description(job_description)[0] or job_description
+    if JOB_DESCRIPTION_INPUT != "requirements":
+        return cleaned
+    requirements = get_job_requirements(job_description, job_title)
+    if not requirements["sections_found"] and requirements["source"] != "model":
+        return cleaned
+    compact = format_requirements(requirements)
+    return compact if compact and estimate_tokens(compact) < estimate_tokens(cleaned) else cleaned
+
+
+def job_descriptions_for_prompt(job_details: List[Dict]) -> List[str]:
+    """
+    Return job_description_for_prompt() for several jobs, extracting uncached postings concurrently.
+
+    Args:
+        job_details: List of dictionaries containing job title and job description
+
+    Returns:
+        list: Text standing in for each job's description, in order
+    """
+    jobs = [(job.get("job_description") or "", job.get("job_title") or "") for job in job_details]
+    if len(jobs) <= 1:
+        return [job_description_for_prompt(description, title) for description, title in jobs]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(JOB_REQUIREMENTS_WORKERS, len(jobs)))) as executor:
+        # Each extraction runs in a copy of the request context so its timings reach the request
+        futures = [executor.submit(contextvars.copy_context().run, job_description_for_prompt, description, title) for description, title in jobs]
+        return [future.result() for future in futures]
@@ -5,18 +5,32 @@ This module generates learning resources for skills development.
 
 import json
 import logging
+import os
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-import google.generativeai as genai
-
-from .gemini_config import GEMINI_MODEL
+from .cache import BoundedCache
+from .gemini_client import generate_content
+from .metrics import record_json_failure
+from .model_router import json_validator
+from .prompts import render_prompt, template_key
+from .skill_taxonomy import normalize_skill, normalize_skills
+from .timing import timed_generator
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Skills per recommendations request, to stay within the model's output limit
+MAX_SKILLS_PER_REQUEST = 5
+
+# Learning resources do not depend on the user, so they are cached per canonical skill id
+LEARNING_CACHE_MAX_ENTRIES = int(os.getenv("LEARNING_CACHE_MAX_ENTRIES", "512"))
+LEARNING_CACHE_TTL_SECONDS = float(os.getenv("LEARNING_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+
+_learning_cache = BoundedCache(max_entries=LEARNING_CACHE_MAX_ENTRIES, ttl_seconds=LEARNING_CACHE_TTL_SECONDS)
+
 
 def generate_search_url(title: str, platform: str = None) -> str:
     """
@@ -54,10 +68,15 @@ def generate_search_url(title: str, platform: str = None) -> str:
         return "https://www.google.com"
 
 
+@timed_generator("learning_recommendations")
 def generate_learning_recommendations(skills: List[str]) -> Dict[str, Any]:
     """
     Generate learning recommendations for a list of skills.
 
+    Skill names are normalized to the skill taxonomy first, so aliases ("JS" and
+    "JavaScript") are requested once, and recommendations are cached per canonical
+    skill: only skills without cached recommendations are sent to the model.
+
     Args:
         skills: List of skills to find learning resources for
 
@@ -68,75 +87,81 @@ def generate_learning_recommendations(skills: List[str]) -> Dict[str, Any]:
         if not skills or not isinstance(skills, list) or len(skills) == 0:
             return {"success": False, "error": "No skills provided"}
 
+        normalized = normalize_skills(skills)
+        if not normalized:
+            return {"success": False, "error": "No skills provided"}
+
         # Log the original number of skills
-        original_skill_count = len(skills)
-        logger.info(f"Received request for {original_skill_count} skills: {skills}")
+        original_skill_count = len(normalized)
+        logger.info(f"Received request for {original_skill_count} skills: {[skill['name'] for skill in normalized]}")
 
         # Limit to 5 skills to prevent token limits, but don't return an error
         truncated = False
-        if len(skills) > 5:
-            logger.info(f"Truncating skills list from {len(skills)} to 5 skills")
-            skills = skills[:5]
+        if len(normalized) > MAX_SKILLS_PER_REQUEST:
+            logger.info(f"Truncating skills list from {len(normalized)} to {MAX_SKILLS_PER_REQUEST} skills")
+            normalized = normalized[:MAX_SKILLS_PER_REQUEST]
             truncated = True
 
+        recommendations = {skill["id"]: _learning_cache.get((template_key("learning_recommendations"), skill["id"])) for skill in normalized}
+        to_generate = [skill for skill in normalized if recommendations[skill["id"]] is None]
+        if to_generate:
+            generated = _generate_recommendations([skill["name"] for skill in to_generate])
+            if not generated["success"]:
+                return generated
+
+            for i, rec in enumerate(generated["recommendations"]):
+                skill = _match_requested_skill(rec.get("skill"), to_generate, i)
+                if skill is None:
+                    continue
+                rec["skill"] = skill["name"]
+                rec["skill_id"] = skill["id"]
+                recommendations[skill["id"]] = rec
+                _learning_cache.set((template_key("learning_recommendations"), skill["id"]), rec)
+
+        # Add a note if we truncated the skills list
+        result = {
+            "success": True,
+            "recommendations": [recommendations[skill["id"]] for skill in normalized if recommendations[skill["id"]] is not None],
+            "cached_skills": len(normalized) - len(to_generate),
+        }
+
+        if truncated:
+            result["truncated"] = True
+            result["original_count"] = original_skill_count
+            result["message"] = f"Only showing recommendations for the first {MAX_SKILLS_PER_REQUEST} skills out of {original_skill_count} due to system limitations."
+
+        return result
+
+    except Exception as e:
+        logger.error(f"Error generating learning recommendations: {str(e)}")
+        return {"success": False, "error": f"Error generating learning recommendations: {str(e)}"}
+
+
+def _match_requested_skill(name: Any, requested: List[Dict[str, str]], position: int) -> Optional[Dict[str, str]]:
+    """Find which requested skill a model recommendation is for: by canonical id, else by position."""
+    if isinstance(name, str) and name.strip():
+        skill_id = normalize_skill(name)["id"]
+        for skill in requested:
+            if skill["id"] == skill_id:
+                return skill
+    return requested[position] if position < len(requested) else None
+
+
+def _generate_recommendations(skills: List[str]) -> Dict[str, Any]:
+    """
+    Ask the model for learning recommendations for a list of skills.
+
+    Args:
+        skills: Canonical names of the skills to find learning resources for
+
+    Returns:
+        dict: {"success": True, "recommendations": [...]} or an error
+    """
+    try:
         skills_list = "\n".join([f"- {skill}" for skill in skills])
 
-        prompt = f"""
-        You are a career development advisor specializing in technical skills. Provide learning resources for these skills:
-        
-        {skills_list}
-        
-        For each skill, recommend:
-        1. 1-2 online courses (free or paid, with platform names)
-        2. 1-2 articles or tutorials (with website names)
-        3. 1-2 YouTube channels or specific videos
-        4. A brief learning path from beginner to advanced
-        
-        Return ONLY a JSON object with this exact structure:
-        {{
-            "recommendations": [
-                {{
-                    "skill": "<skill name>",
-                    "courses": [
-                        {{
-                            "title": "<course title>",
-                            "platform": "<platform name>",
-                            "url": "<generic url to platform>",
-                            "is_free": true,
-                            "difficulty": "Beginner/Intermediate/Advanced"
-                        }}
-                    ],
-                    "articles": [
-                        {{
-                            "title": "<article title>",
-                            "source": "<website/source name>",
-                            "url": "<generic url to source>"
-                        }}
-                    ],
-                    "videos": [
-                        {{
-                            "title": "<video/channel title>",
-                            "creator": "<creator name>",
-                            "platform": "YouTube",
-                            "url": "<generic url to youtube>"
-                        }}
-                    ],
-                    "learning_path": "<brief learning path from beginner to advanced>"
-                }}
-            ]
-        }}
-        
-        IMPORTANT: 
-        - For URLs, provide specific URLs when possible
-        - If you don't know the exact URL, use the format: https://www.platform.com/search?q=title
-        - For YouTube videos: https://www.youtube.com/results?search_query=title
-        - For Coursera courses: https://www.coursera.org/search?query=title
-        - For Udemy courses: https://www.udemy.com/courses/search/?q=title
-        - Use double quotes for all JSON properties and string values
-        - Use true/false without quotes for boolean values
-        """
-
-        model = genai.GenerativeModel(GEMINI_MODEL)
+        prompt = render_prompt("learning_recommendations", skills=skills_list)
+
         model_config = {
             "temperature": 0.7,
             "top_p": 0.8,
@@ -144,7 +169,7 @@ def generate_learning_recommendations(skills: List[str]) -> Dict[str, Any]:
             "max_output_tokens": 2048,
         }
 
-        response = model.generate_content(prompt, generation_config=model_config)
+        response = generate_content(prompt, generation_config=model_config, generator="learning_recommendations", validate=json_validator("recommendations"))
         if not response or not response.text:
             return {"success": False, "error": "No response from AI model"}
 
@@ -157,6 +182,7 @@ def generate_learning_recommendations(skills: List[str]) -> Dict[str, Any]:
             # Try to parse the JSON directly
             recommendations = json.loads(json_str.group(1))
         except json.JSONDecodeError as e:
+            record_json_failure("learning_recommender")
             # If there's an error, try to clean up the JSON
             cleaned_json = json_str.group(1)
 
@@ -171,6 +197,7 @@ def generate_learning_recommendations(skills: List[str]) -> Dict[str, Any]:
                 # Try to parse again after cleanup
                 recommendations = json.loads(cleaned_json)
             except json.JSONDecodeError:
+                record_json_failure("learning_recommender", "repair")
                 # If still failing, return a fallback response with error info
                 return {
                     "success": False,
@@ -241,25 +268,20 @@ def generate_learning_recommendations(skills: List[str]) -> Dict[str, Any]:
                 if "platform" not in video:
                     video["platform"] = "YouTube"
 
-        # Add a note if we truncated the skills list
-        result = {"success": True, "recommendations": recommendations["recommendations"]}
-
-        if truncated:
-            result["truncated"] = True
-            result["original_count"] = original_skill_count
-            result["message"] = f"Only showing recommendations for the first 5 skills out of {original_skill_count} due to system limitations."
-
-        return result
+        return {"success": True, "recommendations": recommendations["recommendations"]}
 
     except Exception as e:
         logger.error(f"Error generating learning recommendations: {str(e)}")
         return {"success": False, "error": f"Error generating learning recommendations: {str(e)}"}
 
 
+@timed_generator("learning_plan")
 def generate_detailed_learning_plan(skill: str) -> Dict[str, Any]:
     """
     Generate a detailed learning plan for a specific skill.
 
+    Plans are cached per canonical skill id, so "K8s" and "Kubernetes" share one plan.
+
     Args:
         skill: The skill to generate a learning plan for
 
@@ -267,84 +289,17 @@ def generate_detailed_learning_plan(skill: str) -> Dict[str, Any]:
         dict: Detailed learning plan
     """
     try:
-        prompt = f"""
-        You are a technical education specialist. Create a comprehensive learning plan for this skill:
-        
-        Skill: {skill}
-        
-        Provide a detailed learning plan that includes:
-        1. A learning roadmap from beginner to expert level
-        2. Key concepts to master at each stage
-        3. Recommended projects to build for practice
-        4. Best resources for each level (courses, books, documentation)
-        5. Estimated time investment for each level
-        
-        Return ONLY a JSON object with this exact structure:
-        {{
-            "skill": "{skill}",
-            "overview": "<brief overview of the skill and its importance>",
-            "levels": [
-                {{
-                    "level": "Beginner",
-                    "description": "<description of this level>",
-                    "key_concepts": ["<concept 1>", "<concept 2>"],
-                    "resources": [
-                        {{
-                            "type": "Course/Book/Documentation/Tutorial",
-                            "title": "<title>",
-                            "source": "<platform or author>",
-                            "description": "<brief description>",
-                            "url": "<search URL or direct link if known>"
-                        }}
-                    ],
-                    "projects": ["<project 1>", "<project 2>"],
-                    "estimated_time": "<estimated time to reach next level>"
-                }},
-                {{
-                    "level": "Intermediate",
-                    "description": "<description of this level>",
-                    "key_concepts": ["<concept 1>", "<concept 2>"],
-                    "resources": [
-                        {{
-                            "type": "Course/Book/Documentation/Tutorial",
-                            "title": "<title>",
-                            "source": "<platform or author>",
-                            "description": "<brief description>",
-                            "url": "<search URL or direct link if known>"
-                        }}
-                    ],
-                    "projects": ["<project 1>", "<project 2>"],
-                    "estimated_time": "<estimated time to reach next level>"
-                }},
-                {{
-                    "level": "Advanced",
-                    "description": "<description of this level>",
-                    "key_concepts": ["<concept 1>", "<concept 2>"],
-                    "resources": [
-                        {{
-                            "type": "Course/Book/Documentation/Tutorial",
-                            "title": "<title>",
-                            "source": "<platform or author>",
-                            "description": "<brief description>",
-                            "url": "<search URL or direct link if known>"
-                        }}
-                    ],
-                    "projects": ["<project 1>", "<project 2>"],
-                    "estimated_time": "<estimated time to mastery>"
-                }}
-            ]
-        }}
-        
-        IMPORTANT:
-        - For URLs, provide real URLs when possible. If you don't know the specific URL, use search URLs in this format:
-          - For courses on Coursera: https://www.coursera.org/search?query=course+name
-          - For books on Amazon: https://www.amazon.com/s?k=book+title+author
-          - For YouTube videos: https://www.youtube.com/results?search_query=video+topic
-        - Use double quotes for all property names and string values in the JSON
-        - Ensure all arrays and objects are properly formatted
-        """
-
-        model = genai.GenerativeModel(GEMINI_MODEL)
+        if not isinstance(skill, str) or not skill.strip():
+            return {"success": False, "error": "No skill provided"}
+
+        canonical = normalize_skill(skill)
+        skill = canonical["name"]
+        cached_plan = _learning_cache.get((template_key("learning_plan"), canonical["id"]))
+        if cached_plan is not None:
+            return {"success": True, "learning_plan": cached_plan, "cached": True}
+
+        prompt = render_prompt("learning_plan", skill=skill)
+
         model_config = {
             "temperature": 0.7,
             "top_p": 0.8,
@@ -352,7 +307,7 @@ def generate_detailed_learning_plan(skill: str) -> Dict[str, Any]:
             "max_output_tokens": 2048,
         }
 
-        response = model.generate_content(prompt, generation_config=model_config)
+        response = generate_content(prompt, generation_config=model_config, generator="learning_plan", validate=json_validator("levels"))
         if not response or not response.text:
             return {"success": False, "error": "No response from AI model"}
 
@@ -365,6 +320,7 @@ def generate_detailed_learning_plan(skill: str) -> Dict[str, Any]:
             # Try to parse the JSON directly
             learning_plan = json.loads(json_str.group(1))
         except json.JSONDecodeError as e:
+            record_json_failure("learning_recommender")
             # If there's an error, try to clean up the JSON
             cleaned_json = json_str.group(1)
 
@@ -376,6 +332,7 @@ def generate_detailed_learning_plan(skill: str) -> Dict[str, Any]:
                 # Try to parse again after cleanup
                 learning_plan = json.loads(cleaned_json)
             except json.JSONDecodeError:
+                record_json_failure("learning_recommender", "repair")
                 # If still failing, return a fallback response with error info
                 return {
                     "success": False,
@@ -479,6 +436,8 @@ def generate_detailed_learning_plan(skill: str) -> Dict[str, Any]:
                                 else:  # description
                                     resource[field] = "Resource description"
 
+        learning_plan["skill_id"] = canonical["id"]
+        _learning_cache.set((template_key("learning_plan"), canonical["id"]), learning_plan)
         return {"success": True, "learning_plan": learning_plan}
 
     except Exception as e:
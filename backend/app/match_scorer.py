@@ -0,0 +1,254 @@
+"""
+Local match scoring module.
+This module scores a resume against job descriptions without calling Gemini: it
+tokenizes both texts, finds their skills with the skill taxonomy, and combines skill
+coverage with a BM25-weighted TF-IDF similarity computed with NumPy.
+
+The score is deterministic and takes a few milliseconds, so /api/analyze can return it
+immediately (mode=fast) and generate_analysis uses it to fill in and sanity-check the
+model's match percentage and skill lists.
+"""
+
+import logging
+import math
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .skill_taxonomy import covered_skills, extract_skills, normalize_skills, skill_name
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Share of the score that comes from skill coverage; the rest comes from text similarity
+SKILL_WEIGHT = float(os.getenv("MATCH_SKILL_WEIGHT", "0.6"))
+
+# Cosine similarity at which the text part of the score saturates (resumes and job
+# descriptions rarely exceed ~0.5 even for a strong match)
+SIMILARITY_SATURATION = 0.5
+
+# A model score further than this from the local score is flagged in the results
+MATCH_SCORE_TOLERANCE = int(os.getenv("MATCH_SCORE_TOLERANCE", "30"))
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset(
+    """
+    a about above after all also an and any are as at be been being both but by can could did do does doing
+    during each etc for from further had has have having how i if in into is it its just may me more most must
+    my no nor not of on once only or other our out over own per same shall should so some such than that the
+    their them then there these they this those through to too under until up upon us very via was we were what
+    when where which while who whom why will with within would you your
+    ability able candidate candidates company experience experienced including job looking plus preferred
+    required requirements responsibilities role skills strong team using work working year years
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase tokens, keeping technical names such as c++, c# and node.js intact.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        list: Tokens, stopwords included
+    """
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class TermMatrix(NamedTuple):
+    """Sparse document x term matrix in CSR layout: row i holds data[indptr[i]:indptr[i + 1]] at columns indices[...]."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    vocabulary: List[str]
+
+    def row_sums(self, values: np.ndarray) -> np.ndarray:
+        """Sum per-entry values row by row (empty rows sum to 0)."""
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        return np.bincount(rows, weights=values, minlength=len(self.indptr) - 1)
+
+    def dense_row(self, row: int) -> np.ndarray:
+        """Return one row as a dense vector over the vocabulary."""
+        vector = np.zeros(len(self.vocabulary))
+        vector[self.indices[self.indptr[row] : self.indptr[row + 1]]] = self.data[self.indptr[row] : self.indptr[row + 1]]
+        return vector
+
+
+def _term_weights(documents: List[List[str]]) -> TermMatrix:
+    """
+    Build the L2-normalized, BM25-weighted TF-IDF matrix of a set of documents.
+
+    The matrix is sparse, so hundreds of job postings cost memory proportional to their
+    length rather than documents x vocabulary.
+
+    Args:
+        documents: Token lists (stopwords removed), one per document
+
+    Returns:
+        TermMatrix: The weights and the vocabulary their columns refer to
+    """
+    vocabulary: Dict[str, int] = {}
+    row_terms, row_counts = [], []
+    for document in documents:
+        ids = np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for token in document), dtype=np.int64, count=len(document))
+        terms, counts = np.unique(ids, return_counts=True)
+        row_terms.append(terms)
+        row_counts.append(counts)
+
+    indptr = np.concatenate(([0], np.cumsum([len(terms) for terms in row_terms]))).astype(np.int64)
+    indices = np.concatenate(row_terms) if row_terms else np.zeros(0, dtype=np.int64)
+    counts = (np.concatenate(row_counts) if row_counts else np.zeros(0)).astype(np.float64)
+
+    lengths = np.array([len(document) for document in documents], dtype=np.float64)
+    average_length = max(float(lengths.mean()) if len(lengths) else 0.0, 1.0)
+    entry_lengths = np.repeat(lengths, np.diff(indptr))
+    saturated = counts * (BM25_K1 + 1) / (counts + BM25_K1 * (1 - BM25_B + BM25_B * entry_lengths / average_length))
+
+    # Smoothed IDF: terms shared by every document keep a weight of 1, rarer terms count more
+    document_frequency = np.bincount(indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+
+    matrix = TermMatrix(indptr, indices, saturated * idf[indices], list(vocabulary))
+    norms = np.sqrt(matrix.row_sums(matrix.data**2))
+    norms[norms == 0] = 1.0
+    return matrix._replace(data=matrix.data / np.repeat(norms, np.diff(indptr)))
+
+
+def score_jobs(resume_content: str, job_details: List[Dict], top_terms: int = 10) -> List[Dict]:
+    """
+    Score a resume against one or more jobs locally.
+
+    Args:
+        resume_content: Text content of the resume
+        job_details: List of dictionaries containing job details (title, company, description)
+        top_terms: Number of shared keywords to report per job
+
+    Returns:
+        list: One result per job with the same fields as the model's analysis
+            (job_title, company_name, match_percentage, matching_skills, missing_skills,
+            recommendations) plus similarity, keyword_overlap and score_source="local"
+    """
+    job_texts = [f"{job.get('job_title', '')}\n{job.get('job_description', '')}" for job in job_details]
+    resume_tokens = tokenize(resume_content)
+    job_tokens = [tokenize(text) for text in job_texts]
+
+    # Row 0 is the resume, rows 1.. are the jobs: one sparse matrix times the resume vector scores them all
+    weights = _term_weights([[token for token in tokens if token not in STOPWORDS] for tokens in [resume_tokens] + job_tokens])
+    overlaps = weights.data * weights.dense_row(0)[weights.indices]
+    similarities = weights.row_sums(overlaps)[1:]
+
+    # A tool on the resume also covers the broader skill it implies (Lambda -> AWS)
+    resume_skills = covered_skills(extract_skills(resume_content))
+    results = []
+    for i, job in enumerate(job_details):
+        job_skills = extract_skills(job_texts[i])
+        # Skills the job mentions most come first
+        ranked = sorted(job_skills, key=lambda skill: -job_skills[skill])
+        matching = [skill for skill in ranked if skill in resume_skills]
+        missing = [skill for skill in ranked if skill not in resume_skills]
+
+        similarity = float(similarities[i])
+        text_score = min(1.0, similarity / SIMILARITY_SATURATION)
+        if job_skills:
+            coverage = sum(job_skills[skill] for skill in matching) / sum(job_skills.values())
+            score = SKILL_WEIGHT * coverage + (1 - SKILL_WEIGHT) * text_score
+        else:
+            score = text_score
+
+        row = slice(weights.indptr[i + 1], weights.indptr[i + 2])
+        row_overlaps, row_terms = overlaps[row], weights.indices[row]
+        shared = np.argsort(row_overlaps)[::-1][:top_terms]
+        result = {
+            "job_title": job.get("job_title") or "Position",
+            "company_name": job.get("company_name") or "Company",
+            "match_percentage": int(round(100 * score)),
+            "matching_skills": [skill_name(skill) for skill in matching],
+            "missing_skills": [skill_name(skill) for skill in missing],
+            "recommendations": [f"Show your experience with {skill_name(skill)} if you have it" for skill in missing[:3]],
+            "similarity": round(similarity, 4),
+            "keyword_overlap": [weights.vocabulary[row_terms[index]] for index in shared if row_overlaps[index] > 0],
+            "score_source": "local",
+        }
+        if job.get("job_link"):
+            result["job_link"] = job["job_link"]
+        results.append(result)
+    return results
+
+
+def rank_jobs(resume_content: str, job_details: List[Dict]) -> List[Dict]:
+    """
+    Rank many job postings for one resume by their local score.
+
+    Args:
+        resume_content: Text content of the resume
+        job_details: List of dictionaries containing job details (title, company, description)
+
+    Returns:
+        list: score_jobs() results, best match first, each with its 1-based "rank" and its
+            "index" in job_details
+    """
+    results = score_jobs(resume_content, job_details, top_terms=5)
+    for index, result in enumerate(results):
+        result["index"] = index
+    # Ties on the rounded percentage are broken by the raw text similarity
+    results.sort(key=lambda result: (-result["match_percentage"], -result["similarity"], result["index"]))
+    for rank, result in enumerate(results, start=1):
+        result["rank"] = rank
+    return results
+
+
+def reconcile_with_local_score(job_result: Dict, local_result: Optional[Dict]) -> Dict:
+    """
+    Normalize a model job analysis and sanity-check it against its local score.
+
+    Skill names are mapped to the taxonomy's canonical names and deduplicated, so "JS"
+    and "JavaScript" count once, and a skill the model lists as missing while the
+    resume mentions it moves to the matching skills. A missing match percentage or skill
+    list is taken from the local result. When the model's percentage differs from the
+    local one by more than MATCH_SCORE_TOLERANCE points, a "score_check" entry with both
+    scores is added so the discrepancy is visible.
+
+    Args:
+        job_result: One job of the model's analysis (modified in place)
+        local_result: The matching entry of score_jobs(), or None
+
+    Returns:
+        dict: The job result
+    """
+    matching = normalize_skills(job_result.get("matching_skills") if isinstance(job_result.get("matching_skills"), list) else [])
+    missing = normalize_skills(job_result.get("missing_skills") if isinstance(job_result.get("missing_skills"), list) else [])
+
+    if local_result:
+        found_in_resume = {skill["id"] for skill in normalize_skills(local_result["matching_skills"])}
+        matching += [skill for skill in missing if skill["id"] in found_in_resume and skill not in matching]
+        local_score = local_result["match_percentage"]
+        if not isinstance(job_result.get("match_percentage"), (int, float)) or not job_result.get("match_percentage"):
+            job_result["match_percentage"] = local_score
+            job_result["score_source"] = "local"
+        else:
+            divergence = abs(job_result["match_percentage"] - local_score)
+            if divergence > MATCH_SCORE_TOLERANCE:
+                logger.warning(f"Model match score {job_result['match_percentage']} differs from local score {local_score} for {job_result.get('job_title')}")
+                job_result["score_check"] = {"local_score": local_score, "divergence": int(math.ceil(divergence))}
+
+    matching_ids = {skill["id"] for skill in matching}
+    job_result["matching_skills"] = [skill["name"] for skill in matching]
+    job_result["missing_skills"] = [skill["name"] for skill in missing if skill["id"] not in matching_ids]
+
+    if local_result and not job_result["matching_skills"]:
+        job_result["matching_skills"] = local_result["matching_skills"]
+    if local_result and not job_result["missing_skills"]:
+        job_result["missing_skills"] = [skill for skill in local_result["missing_skills"] if skill not in job_result["matching_skills"]]
+    return job_result
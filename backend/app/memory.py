@@ -0,0 +1,146 @@
+"""
+Process memory module.
+This module reads the memory footprint of worker processes, for the gunicorn memory
+watchdog and the worker-model benchmark, and tracks allocations per endpoint when
+ALLOCATION_TRACKING is enabled.
+
+On Linux it reads /proc directly (a few microseconds), so it is cheap enough to check
+after every request. Elsewhere it falls back to the peak RSS reported by getrusage.
+"""
+
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+from typing import Dict, Tuple, Union
+
+
+PAGE_SIZE = resource.getpagesize()
+
+# Allocation tracking (tracemalloc snapshots around every API request), for investigations only
+ALLOCATION_TRACKING = os.getenv("ALLOCATION_TRACKING", "false").lower() in ("1", "true", "yes")
+ALLOCATION_TRACKING_FRAMES = int(os.getenv("ALLOCATION_TRACKING_FRAMES", "10"))
+
+
+def current_rss_bytes(pid: Union[int, str] = "self") -> int:
+    """
+    Return the resident set size of a process.
+
+    Args:
+        pid: Process id (defaults to the current process)
+
+    Returns:
+        int: Resident bytes, including pages shared with the master and other workers
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as handle:
+            return int(handle.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        if pid != "self":
+            return 0
+        # Peak rather than current RSS; reported in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def memory_breakdown(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """
+    Return the RSS, PSS and private bytes of a process (Linux only, RSS elsewhere).
+
+    PSS divides shared pages between the processes sharing them, so summing it over the
+    master and its workers gives the real footprint of a preforked server; private bytes
+    are what a worker has written to since it was forked.
+
+    Args:
+        pid: Process id (defaults to the current process)
+
+    Returns:
+        dict: {"rss", "pss", "private"} in bytes
+    """
+    breakdown = {"rss": current_rss_bytes(pid), "pss": 0, "private": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            for line in handle:
+                field, _, value = line.partition(":")
+                if field == "Pss":
+                    breakdown["pss"] = int(value.split()[0]) * 1024
+                elif field in ("Private_Clean", "Private_Dirty"):
+                    breakdown["private"] += int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        pass
+    return breakdown
+
+
+class AllocationTracker:
+    """
+    Per-endpoint allocation statistics from tracemalloc snapshots taken around each request.
+
+    Peak is the highest traced memory above the request's starting point; retained is what
+    was still allocated when it finished. Snapshots make requests several times slower and
+    concurrent requests blur each other's numbers, so enable it on a single-threaded
+    worker while investigating, not in normal production.
+    """
+
+    def __init__(self, frames: int = 10, top: int = 10):
+        self.frames = frames
+        self.top = top
+        self._endpoints: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def begin_request(self) -> Tuple[int, tracemalloc.Snapshot]:
+        """Mark the start of a request; pass the result to end_request."""
+        self.start()
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        return current, tracemalloc.take_snapshot()
+
+    def end_request(self, endpoint: str, state: Tuple[int, tracemalloc.Snapshot]) -> Dict[str, int]:
+        """
+        Record the allocations of a finished request.
+
+        Args:
+            endpoint: Route the request was sent to
+            state: Value returned by begin_request
+
+        Returns:
+            dict: {"peak", "retained"} bytes of this request
+        """
+        started_at, before = state
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        exclude = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        growth = [stat for stat in after.filter_traces(exclude).compare_to(before.filter_traces(exclude), "lineno") if stat.size_diff > 0]
+
+        request_stats = {"peak": max(0, peak - started_at), "retained": current - started_at}
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {"requests": 0, "peak_max": 0, "peak_total": 0, "retained_total": 0, "sites": {}})
+            stats["requests"] += 1
+            stats["peak_max"] = max(stats["peak_max"], request_stats["peak"])
+            stats["peak_total"] += request_stats["peak"]
+            stats["retained_total"] += request_stats["retained"]
+            for stat in growth[: self.top]:
+                site = str(stat.traceback[0])
+                stats["sites"][site] = stats["sites"].get(site, 0) + stat.size_diff
+        return request_stats
+
+    def report(self) -> Dict[str, Dict]:
+        """Return per-endpoint request count, average and max peak, total retained bytes and top retaining sites."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": stats["requests"],
+                    "peak_avg_bytes": stats["peak_total"] // stats["requests"],
+                    "peak_max_bytes": stats["peak_max"],
+                    "retained_bytes": stats["retained_total"],
+                    "top_retaining_sites": dict(sorted(stats["sites"].items(), key=lambda item: item[1], reverse=True)[: self.top]),
+                }
+                for endpoint, stats in self._endpoints.items()
+            }
+
+
+allocation_tracker = AllocationTracker(frames=ALLOCATION_TRACKING_FRAMES) if ALLOCATION_TRACKING else None
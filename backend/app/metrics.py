@@ -0,0 +1,178 @@
+"""
+Metrics module.
+This module collects request, Gemini, parsing and extraction metrics in-process and
+renders them in the Prometheus text exposition format for the /api/metrics endpoint.
+
+Every metric guards its samples with its own lock held only for a dictionary update,
+so collection is cheap enough to stay enabled in production.
+"""
+
+import bisect
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+
+# Latency buckets in seconds, from fast local work to slow Gemini generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+# Size buckets in bytes, up to the 2MB upload limit
+SIZE_BUCKETS = (16384, 65536, 131072, 262144, 524288, 1048576, 2097152)
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {value:g}" for key, value in values]
+
+
+class Gauge(Counter):
+    """A value per label set that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """Observations counted into cumulative buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[Tuple[str, str], ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (plus +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """The set of metrics exposed by this process."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._register(Gauge(name, description))
+
+    def histogram(self, name: str, description: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# HTTP routes
+HTTP_REQUEST_DURATION = REGISTRY.histogram("jobfit_http_request_duration_seconds", "Latency of API requests by route, method and status")
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge("jobfit_http_requests_in_flight", "API requests currently being handled")
+
+# Gemini calls
+GEMINI_REQUEST_DURATION = REGISTRY.histogram("jobfit_gemini_request_duration_seconds", "Latency of Gemini generate_content calls by generator, model and outcome")
+GEMINI_REQUESTS_IN_FLIGHT = REGISTRY.gauge("jobfit_gemini_requests_in_flight", "Gemini calls currently waiting for a response")
+GEMINI_TOKENS = REGISTRY.counter("jobfit_gemini_tokens_total", "Tokens reported in Gemini usage metadata by generator and direction (input/output)")
+PROMPT_TOKENS = REGISTRY.counter("jobfit_prompt_tokens_total", "Estimated tokens of rendered prompts by template and part (instructions/body)")
+MODEL_ROUTES = REGISTRY.counter("jobfit_model_routes_total", "Gemini calls routed to a model tier by generator and tier")
+MODEL_ESCALATIONS = REGISTRY.counter("jobfit_model_escalations_total", "Calls retried on a stronger model after a response failed JSON parsing or validation")
+MODEL_FALLBACKS = REGISTRY.counter("jobfit_model_fallbacks_total", "Routed calls retried on GEMINI_MODEL because their model was not found")
+
+# Response parsing
+JSON_FAILURES = REGISTRY.counter("jobfit_json_failures_total", "AI responses that failed JSON parsing (stage=parse) or still failed after repair (stage=repair), by module")
+
+# PDF extraction
+PDF_EXTRACTION_DURATION = REGISTRY.histogram("jobfit_pdf_extraction_duration_seconds", "Time spent extracting text from PDF uploads by backend")
+PDF_EXTRACTION_BYTES = REGISTRY.histogram("jobfit_pdf_extraction_bytes", "Size of PDF uploads passed to extraction by backend", SIZE_BUCKETS)
+
+# Concurrent pipelines
+PIPELINE_QUEUE_DEPTH = REGISTRY.gauge("jobfit_pipeline_queue_depth", "Pipeline stages submitted but not yet started")
+PIPELINE_STAGES_IN_FLIGHT = REGISTRY.gauge("jobfit_pipeline_stages_in_flight", "Pipeline stages currently running")
+
+
+def record_json_failure(module: str, stage: str = "parse") -> None:
+    """
+    Count an AI response that could not be parsed as JSON.
+
+    Args:
+        module: Module that parsed the response (e.g. "ats_analyzer")
+        stage: "parse" for a failed first attempt, "repair" when cleanup did not help either
+    """
+    JSON_FAILURES.inc(module=module, stage=stage)
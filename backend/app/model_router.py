@@ -0,0 +1,281 @@
+"""
+Model routing module.
+This module picks the Gemini model for each call from the rules in
+data/model_routing.json, so short auxiliary calls (requirement extraction, a brief
+email reply) go to a small model while the analyses stay on the default one.
+
+A rule matches on the generator, the estimated input tokens and the requested output
+size; the first matching rule names a tier, and tiers map to the models configured in
+gemini_config. When a response fails JSON parsing or validation, the call is retried
+once on the next tier of the escalation order, and a model the API does not find is
+replaced by GEMINI_MODEL for the rest of the process. Observed latency is kept per model,
+with the input sizes it was measured at, so the rules can be tuned from real traffic.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .gemini_config import GEMINI_MODEL, GEMINI_SMALL_MODEL, GEMINI_STRONG_MODEL
+from .metrics import MODEL_ESCALATIONS, MODEL_FALLBACKS, MODEL_ROUTES
+from .token_budget import estimate_tokens
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_ROUTING_PATH = os.getenv("MODEL_ROUTING_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "model_routing.json"))
+
+# "rules" routes with the rules file, "off" sends every call to GEMINI_MODEL
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "rules").strip().lower()
+MODEL_ESCALATION_ENABLED = os.getenv("MODEL_ESCALATION_ENABLED", "true").lower() != "false"
+
+# Latency samples kept per model for the statistics
+MODEL_LATENCY_SAMPLES = int(os.getenv("MODEL_LATENCY_SAMPLES", "500"))
+
+TIER_MODELS: Dict[str, str] = {"small": GEMINI_SMALL_MODEL, "default": GEMINI_MODEL, "strong": GEMINI_STRONG_MODEL}
+
+JSON_OBJECT_PATTERN = re.compile(r"({[\s\S]*})")
+JSON_ARRAY_PATTERN = re.compile(r"(\[[\s\S]*\])")
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+
+_routing: Optional[Dict[str, Any]] = None
+_routing_lock = threading.Lock()
+_latency: Dict[str, Deque[Tuple[float, int, str, str]]] = {}
+_latency_lock = threading.Lock()
+# Models the API reported as not found; their calls go to GEMINI_MODEL instead
+_unavailable_models: Set[str] = set()
+
+
+def load_routing(path: str = MODEL_ROUTING_PATH) -> Dict[str, Any]:
+    """
+    Load and check the routing rules.
+
+    Args:
+        path: Path of the JSON rules file
+
+    Returns:
+        dict: The routing configuration (default_tier, escalation, rules)
+
+    Raises:
+        ValueError: If a rule or the escalation order names an unknown tier
+    """
+    with open(path, encoding="utf-8") as f:
+        routing = json.load(f)
+
+    routing.setdefault("default_tier", "default")
+    routing.setdefault("escalation", ["small", "default", "strong"])
+    routing.setdefault("rules", [])
+    tiers = [routing["default_tier"]] + routing["escalation"] + [rule.get("tier") for rule in routing["rules"]]
+    unknown = sorted({str(tier) for tier in tiers if tier not in TIER_MODELS})
+    if unknown:
+        raise ValueError(f"Unknown model tier(s) in {path}: {', '.join(unknown)}")
+
+    logger.info(f"Loaded {len(routing['rules'])} model routing rules from {path}")
+    return routing
+
+
+def get_routing() -> Dict[str, Any]:
+    """Return the routing configuration, loading it on first use."""
+    global _routing
+    if _routing is None:
+        with _routing_lock:
+            if _routing is None:
+                _routing = load_routing()
+    return _routing
+
+
+def _rule_matches(rule: Dict[str, Any], generator: str, input_tokens: int, output_tokens: int) -> bool:
+    """Check a rule's generator, input size and output size conditions."""
+    if rule.get("generators") and generator not in rule["generators"]:
+        return False
+    if input_tokens < rule.get("min_input_tokens", 0) or input_tokens > rule.get("max_input_tokens", input_tokens):
+        return False
+    return output_tokens <= rule.get("max_output_tokens", output_tokens)
+
+
+def select_model(generator: str, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+    """
+    Pick the model for a call from the routing rules.
+
+    Args:
+        generator: Name of the calling generator
+        prompt: Prompt to send, used for the input size
+        generation_config: Generation settings, whose max_output_tokens is the output size
+
+    Returns:
+        tuple: (tier, model name)
+    """
+    if MODEL_ROUTING == "off":
+        return "default", GEMINI_MODEL
+
+    routing = get_routing()
+    input_tokens = estimate_tokens(prompt)
+    output_tokens = (generation_config or {}).get("max_output_tokens", 0)
+    tier = next((rule["tier"] for rule in routing["rules"] if _rule_matches(rule, generator, input_tokens, output_tokens)), routing["default_tier"])
+
+    MODEL_ROUTES.inc(generator=generator, tier=tier)
+    return tier, tier_model(tier)
+
+
+def escalation_model(tier: str) -> Optional[Tuple[str, str]]:
+    """
+    Find the tier and model to retry on after a failed response.
+
+    Args:
+        tier: Tier of the failed call
+
+    Returns:
+        tuple: (tier, model name) of the next tier with a different model, or None at the top
+    """
+    if not MODEL_ESCALATION_ENABLED or MODEL_ROUTING == "off":
+        return None
+
+    order = get_routing()["escalation"]
+    if tier not in order:
+        return None
+    for next_tier in order[order.index(tier) + 1 :]:
+        if tier_model(next_tier) != tier_model(tier):
+            return next_tier, tier_model(next_tier)
+    return None
+
+
+def tier_model(tier: str) -> str:
+    """Return the model of a tier, or GEMINI_MODEL when that model was not found."""
+    model_name = TIER_MODELS[tier]
+    return GEMINI_MODEL if model_name in _unavailable_models else model_name
+
+
+def mark_model_unavailable(generator: str, model_name: str) -> None:
+    """
+    Stop routing to a model the API did not find, sending its calls to GEMINI_MODEL instead.
+
+    Args:
+        generator: Name of the calling generator
+        model_name: Model that was not found
+    """
+    _unavailable_models.add(model_name)
+    MODEL_FALLBACKS.inc(generator=generator, model=model_name)
+    logger.warning(f"Model {model_name} was not found, routing its calls to {GEMINI_MODEL}")
+
+
+def record_escalation(generator: str, from_model: str, to_model: str) -> None:
+    """Count a call retried on a stronger model after its response failed validation."""
+    MODEL_ESCALATIONS.inc(generator=generator, from_model=from_model, to_model=to_model)
+    logger.warning(f"Response of {generator} from {from_model} failed validation, retrying on {to_model}")
+
+
+def json_validator(*required_fields: str, array: bool = False) -> Callable[[str], bool]:
+    """
+    Build a check that a response holds parseable JSON with the required fields.
+
+    Trailing commas are tolerated, as the generators repair them; anything worse counts
+    as a failed parse and escalates the call.
+
+    Args:
+        *required_fields: Keys the JSON object must contain
+        array: Whether the response is a JSON array instead of an object
+
+    Returns:
+        Callable: Function of the response text returning whether it is valid
+    """
+
+    def validate(text: str) -> bool:
+        match = (JSON_ARRAY_PATTERN if array else JSON_OBJECT_PATTERN).search(text or "")
+        if not match:
+            return False
+        try:
+            data = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            try:
+                data = json.loads(TRAILING_COMMA_PATTERN.sub(r"\1", match.group(1)))
+            except json.JSONDecodeError:
+                return False
+        if array:
+            return isinstance(data, list)
+        return isinstance(data, dict) and all(field in data for field in required_fields)
+
+    return validate
+
+
+def record_latency(model_name: str, generator: str, seconds: float, input_tokens: int, outcome: str) -> None:
+    """
+    Keep a latency sample of a model call for the routing statistics.
+
+    Args:
+        model_name: Model that answered
+        generator: Name of the calling generator
+        seconds: Call latency
+        input_tokens: Input tokens of the call
+        outcome: Call outcome (success, empty, error)
+    """
+    with _latency_lock:
+        samples = _latency.get(model_name)
+        if samples is None:
+            samples = _latency[model_name] = deque(maxlen=MODEL_LATENCY_SAMPLES)
+        samples.append((seconds, input_tokens, generator, outcome))
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _summarize(samples: List[Tuple[float, int, str, str]]) -> Dict[str, Any]:
+    """Summarize latency samples as call count, error rate, percentiles and input size."""
+    latencies = sorted(sample[0] for sample in samples)
+    input_tokens = [sample[1] for sample in samples]
+    return {
+        "calls": len(samples),
+        "error_rate": round(sum(1 for sample in samples if sample[3] != "success") / len(samples), 3),
+        "p50_ms": round(_percentile(latencies, 0.5) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+        "mean_input_tokens": round(sum(input_tokens) / len(samples)),
+        "ms_per_1k_input_tokens": round(sum(latencies) * 1000 / max(sum(input_tokens) / 1000, 1e-9), 1),
+    }
+
+
+def latency_stats() -> Dict[str, Any]:
+    """
+    Summarize the observed latency per model, overall and per generator.
+
+    Returns:
+        dict: Model name -> latency summary with a "generators" breakdown
+    """
+    with _latency_lock:
+        snapshot = {model_name: list(samples) for model_name, samples in _latency.items()}
+
+    stats = {}
+    for model_name, samples in snapshot.items():
+        if not samples:
+            continue
+        by_generator: Dict[str, List] = {}
+        for sample in samples:
+            by_generator.setdefault(sample[2], []).append(sample)
+        stats[model_name] = {**_summarize(samples), "generators": {generator: _summarize(group) for generator, group in sorted(by_generator.items())}}
+    return stats
+
+
+def describe_routing() -> Dict[str, Any]:
+    """
+    Describe the routing configuration with the latency observed so far.
+
+    Returns:
+        dict: Mode, tier models, rules, escalation order and per-model latency
+    """
+    routing = get_routing() if MODEL_ROUTING != "off" else {"default_tier": "default", "escalation": [], "rules": []}
+    return {
+        "mode": MODEL_ROUTING,
+        "escalation_enabled": MODEL_ESCALATION_ENABLED,
+        "tiers": TIER_MODELS,
+        "unavailable_models": sorted(_unavailable_models),
+        "default_tier": routing["default_tier"],
+        "escalation": routing["escalation"],
+        "rules": routing["rules"],
+        "latency": latency_stats(),
+    }
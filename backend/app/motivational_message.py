@@ -6,17 +6,19 @@ is applying for the position and why they should be hired.
 
 from typing import Any, Dict
 
-import google.generativeai as genai
+from .gemini_client import generate_content
+from .prompts import render_prompt
+from .timing import timed_generator
 
-from .gemini_config import GEMINI_MODEL
 
-
-def generate_motivational_letter(job_details: Dict[str, str]) -> Dict[str, Any]:
+@timed_generator("motivational_letter")
+def generate_motivational_letter(job_details: Dict[str, str], resume_profile: str = "") -> Dict[str, Any]:
     """
     Generate a motivational letter for a job application.
 
     Args:
         job_details: Dictionary containing job title, company name, and job description
+        resume_profile: Optional candidate profile (resume_profile.format_profile) to personalize the letter
 
     Returns:
         dict: Contains success status and either the motivational letter or error message
@@ -34,42 +36,23 @@ def generate_motivational_letter(job_details: Dict[str, str]) -> Dict[str, Any]:
 
         # Add job description if provided
         if job_description and job_description.strip():
-            job_context += f"""
-            The job description is as follows:
-            {job_description}
-            
-            Use specific details from this job description in the letter.
-            """
-
-        # Create prompt for motivational letter generation
-        prompt = f"""
-        You are a professional career advisor helping a job applicant write a brief motivational letter.
-        Create a compelling motivational letter for the following position:
-        
-        {job_context}
+            job_context += f"\nThe job description is as follows:\n{job_description}\n\nUse specific details from this job description in the letter.\n"
 
-        The motivational letter should:
-        1. Explain why the candidate is interested in this position/company
-        2. Highlight their relevant skills and qualifications without listing their entire resume
-        3. Demonstrate understanding of the role and industry
-        4. Express enthusiasm and passion for the field
-        5. Explain what makes them a unique fit for this position
-        6. Include a professional opening and closing
-        7. Be 1-2 paragraphs in length
-        8. Have a confident but not arrogant tone
+        # Ground the candidate's fit in their actual background when their profile is known
+        if resume_profile:
+            job_context += f"\nThe candidate's profile is as follows:\n{resume_profile}\n\nBase their skills and fit on this profile and do not invent experience.\n"
 
-        Focus on explaining motivation and fit rather than detailed work history.
-        """
+        # Create prompt for motivational letter generation
+        prompt = render_prompt("motivational_letter", job_context=job_context)
 
         # Generate motivational letter
-        model = genai.GenerativeModel(GEMINI_MODEL)
         model_config = {
             "temperature": 0.7,
             "top_p": 0.8,
             "top_k": 40,
             "max_output_tokens": 1024,
         }
-        response = model.generate_content(prompt, generation_config=model_config)
+        response = generate_content(prompt, generation_config=model_config, generator="motivational_letter")
 
         if response and response.text:
             return {"success": True, "letter": response.text.strip()}
@@ -0,0 +1,180 @@
+"""
+Request profiling module.
+This module profiles a single API request on demand, so real production payloads can be
+profiled without redeploying with instrumentation.
+
+Profiling is off unless PROFILING_ENABLED is set. A request then opts in with the
+X-Profile header ("cprofile" for a deterministic profile, "sampling" for a statistical
+one) and, when PROFILING_TOKEN is set, a matching X-Profile-Token header.
+
+- cprofile records every call of the request thread and produces a pstats file
+  (open it with `python -m pstats` or snakeviz).
+- sampling snapshots the request thread's stack every PROFILE_SAMPLE_INTERVAL_MS and
+  produces collapsed stacks (feed them to flamegraph.pl or speedscope). It adds almost
+  no overhead to the profiled code.
+
+The artifact is returned as a download in place of the response body (X-Profile-Output:
+download, the default when PROFILE_OUTPUT_DIR is unset), or written to PROFILE_OUTPUT_DIR
+with its file name in the X-Profile-Artifact response header (X-Profile-Output: file).
+Streamed responses always use a file, since their headers are sent before the work is done.
+"""
+
+import collections
+import cProfile
+import hmac
+import logging
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_OUTPUT_HEADER = "X-Profile-Output"
+
+PROFILERS = ("cprofile", "sampling")
+
+
+class StackSampler:
+    """Statistical profiler sampling the stack of one thread from a background thread."""
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks: Dict[str, int] = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Return the samples in the collapsed stack format ("frame;frame;frame count" per line)."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+def _short_path(path: str) -> str:
+    """Keep the last two components of a source path, enough to tell app code from libraries."""
+    parts = path.replace("\\", "/").rsplit("/", 2)
+    return "/".join(parts[-2:])
+
+
+class RequestProfile:
+    """A profiler running around one request."""
+
+    def __init__(self, kind: str, output: str, label: str):
+        self.kind = kind
+        self.output = output
+        self.label = label
+        self.started = time.time()
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+
+    def start(self) -> None:
+        if self.kind == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+    def artifact(self) -> Tuple[str, bytes, str]:
+        """
+        Serialize the profile.
+
+        Returns:
+            tuple: (file name, content, mimetype)
+        """
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(self.started)) + f"{self.started % 1:.3f}"[1:]
+        base = f"profile-{self.label}-{stamp}-{os.getpid()}"
+        if self._profiler is not None:
+            self._profiler.create_stats()
+            return f"{base}.pstats", marshal.dumps(self._profiler.stats), "application/octet-stream"
+        return f"{base}.collapsed.txt", self._sampler.collapsed().encode("utf-8"), "text/plain"
+
+    def save(self, directory: Optional[str] = None) -> str:
+        """
+        Write the profile to a directory.
+
+        Args:
+            directory: Target directory (defaults to PROFILE_OUTPUT_DIR, then the system temp directory)
+
+        Returns:
+            str: Path of the written file
+        """
+        directory = directory or PROFILE_OUTPUT_DIR or os.path.join(tempfile.gettempdir(), "jobfit-profiles")
+        os.makedirs(directory, exist_ok=True)
+        filename, content, _ = self.artifact()
+        path = os.path.join(directory, filename)
+        with open(path, "wb") as handle:
+            handle.write(content)
+        logger.info(f"Wrote {self.kind} profile of {self.label} to {path}")
+        return path
+
+
+def start_request_profile(headers: Mapping[str, str], label: str) -> Optional[RequestProfile]:
+    """
+    Start profiling the current request if profiling is enabled and the request asks for it.
+
+    Args:
+        headers: Request headers
+        label: Name of the profiled route, used in the artifact name
+
+    Returns:
+        RequestProfile or None: The running profile, or None if the request is not profiled
+    """
+    if not PROFILING_ENABLED:
+        return None
+
+    kind = (headers.get(PROFILE_HEADER) or "").strip().lower()
+    if not kind:
+        return None
+    if kind not in PROFILERS:
+        logger.warning(f"Unknown profiler '{kind}' requested, expected one of {', '.join(PROFILERS)}")
+        return None
+    if PROFILING_TOKEN and not hmac.compare_digest(headers.get(PROFILE_TOKEN_HEADER, ""), PROFILING_TOKEN):
+        logger.warning("Profiling requested with a missing or invalid token")
+        return None
+
+    output = (headers.get(PROFILE_OUTPUT_HEADER) or ("file" if PROFILE_OUTPUT_DIR else "download")).strip().lower()
+    profile = RequestProfile(kind, "file" if output == "file" else "download", label)
+    profile.start()
+    return profile
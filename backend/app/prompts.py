@@ -0,0 +1,759 @@
+"""
+Prompt template module.
+This module is the registry of the prompts sent to Gemini: one versioned template per
+generator.
+
+A template has two parts. The instructions are the fixed part: the role, the task, the
+rules and the JSON structure to return. They come first and are the same on every call,
+so the model provider's prefix caching can reuse them across requests. The body holds
+the per-request content (the resume, the job, the language and tone instructions) after
+them. Both are dedented, so the indentation of the source does not reach the model.
+
+Both parts are str.format templates (literal braces are doubled). Fields of the
+instructions may only take values that are fixed for a deployment, such as limits read
+from settings; anything that varies per request belongs in the body.
+
+Every template has a version and a key (its name, version and a hash of its text).
+Caches of model responses include the key, so editing a prompt invalidates the responses
+it produced. Bump the version when a change should be visible in logs and /api/prompts.
+"""
+
+import logging
+import re
+import textwrap
+import threading
+from typing import Any, Dict, List, Optional
+
+from .cache import content_hash
+from .metrics import PROMPT_TOKENS
+from .token_budget import estimate_tokens
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+
+
+class PromptTemplate:
+    """A versioned prompt: fixed instructions followed by a body of per-request content."""
+
+    def __init__(self, name: str, version: int, instructions: str, body: str):
+        self.name = name
+        self.version = version
+        self.instructions = textwrap.dedent(instructions).strip()
+        self.body = textwrap.dedent(body).strip()
+        self.key = f"{name}:v{version}:{content_hash(self.instructions + chr(0) + self.body)[:12]}"
+        self._prefix = None
+        self._prefix_tokens = None
+        self._lock = threading.Lock()
+
+    def render(self, **values: Any) -> str:
+        """
+        Render the prompt.
+
+        Args:
+            **values: Values of the fields of the instructions and the body
+
+        Returns:
+            str: The instructions, a blank line and the body, with empty optional parts
+                leaving no runs of blank lines
+        """
+        prefix = self.instructions.format(**values)
+        body = BLANK_LINES_PATTERN.sub("\n\n", self.body.format(**values)).strip()
+        with self._lock:
+            if prefix != self._prefix:
+                if self._prefix is not None:
+                    logger.warning(f"Instructions of prompt template {self.name} changed between calls; per-request values belong in the body")
+                self._prefix, self._prefix_tokens = prefix, estimate_tokens(prefix)
+            prefix_tokens = self._prefix_tokens
+        PROMPT_TOKENS.inc(prefix_tokens, template=self.name, part="instructions")
+        PROMPT_TOKENS.inc(estimate_tokens(body), template=self.name, part="body")
+        return f"{prefix}\n\n{body}"
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the name, version, key and instruction tokens of the template (None until first rendered)."""
+        return {"name": self.name, "version": self.version, "key": self.key, "instruction_tokens": self._prefix_tokens}
+
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {}
+
+
+def register_template(name: str, version: int, instructions: str, body: str) -> PromptTemplate:
+    """
+    Register a prompt template, replacing any template of the same name.
+
+    Args:
+        name: Template name, the generator name used in metrics and timings
+        version: Template version
+        instructions: Fixed instructions placed first
+        body: Per-request content placed after the instructions
+
+    Returns:
+        PromptTemplate: The registered template
+    """
+    template = PromptTemplate(name, version, instructions, body)
+    PROMPT_TEMPLATES[name] = template
+    return template
+
+
+def render_prompt(name: str, **values: Any) -> str:
+    """Render a registered template (see PromptTemplate.render)."""
+    return PROMPT_TEMPLATES[name].render(**values)
+
+
+def template_key(name: str) -> str:
+    """Return the key (name, version and text hash) of a registered template, for cache keys."""
+    return PROMPT_TEMPLATES[name].key
+
+
+def custom_instructions_text(custom_instructions: str) -> str:
+    """Render a user's custom instructions for a template body ("" when there are none)."""
+    if not custom_instructions or not custom_instructions.strip():
+        return ""
+    return f"Additional customization requirements:\n{custom_instructions}"
+
+
+def describe_templates(names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Describe the registered templates.
+
+    Args:
+        names: Optional template names (defaults to all of them)
+
+    Returns:
+        list: PromptTemplate.describe() of each template, by name
+    """
+    return [PROMPT_TEMPLATES[name].describe() for name in sorted(names or PROMPT_TEMPLATES)]
+
+
+register_template(
+    "analysis",
+    version=1,
+    instructions="""
+        You are a professional resume analyzer. Analyze the resume content below against the job details provided after it.
+
+        IMPORTANT INSTRUCTIONS:
+        1. For each job, analyze what skills and qualifications are required based on the job description.
+        2. Compare these requirements against the resume content.
+        3. Provide a match percentage based on how well the resume matches the job requirements.
+        4. Identify matching skills present in the resume that align with the job.
+        5. Identify skills mentioned in the job that might be missing or need improvement in the resume.
+        6. Provide at least 3 specific, actionable recommendations for each job.
+        7. For matches above 75%, focus on how to excel in the role rather than just qualify.
+        8. Recommendations should be tailored to the specific job and company.
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "jobs": [
+                {{
+                    "job_title": "<job title from input>",
+                    "company_name": "<company name from input>",
+                    "job_link": "<job link from input if available>",
+                    "match_percentage": <number 0-100>,
+                    "matching_skills": [<list of matching skills>],
+                    "missing_skills": [<list of missing skills>],
+                    "job_description": "<job description from input>",
+                    "recommendations": [
+                        "Specific recommendation 1",
+                        "Specific recommendation 2",
+                        "Specific recommendation 3"
+                    ]
+                }}
+            ]
+        }}
+        """,
+    body="""
+        Resume content to analyze:
+        {resume}
+
+        Job details to analyze against:
+        {jobs}
+
+        {custom_instructions}
+        """,
+)
+
+register_template(
+    "resume_review",
+    version=1,
+    instructions="""
+        You are a professional resume reviewer and career coach. Review the resume sections below against the job description
+        and provide detailed, actionable feedback to help improve the resume.
+
+        Review each section on its own: its strengths, its weaknesses, and specific suggestions,
+        including job keywords it should mention. Formatting is checked separately; do not comment on it.
+
+        IMPORTANT: Your response must be a valid JSON object with the exact structure shown below,
+        with one entry per section key. Do not include any explanations, markdown, or text outside of the JSON object.
+
+        JSON structure to use:
+        {{
+            "sections": [
+                {{
+                    "section": "<section key, e.g. experience>",
+                    "strengths": ["Detailed strength point 1", "Detailed strength point 2"],
+                    "weaknesses": ["Area for improvement 1", "Area for improvement 2"],
+                    "suggestions": ["Specific suggestion 1", "Specific suggestion 2"]
+                }}
+            ]
+        }}
+        """,
+    body="""
+        Resume sections (each starts with its [key]):
+        {resume}
+
+        Job description:
+        {job_description}
+
+        {custom_instructions}
+        """,
+)
+
+register_template(
+    "ats_analysis",
+    version=1,
+    instructions="""
+        You are an Applicant Tracking System (ATS) expert. Analyze the resume below for ATS compatibility.
+
+        An automated check of the extracted text has already found the mechanical issues listed with the resume
+        (headings, bullets, dates, contact details, tables/columns, length).
+        Take these findings as given: do not re-check or repeat them, but reflect them in the score.
+        Evaluate what the automated check cannot:
+        1. Keyword optimization and use of industry terminology
+        2. Whether achievements and job titles are stated clearly enough to be parsed and matched
+        3. Content and wording issues that would hurt ranking
+        4. Font, graphics and header/footer placement hinted at by the text
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "ats_score": <number 0-100>,
+            "summary": "<short summary of ATS compatibility>",
+            "format_issues": [
+                "<issue 1>",
+                "<issue 2>"
+            ],
+            "content_issues": [
+                "<issue 1>",
+                "<issue 2>"
+            ],
+            "keyword_issues": [
+                "<issue 1>",
+                "<issue 2>"
+            ],
+            "improvement_suggestions": [
+                "<suggestion 1>",
+                "<suggestion 2>",
+                "<suggestion 3>"
+            ],
+            "good_practices": [
+                "<good practice 1>",
+                "<good practice 2>"
+            ]
+        }}
+        """,
+    body="""
+        Mechanical issues found by the automated check (rule score {rule_score}/100):
+        {findings}
+
+        Resume content:
+        {resume}
+        """,
+)
+
+register_template(
+    "ats_optimize",
+    version=1,
+    instructions="""
+        You are an ATS optimization expert. Generate optimized resume sections based on the job description below.
+
+        Analyze the job description and the current resume, then provide ATS-optimized versions of the parts listed after them.
+
+        Make sure to:
+        - Incorporate relevant keywords from the job description
+        - Use industry-standard section headings
+        - Balance keyword optimization with readability
+        - Focus on quantifiable achievements
+        - Only use content that appears in the original resume (don't invent new experiences)
+
+        Important: Use proper JSON formatting with double quotes around all strings and property names.
+        """,
+    body="""
+        Resume content:
+        {resume}
+
+        Job description:
+        {job_description}
+
+        Parts to optimize:
+        {parts}
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+        {structure}
+        }}
+        """,
+)
+
+register_template(
+    "cover_letter",
+    version=1,
+    instructions="""
+        You are a professional cover letter writer. Create a compelling cover letter for the position below.
+
+        Write a professional cover letter that:
+        1. Has a formal business letter format
+        2. Shows enthusiasm for the role and company
+        3. Mentions relevant skills for the position
+        4. Highlights leadership and team collaboration experience
+        5. Demonstrates problem-solving abilities and technical expertise
+        6. Includes:
+           - Professional greeting
+           - 3-4 strong paragraphs
+           - Professional closing
+           - Proper spacing and formatting
+
+        Keep the tone professional but enthusiastic. Focus on how the applicant's skills and experience
+        match the job requirements.
+        """,
+    body="""
+        Job Details:
+        {job_context}
+
+        {candidate_context}
+
+        {language_instruction}
+
+        {custom_instructions}
+        """,
+)
+
+register_template(
+    "motivational_letter",
+    version=1,
+    instructions="""
+        You are a professional career advisor helping a job applicant write a brief motivational letter.
+        Create a compelling motivational letter for the position below.
+
+        The motivational letter should:
+        1. Explain why the candidate is interested in this position/company
+        2. Highlight their relevant skills and qualifications without listing their entire resume
+        3. Demonstrate understanding of the role and industry
+        4. Express enthusiasm and passion for the field
+        5. Explain what makes them a unique fit for this position
+        6. Include a professional opening and closing
+        7. Be 1-2 paragraphs in length
+        8. Have a confident but not arrogant tone
+
+        Focus on explaining motivation and fit rather than detailed work history.
+        """,
+    body="""
+        {job_context}
+        """,
+)
+
+register_template(
+    "email_reply",
+    version=1,
+    instructions="""
+        You are a professional email writer. Create a well-crafted reply to the email below.
+
+        Your email reply should:
+        1. Include an appropriate greeting
+        2. Acknowledge the original email's content
+        3. Address all questions or requests from the original email
+        4. Be concise but thorough
+        5. Include a professional closing
+        6. Have proper formatting for a business email
+
+        IMPORTANT: If the original email is not clear or incomplete, make reasonable assumptions
+        to craft a helpful response, but note any areas where more information might be needed.
+        """,
+    body="""
+        Original email:
+        {email}
+
+        {language_instruction}
+        {tone_instruction}
+        """,
+)
+
+register_template(
+    "interview_questions",
+    version=1,
+    instructions="""
+        You are an expert interview coach preparing candidates for job interviews. Generate interview questions based on the job below.
+
+        Create a set of 8 interview questions that would likely be asked for this position, organized into these categories:
+        1. Technical Skills Questions (2 questions): Questions about technical abilities and hard skills required
+        2. Behavioral Questions (2 questions): Scenario-based questions about past experiences
+        3. Role-Specific Questions (2 questions): Questions unique to this particular role
+        4. Company/Industry Knowledge (1 question): Questions testing understanding of the company or industry
+        5. Problem-Solving Questions (1 question): Questions that assess analytical thinking
+
+        For each question, include:
+        - The actual question
+        - The category it belongs to
+        - Difficulty level (Easy, Medium, Hard)
+        - 2-3 key points that should be addressed in an ideal answer
+        - A brief note on why this question matters for this role
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "questions": [
+                {{
+                    "id": 1,
+                    "question": "Question text",
+                    "category": "Technical Skills|Behavioral|Role-Specific|Company Knowledge|Problem-Solving",
+                    "difficulty": "Easy|Medium|Hard",
+                    "key_points": ["Key point 1", "Key point 2", "Key point 3"],
+                    "importance": "Why this question matters for this role"
+                }},
+                // more questions...
+            ],
+            "preparation_tips": [
+                "General tip 1 for this interview",
+                "General tip 2 for this interview"
+            ],
+            "key_skills_to_emphasize": [
+                "Skill 1",
+                "Skill 2"
+            ]
+        }}
+
+        Ensure the JSON is properly formatted with exactly 8 questions total, distributed as specified across categories.
+        Use double quotes for all keys and string values. Ensure all arrays and objects are properly terminated with appropriate brackets and commas.
+        """,
+    body="""
+        {job_context}
+        """,
+)
+
+register_template(
+    "company_research",
+    version=1,
+    instructions="""
+        You are preparing a job candidate for an interview with the company named below.
+
+        Generate a list of 5-8 company research points that would be helpful for the candidate to investigate before the interview.
+
+        These points should help the candidate:
+        1. Understand the company's business model and products/services
+        2. Learn about the company's culture, values, and mission
+        3. Identify talking points that show interest in the company
+        4. Prepare for company-specific questions
+
+        Format your response as a JSON array of research points:
+        [
+            "Research point 1",
+            "Research point 2",
+            "Research point 3",
+            "Research point 4",
+            "Research point 5"
+        ]
+
+        Keep each point concise and actionable.
+        """,
+    body="""
+        Company: {company_name}
+        """,
+)
+
+register_template(
+    "answer_evaluation",
+    version=1,
+    instructions="""
+        You are an expert interview coach evaluating a candidate's answer to an interview question.
+
+        Evaluate the answer on a scale of 1-10 based on the following criteria:
+        1. How well it addresses the key points (60%)
+        2. Clarity and conciseness (20%)
+        3. Relevance to the question (20%)
+
+        Provide a comprehensive analysis of the answer including:
+        1. Overall score (1-10)
+        2. Specific strengths (2-3 points)
+        3. Areas for improvement (2-3 points)
+        4. A sample strong answer for reference
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "score": 7,
+            "feedback": "Your overall analysis of the answer",
+            "strengths": [
+                "Strength 1",
+                "Strength 2"
+            ],
+            "areas_for_improvement": [
+                "Improvement 1",
+                "Improvement 2"
+            ],
+            "sample_answer": "A sample strong answer to this question"
+        }}
+        """,
+    body="""
+        Question: "{question}"
+        Category: {category}
+        Key points that should be addressed:
+        {key_points}
+
+        Candidate's answer: "{answer}"
+        """,
+)
+
+register_template(
+    "overall_feedback",
+    version=1,
+    instructions="""
+        You are an expert interview coach. Based on the interview evaluation data below, provide comprehensive feedback to the candidate.
+
+        Please provide:
+        1. An overall assessment of the candidate's interview performance
+        2. 3-5 key strengths consolidated from the evaluations
+        3. 3-5 key areas for improvement
+        4. 3-5 specific next steps or practice recommendations
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "overall_feedback": "Comprehensive assessment of the candidate's performance",
+            "strengths": [
+                "Key strength 1",
+                "Key strength 2",
+                "Key strength 3"
+            ],
+            "areas_for_improvement": [
+                "Area for improvement 1",
+                "Area for improvement 2",
+                "Area for improvement 3"
+            ],
+            "next_steps": [
+                "Specific recommendation 1",
+                "Specific recommendation 2",
+                "Specific recommendation 3"
+            ]
+        }}
+        """,
+    body="""
+        Overall Score: {average_score}/10
+        Readiness Level: {readiness_level}
+
+        Strongest Categories: {strongest_categories}
+        Areas Needing Improvement: {weakest_categories}
+
+        Individual Strengths Identified:
+        {strengths}
+
+        Individual Areas for Improvement:
+        {improvement_areas}
+        """,
+)
+
+register_template(
+    "learning_recommendations",
+    version=1,
+    instructions="""
+        You are a career development advisor specializing in technical skills. Provide learning resources for the skills listed below.
+
+        For each skill, recommend:
+        1. 1-2 online courses (free or paid, with platform names)
+        2. 1-2 articles or tutorials (with website names)
+        3. 1-2 YouTube channels or specific videos
+        4. A brief learning path from beginner to advanced
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "recommendations": [
+                {{
+                    "skill": "<skill name>",
+                    "courses": [
+                        {{
+                            "title": "<course title>",
+                            "platform": "<platform name>",
+                            "url": "<generic url to platform>",
+                            "is_free": true,
+                            "difficulty": "Beginner/Intermediate/Advanced"
+                        }}
+                    ],
+                    "articles": [
+                        {{
+                            "title": "<article title>",
+                            "source": "<website/source name>",
+                            "url": "<generic url to source>"
+                        }}
+                    ],
+                    "videos": [
+                        {{
+                            "title": "<video/channel title>",
+                            "creator": "<creator name>",
+                            "platform": "YouTube",
+                            "url": "<generic url to youtube>"
+                        }}
+                    ],
+                    "learning_path": "<brief learning path from beginner to advanced>"
+                }}
+            ]
+        }}
+
+        IMPORTANT:
+        - For URLs, provide specific URLs when possible
+        - If you don't know the exact URL, use the format: https://www.platform.com/search?q=title
+        - For YouTube videos: https://www.youtube.com/results?search_query=title
+        - For Coursera courses: https://www.coursera.org/search?query=title
+        - For Udemy courses: https://www.udemy.com/courses/search/?q=title
+        - Use double quotes for all JSON properties and string values
+        - Use true/false without quotes for boolean values
+        """,
+    body="""
+        Skills:
+        {skills}
+        """,
+)
+
+register_template(
+    "learning_plan",
+    version=1,
+    instructions="""
+        You are a technical education specialist. Create a comprehensive learning plan for the skill named below.
+
+        Provide a detailed learning plan that includes:
+        1. A learning roadmap from beginner to expert level
+        2. Key concepts to master at each stage
+        3. Recommended projects to build for practice
+        4. Best resources for each level (courses, books, documentation)
+        5. Estimated time investment for each level
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "skill": "<the skill name as given>",
+            "overview": "<brief overview of the skill and its importance>",
+            "levels": [
+                {{
+                    "level": "Beginner",
+                    "description": "<description of this level>",
+                    "key_concepts": ["<concept 1>", "<concept 2>"],
+                    "resources": [
+                        {{
+                            "type": "Course/Book/Documentation/Tutorial",
+                            "title": "<title>",
+                            "source": "<platform or author>",
+                            "description": "<brief description>",
+                            "url": "<search URL or direct link if known>"
+                        }}
+                    ],
+                    "projects": ["<project 1>", "<project 2>"],
+                    "estimated_time": "<estimated time to reach next level>"
+                }},
+                {{
+                    "level": "Intermediate",
+                    "description": "<description of this level>",
+                    "key_concepts": ["<concept 1>", "<concept 2>"],
+                    "resources": [
+                        {{
+                            "type": "Course/Book/Documentation/Tutorial",
+                            "title": "<title>",
+                            "source": "<platform or author>",
+                            "description": "<brief description>",
+                            "url": "<search URL or direct link if known>"
+                        }}
+                    ],
+                    "projects": ["<project 1>", "<project 2>"],
+                    "estimated_time": "<estimated time to reach next level>"
+                }},
+                {{
+                    "level": "Advanced",
+                    "description": "<description of this level>",
+                    "key_concepts": ["<concept 1>", "<concept 2>"],
+                    "resources": [
+                        {{
+                            "type": "Course/Book/Documentation/Tutorial",
+                            "title": "<title>",
+                            "source": "<platform or author>",
+                            "description": "<brief description>",
+                            "url": "<search URL or direct link if known>"
+                        }}
+                    ],
+                    "projects": ["<project 1>", "<project 2>"],
+                    "estimated_time": "<estimated time to mastery>"
+                }}
+            ]
+        }}
+
+        IMPORTANT:
+        - For URLs, provide real URLs when possible. If you don't know the specific URL, use search URLs in this format:
+          - For courses on Coursera: https://www.coursera.org/search?query=course+name
+          - For books on Amazon: https://www.amazon.com/s?k=book+title+author
+          - For YouTube videos: https://www.youtube.com/results?search_query=video+topic
+        - Use double quotes for all property names and string values in the JSON
+        - Ensure all arrays and objects are properly formatted
+        """,
+    body="""
+        Skill: {skill}
+        """,
+)
+
+register_template(
+    "job_requirements",
+    version=1,
+    instructions="""
+        Extract the requirements from the job posting below. Use only what the posting states.
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "title": "Job title",
+            "seniority": "intern|junior|mid|senior|staff|principal|lead or null",
+            "min_years": 0,
+            "required_skills": ["Skill"],
+            "preferred_skills": ["Skill"],
+            "requirements": ["Non-skill requirement (degree, domain, language, location)"],
+            "responsibilities": ["Main responsibility"]
+        }}
+
+        List at most {max_items} requirements and {max_items} responsibilities, each under 20 words. min_years is a whole number, or null when not stated.
+        """,
+    body="""
+        Job Title: {job_title}
+        Job Posting:
+        {job_description}
+        """,
+)
+
+register_template(
+    "resume_profile",
+    version=1,
+    instructions="""
+        Extract a compact candidate profile from the resume below. Use only facts stated in the resume.
+
+        Return ONLY a JSON object with this exact structure:
+        {{
+            "headline": "One line: current or most recent title and specialty",
+            "total_years": 0,
+            "roles": [{{"title": "Job title", "company": "Employer", "dates": "Start - End"}}],
+            "achievements": ["Achievement with its number, as stated in the resume"],
+            "education": ["Degree, institution"]
+        }}
+
+        List at most {max_roles} roles (most recent first), {max_achievements} achievements and {max_education} education entries.
+        Only include achievements that carry a number (percentage, amount, count, duration). total_years is a whole number, or null when unknown.
+        """,
+    body="""
+        Resume:
+        {resume}
+        """,
+)
+
+register_template(
+    "resume_condense",
+    version=1,
+    instructions="""
+        Condense the part of a resume below into a compact factual digest of at most the number of words given with it.
+        Keep every employer, job title, date, degree, technology, skill and number. Drop adjectives and filler.
+        Write plain lines in the resume's order, "- " before each fact, with no introduction or commentary.
+        """,
+    body="""
+        Section: {heading}
+        Maximum words: {words}
+
+        {text}
+        """,
+)
@@ -3,78 +3,302 @@ Resume analysis module for processing and analyzing resumes against job descript
 This module handles PDF parsing, text extraction, and AI-based analysis.
 """
 
-import gc
+import importlib.util
 import io
 import json
 import logging
+import mmap
+import os
 import re
-from typing import BinaryIO, Dict, List, Union
-
-import google.generativeai as genai
-from PyPDF2 import PdfReader
-
-from .gemini_config import GEMINI_MODEL
+import time
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
 
 from .ats_analyzer import analyze_ats_compatibility
+from .ats_rules import check_resume
+from .cache import content_hash
+from .gemini_client import generate_content
+from .jd_cleaner import fit_job_description
+from .job_requirements import job_description_for_prompt, job_description_hash, job_descriptions_for_prompt
+from .match_scorer import reconcile_with_local_score, score_jobs
+from .metrics import PDF_EXTRACTION_BYTES, PDF_EXTRACTION_DURATION, record_json_failure
+from .model_router import json_validator
+from .prompts import custom_instructions_text, render_prompt, template_key
+from .resume_condenser import condense_resume, condense_sections
+from .resume_profile import resume_profile_text, top_skills
+from .resume_sections import get_section_results, parse_resume, sections_text, store_section_result
+from .skill_taxonomy import covered_skills, extract_skills, skill_name
+from .text_normalizer import normalize_pages, normalize_text
+from .timing import stage, timed_generator
+from .token_budget import ANALYSIS_JOB_MIN_TOKENS, allocate_input_budget, estimate_prompt_tokens, estimate_tokens, input_allotment, record_usage, split_budget
 
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Maximum content length for job descriptions to prevent token limits
-MAX_JOB_DESCRIPTION_LENGTH = 1500
-MAX_RESUME_CONTENT_LENGTH = 5000
+# PDF extraction backend used when none is requested explicitly.
+# Override per deployment via the PDF_EXTRACTION_BACKEND environment variable.
+DEFAULT_PDF_BACKEND = "pypdf2"
+PDF_EXTRACTION_BACKEND = os.getenv("PDF_EXTRACTION_BACKEND", DEFAULT_PDF_BACKEND).strip().lower()
+
+# "normalize" (default) cleans extracted PDF text (ligatures, hyphenation, spacing, page headers
+# and footers) before it is stored and prompted, and text resumes (TXT uploads, pasted text) the
+# same way apart from the page furniture; "raw" keeps them as received
+PDF_TEXT_NORMALIZATION = os.getenv("PDF_TEXT_NORMALIZATION", "normalize").strip().lower()
 
+# Strengths and weaknesses kept in a review, gathered across its sections
+REVIEW_MAX_POINTS = 5
 
-def extract_text_from_pdf(file_bytes: BinaryIO) -> str:
+# Resume text the analysis prompt carries: "full" (condensed when over budget) or "profile",
+# the resume's ~300-token profile plus its skill list
+ANALYSIS_RESUME_INPUT = os.getenv("ANALYSIS_RESUME_INPUT", "full").strip().lower()
+
+
+def _read_pages_and_release(reader) -> List[str]:
     """
-    Extract text content from a PDF file with memory optimization.
+    Extract the page texts of a PyPDF2/pypdf reader, then drop its object caches.
+
+    Every object the reader resolves points back at the reader, so a finished reader is
+    a reference cycle that only the cyclic garbage collector can free. Emptying the
+    caches breaks the cycle and the parsed document is freed as soon as this returns.
+    """
+    try:
+        return [page.extract_text() or "" for page in reader.pages]
+    finally:
+        reader.resolved_objects.clear()
+        reader.flattened_pages = None
+        reader.trailer.clear()
+
+
+def _extract_pages_pypdf2(stream: BinaryIO) -> List[str]:
+    """Extract page texts with PyPDF2 (the original, always-installed engine)."""
+    from PyPDF2 import PdfReader
+
+    return _read_pages_and_release(PdfReader(stream))
+
+
+def _extract_pages_pypdf(stream: BinaryIO) -> List[str]:
+    """Extract page texts with pypdf, the maintained and faster successor of PyPDF2."""
+    from pypdf import PdfReader
+
+    return _read_pages_and_release(PdfReader(stream))
+
+
+def _extract_pages_pymupdf(stream: BinaryIO) -> List[str]:
+    """Extract page texts with PyMuPDF (C-backed MuPDF), sorting blocks into reading order."""
+    import pymupdf
+
+    with upload_buffer(stream) as buffer, pymupdf.open(stream=buffer, filetype="pdf") as document:
+        return [page.get_text("text", sort=True) for page in document]
+
+
+def _extract_pages_pdfminer(stream: BinaryIO) -> List[str]:
+    """Extract page texts with pdfminer.six, whose layout analysis keeps columns apart."""
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    pages = []
+    for page_layout in extract_pages(stream):
+        pages.append("".join(element.get_text() for element in page_layout if isinstance(element, LTTextContainer)))
+    return pages
+
+
+# Registry of PDF extraction backends: name -> (module that must be importable, extractor).
+# Every extractor takes a seekable binary stream and returns the text of each page in order.
+PDF_EXTRACTION_BACKENDS: Dict[str, tuple] = {
+    "pypdf2": ("PyPDF2", _extract_pages_pypdf2),
+    "pypdf": ("pypdf", _extract_pages_pypdf),
+    "pymupdf": ("pymupdf", _extract_pages_pymupdf),
+    "pdfminer": ("pdfminer", _extract_pages_pdfminer),
+}
+
+
+def register_pdf_backend(name: str, extractor: Callable[[BinaryIO], List[str]], module: Optional[str] = None) -> None:
+    """
+    Register an additional PDF extraction backend.
 
     Args:
-        file_bytes: File object containing the PDF data
+        name: Name used to select the backend (e.g. via PDF_EXTRACTION_BACKEND)
+        extractor: Callable taking a seekable binary stream and returning a list of page texts
+        module: Optional module name that must be importable for the backend to be available
+    """
+    PDF_EXTRACTION_BACKENDS[name.strip().lower()] = (module, extractor)
+
+
+def available_pdf_backends() -> List[str]:
+    """
+    List the registered PDF extraction backends whose dependencies are installed.
 
     Returns:
-        str: Extracted text from the PDF
+        list: Names of the usable backends
+    """
+    return [name for name, (module, _) in PDF_EXTRACTION_BACKENDS.items() if module is None or importlib.util.find_spec(module) is not None]
 
-    Raises:
-        ValueError: If there's an error reading the PDF
+
+def resolve_pdf_backend_name(name: Optional[str] = None) -> str:
+    """
+    Resolve the name of the PDF extraction backend to use, falling back to the default one.
+
+    Args:
+        name: Backend name (defaults to the PDF_EXTRACTION_BACKEND setting)
+
+    Returns:
+        str: Name of an available backend
+    """
+    name = (name or PDF_EXTRACTION_BACKEND).strip().lower()
+    if name not in available_pdf_backends():
+        logger.warning(f"PDF extraction backend '{name}' is not available, using '{DEFAULT_PDF_BACKEND}'")
+        name = DEFAULT_PDF_BACKEND
+    return name
+
+
+def get_pdf_backend(name: Optional[str] = None) -> Callable[[BinaryIO], List[str]]:
+    """
+    Resolve a PDF extraction backend by name, falling back to the default one.
+
+    Args:
+        name: Backend name (defaults to the PDF_EXTRACTION_BACKEND setting)
+
+    Returns:
+        callable: The extractor function of the resolved backend
+    """
+    return PDF_EXTRACTION_BACKENDS[resolve_pdf_backend_name(name)][1]
+
+
+def upload_stream(file: BinaryIO) -> BinaryIO:
+    """
+    Return the seekable stream behind an upload, rewound to the start.
+
+    Werkzeug's FileStorage wraps the spooled temporary file the request body was
+    parsed into; parsers can read that stream directly instead of a copy of it.
+
+    Args:
+        file: Uploaded file (FileStorage) or any seekable binary file object
+
+    Returns:
+        BinaryIO: The underlying stream positioned at offset 0
+    """
+    stream = getattr(file, "stream", file)
+    stream.seek(0)
+    return stream
+
+
+def upload_buffer(file: BinaryIO) -> memoryview:
+    """
+    Expose the bytes of an upload as a read-only memoryview without copying them.
+
+    In-memory uploads (BytesIO, or a SpooledTemporaryFile that has not rolled over)
+    share their buffer; uploads spooled to disk are memory-mapped. Only streams that
+    support neither are read into memory. Release the view (e.g. with a `with` block)
+    when done so the underlying buffer can be resized or closed.
+
+    Args:
+        file: Uploaded file (FileStorage) or any seekable binary file object
+
+    Returns:
+        memoryview: The upload bytes
+    """
+    stream = upload_stream(file)
+    # SpooledTemporaryFile keeps its data in a BytesIO until it rolls over to disk
+    raw = getattr(stream, "_file", stream)
+
+    if isinstance(raw, io.BytesIO):
+        return raw.getbuffer().toreadonly()
+
+    try:
+        return memoryview(mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ))
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        # Not backed by a real file (or empty): fall back to reading it
+        return memoryview(stream.read())
+
+
+def read_text_upload(file: BinaryIO) -> str:
+    """
+    Decode a plain-text upload as UTF-8 straight from its buffer.
+
+    Args:
+        file: Uploaded file (FileStorage) or any seekable binary file object
+
+    Returns:
+        str: The decoded text, normalized by normalize_resume_text()
+    """
+    with upload_buffer(file) as buffer:
+        return normalize_resume_text(str(buffer, "utf-8"))
+
+
+def normalize_resume_text(text: str) -> str:
+    """
+    Normalize a text resume (TXT upload or pasted text) like extracted PDF text.
+
+    Args:
+        text: Resume text
+
+    Returns:
+        str: The normalized text, or the text unchanged when PDF_TEXT_NORMALIZATION is "raw"
+    """
+    if PDF_TEXT_NORMALIZATION == "raw":
+        return text
+    with stage("normalize_text"):
+        return normalize_text(text)
+
+
+def extract_pages_from_pdf(file_bytes: BinaryIO, backend: Optional[str] = None) -> List[str]:
     """
+    Extract the text of every page of a PDF file.
+
+    Args:
+        file_bytes: File object containing the PDF data
+        backend: Optional extraction backend name (defaults to PDF_EXTRACTION_BACKEND)
+
+    Returns:
+        list: Text of each page, in order
+    """
+    backend = resolve_pdf_backend_name(backend)
+    extractor = PDF_EXTRACTION_BACKENDS[backend][1]
+
+    # Parse the upload's own stream rather than a copy of it
+    stream = upload_stream(file_bytes)
+    PDF_EXTRACTION_BYTES.observe(stream.seek(0, io.SEEK_END), backend=backend)
+    stream.seek(0)
+
+    started = time.perf_counter()
     try:
-        # Create a BytesIO buffer for efficient memory usage
-        pdf_buffer = io.BytesIO(file_bytes.read())
-        file_bytes.seek(0)
+        with stage("extract_pdf"):
+            return extractor(stream)
+    finally:
+        PDF_EXTRACTION_DURATION.observe(time.perf_counter() - started, backend=backend)
+        stream.seek(0)
 
-        # Use context manager for better resource management
-        text = ""
 
-        # Open PDF reader with the buffer
-        pdf = PdfReader(pdf_buffer)
+def extract_text_from_pdf(file_bytes: BinaryIO, backend: Optional[str] = None) -> str:
+    """
+    Extract text content from a PDF file with memory optimization.
 
-        # Process pages one by one to reduce memory usage
-        for page in pdf.pages:
-            # Extract text from the page and append to result
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
+    Args:
+        file_bytes: File object containing the PDF data
+        backend: Optional extraction backend name (defaults to PDF_EXTRACTION_BACKEND)
 
-        # Close the buffer explicitly
-        pdf_buffer.close()
+    Returns:
+        str: Extracted text from the PDF
 
-        # Force garbage collection to free up memory
-        gc.collect()
+    Raises:
+        ValueError: If there's an error reading the PDF
+    """
+    try:
+        pages = extract_pages_from_pdf(file_bytes, backend)
+        if PDF_TEXT_NORMALIZATION == "raw":
+            # Process pages one by one and skip the empty ones
+            return "".join(page_text + "\n" for page_text in pages if page_text)
 
-        # Truncate very long resume content to prevent token limits
-        if len(text) > MAX_RESUME_CONTENT_LENGTH:
-            logger.info(f"Truncating resume content from {len(text)} to {MAX_RESUME_CONTENT_LENGTH} chars")
-            text = text[:MAX_RESUME_CONTENT_LENGTH] + "..."
+        with stage("normalize_text"):
+            text, report = normalize_pages(pages)
+        logger.info(f"Normalized extracted text from {report['input_chars']} to {report['output_chars']} characters ({report['furniture_lines_removed']} header/footer lines removed)")
 
+        # The full text is kept; prompts trim it to their token budget
         return text
 
     except Exception as e:
         logger.error(f"Error reading PDF: {str(e)}", exc_info=True)
-        # Clean up resources on error
-        gc.collect()
         raise ValueError(f"Error reading PDF: {str(e)}") from e
 
 
@@ -97,11 +321,7 @@ def analyze_resume(resume: BinaryIO, job_details: List[Dict], custom_instruction
             if filename.endswith(".pdf"):
                 resume_content = extract_text_from_pdf(resume)
             elif filename.endswith(".txt"):
-                resume_content = resume.read().decode("utf-8")
-                # Truncate very long resume content
-                if len(resume_content) > MAX_RESUME_CONTENT_LENGTH:
-                    logger.info(f"Truncating resume content from {len(resume_content)} to {MAX_RESUME_CONTENT_LENGTH} chars")
-                    resume_content = resume_content[:MAX_RESUME_CONTENT_LENGTH] + "..."
+                resume_content = read_text_upload(resume)
             else:
                 return {
                     "success": False,
@@ -110,6 +330,26 @@ def analyze_resume(resume: BinaryIO, job_details: List[Dict], custom_instruction
         except ValueError as e:
             return {"success": False, "error": str(e)}
 
+        return analyze_resume_content(resume_content, job_details, custom_instructions)
+
+    except Exception as e:
+        logger.error(f"Error in analyze_resume: {str(e)}", exc_info=True)
+        return {"success": False, "error": f"Error analyzing resume: {str(e)}"}
+
+
+def analyze_resume_content(resume_content: str, job_details: List[Dict], custom_instructions: str = "") -> Dict[str, Union[bool, list, str]]:
+    """
+    Analyze already-extracted resume text against job descriptions using AI.
+
+    Args:
+        resume_content: Text content of the resume
+        job_details: List of dictionaries containing job details (title, company, description)
+        custom_instructions: Optional custom instructions for the review
+
+    Returns:
+        dict: Analysis results including matches and recommendations
+    """
+    try:
         # Validate job details
         if not isinstance(job_details, list):
             # Convert to list if it's not already
@@ -129,22 +369,19 @@ def analyze_resume(resume: BinaryIO, job_details: List[Dict], custom_instruction
         if job_details and "job_description" in job_details[0] and job_details[0]["job_description"]:
             ats_result = analyze_ats_compatibility(resume_content)
 
-        # Clean up memory
-        del resume_content
-        gc.collect()
-
+        token_usage = {"analysis": analysis_result.get("token_usage", {})}
         if ats_result and ats_result["success"]:
-            return {"success": True, "results": analysis_result["jobs"], "ats_analysis": ats_result["analysis"]}
+            token_usage["ats_analysis"] = ats_result.get("token_usage", {})
+            return {"success": True, "results": analysis_result["jobs"], "ats_analysis": ats_result["analysis"], "token_usage": token_usage}
         else:
-            return {"success": True, "results": analysis_result["jobs"]}
+            return {"success": True, "results": analysis_result["jobs"], "token_usage": token_usage}
 
     except Exception as e:
         logger.error(f"Error in analyze_resume: {str(e)}", exc_info=True)
-        # Clean up memory on error
-        gc.collect()
         return {"success": False, "error": f"Error analyzing resume: {str(e)}"}
 
 
+@timed_generator("analysis")
 def generate_analysis(resume_content: str, job_details: List[Dict], custom_instructions: str = "") -> Dict[str, Union[bool, list, str]]:
     """
     Generate AI analysis for the resume and job details.
@@ -160,6 +397,25 @@ def generate_analysis(resume_content: str, job_details: List[Dict], custom_instr
     # Log for debugging
     logger.info(f"Analyzing resume against {len(job_details)} job entries")
 
+    # Prompts carry each posting's extracted requirements; the inputs are then trimmed to the endpoint's
+    # token budget, and the job description budget is shared between the jobs
+    descriptions = job_descriptions_for_prompt(job_details)
+    # However many jobs share it, the job description budget leaves each job at least ANALYSIS_JOB_MIN_TOKENS
+    job_floor = ANALYSIS_JOB_MIN_TOKENS * sum(1 for description in descriptions if description)
+    if ANALYSIS_RESUME_INPUT == "profile":
+        # The resume's profile and full skill list stand in for its text; local scores still read the full text
+        prompt_source = f"{resume_profile_text(resume_content)}\nAll skills: {', '.join(top_skills(resume_content, None))}"
+        condense_report = {"condensed": False}
+    else:
+        # A resume over its share of the budget is condensed section by section rather than cut off
+        allotment = input_allotment("analysis", resume_content, "\n\n".join(descriptions), custom_instructions, job_floor)
+        prompt_source, condense_report = condense_resume(resume_content, allotment["resume"])
+    budgeted, token_usage = allocate_input_budget("analysis", prompt_source, "\n\n".join(descriptions), custom_instructions, job_floor)
+    token_usage["resume_input"] = ANALYSIS_RESUME_INPUT
+    if condense_report["condensed"]:
+        token_usage["condense"] = condense_report
+    job_budgets = split_budget(token_usage["job_description"], {i: estimate_tokens(description) for i, description in enumerate(descriptions)})
+
     # Format job details for the AI - with truncated job links and descriptions
     jobs_text = []
     for i, job in enumerate(job_details):
@@ -193,14 +449,9 @@ def generate_analysis(resume_content: str, job_details: List[Dict], custom_instr
         job_text += f"Title: {job_copy.get('job_title', 'Unknown Position')}\n"
         job_text += f"Company: {job_copy.get('company_name', 'Unknown Company')}\n"
 
-        if job_copy.get("job_description"):
-            # Truncate job description if it's very long
-            job_desc = job_copy.get("job_description")
-            if len(job_desc) > MAX_JOB_DESCRIPTION_LENGTH:
-                logger.info(f"Truncating job description for job #{i+1} from {len(job_desc)} to {MAX_JOB_DESCRIPTION_LENGTH} chars")
-                job_text += f"Description: {job_desc[:MAX_JOB_DESCRIPTION_LENGTH]}...\n"
-            else:
-                job_text += f"Description: {job_desc}\n"
+        if descriptions[i]:
+            # Trim the job description to its share of the token budget
+            job_text += f"Description: {fit_job_description(descriptions[i], job_budgets[i])}\n"
 
         # We've already handled the job link above, but we'll add a reference without the full URL
         if job_copy.get("job_link"):
@@ -211,59 +462,11 @@ def generate_analysis(resume_content: str, job_details: List[Dict], custom_instr
     # Join all job details
     all_jobs_text = "\n\n".join(jobs_text)
 
-    # Truncate resume content for prompt if needed again
-    if len(resume_content) > MAX_RESUME_CONTENT_LENGTH:
-        prompt_resume = resume_content[:MAX_RESUME_CONTENT_LENGTH] + "..."
-    else:
-        prompt_resume = resume_content
-
-    base_prompt = f"""
-    You are a professional resume analyzer. Analyze this resume content against the job details provided.
-
-    Resume content to analyze:
-    {prompt_resume}
-
-    Job details to analyze against:
-    {all_jobs_text}
-
-    IMPORTANT INSTRUCTIONS:
-    1. For each job, analyze what skills and qualifications are required based on the job description.
-    2. Compare these requirements against the resume content.
-    3. Provide a match percentage based on how well the resume matches the job requirements.
-    4. Identify matching skills present in the resume that align with the job.
-    5. Identify skills mentioned in the job that might be missing or need improvement in the resume.
-    6. Provide at least 3 specific, actionable recommendations for each job.
-    7. For matches above 75%, focus on how to excel in the role rather than just qualify.
-    8. Recommendations should be tailored to the specific job and company.
-
-    Return ONLY a JSON object with this exact structure:
-    {{
-        "jobs": [
-            {{
-                "job_title": "<job title from input>",
-                "company_name": "<company name from input>",
-                "job_link": "<job link from input if available>",
-                "match_percentage": <number 0-100>,
-                "matching_skills": [<list of matching skills>],
-                "missing_skills": [<list of missing skills>],
-                "job_description": "<job description from input>",
-                "recommendations": [
-                    "Specific recommendation 1",
-                    "Specific recommendation 2",
-                    "Specific recommendation 3"
-                ]
-            }}
-        ]
-    }}
-    """
+    prompt_resume = budgeted["resume"]
+    custom_instructions = budgeted["instructions"]
 
-    # Add custom instructions if provided
-    if custom_instructions and custom_instructions.strip():
-        prompt = base_prompt + f"\n\nAdditional customization requirements:\n{custom_instructions}"
-    else:
-        prompt = base_prompt
+    prompt = render_prompt("analysis", resume=prompt_resume, jobs=all_jobs_text, custom_instructions=custom_instructions_text(custom_instructions))
 
-    model = genai.GenerativeModel(GEMINI_MODEL)
     model_config = {
         "temperature": 0.7,
         "top_p": 0.8,
@@ -271,11 +474,16 @@ def generate_analysis(resume_content: str, job_details: List[Dict], custom_instr
         "max_output_tokens": 2048,
     }
 
+    token_usage.update(estimate_prompt_tokens(prompt))
+
     try:
-        response = model.generate_content(prompt, generation_config=model_config)
+        response = generate_content(prompt, generation_config=model_config, generator="analysis", validate=json_validator("jobs"))
         if not response or not response.text:
             return {"success": False, "error": "No response from AI model"}
 
+        record_usage(token_usage, response)
+        logger.info(f"Token usage for analysis: {token_usage}")
+
         # Extract and parse JSON with improved error handling
         try:
             # Extract and parse JSON
@@ -295,6 +503,7 @@ def generate_analysis(resume_content: str, job_details: List[Dict], custom_instr
             logger.info("Successfully parsed AI response as JSON")
 
         except json.JSONDecodeError as e:
+            record_json_failure("resume_analyzer")
             # Provide detailed error information for debugging
             logger.error(f"JSON parsing error: {str(e)}")
             logger.error(f"Extracted text: {json_str.group(1)[:500] if json_str else 'No JSON found'}")
@@ -310,6 +519,11 @@ def generate_analysis(resume_content: str, job_details: List[Dict], custom_instr
             if i < len(job_details) and "job_link" in job_details[i]:
                 job_result["job_link"] = job_details[i]["job_link"]
 
+        # Fill in and sanity-check the model's scores and skill lists with the local scorer
+        local_scores = score_jobs(resume_content, job_details)
+        for i, job_result in enumerate(analysis["jobs"]):
+            reconcile_with_local_score(job_result, local_scores[i] if i < len(local_scores) else None)
+
         # Ensure recommendations and required fields
         for job in analysis["jobs"]:
             # Make sure we have recommendations
@@ -332,169 +546,176 @@ def generate_analysis(resume_content: str, job_details: List[Dict], custom_instr
             if not job.get("match_percentage"):
                 job["match_percentage"] = 50
 
-        # Clean up memory before returning
-        del prompt
-        del response
-        gc.collect()
-
-        return {"success": True, "jobs": analysis["jobs"]}
+        return {"success": True, "jobs": analysis["jobs"], "token_usage": token_usage}
 
     except Exception as e:
         logger.error(f"Error in generate_analysis: {str(e)}", exc_info=True)
-        # Clean up memory on error
-        gc.collect()
         return {"success": False, "error": f"Error generating analysis: {str(e)}"}
 
 
-def generate_resume_review(resume_content: str, job_description: str, custom_instructions: str = "") -> dict:
+def _merge_section_reviews(parsed: Dict, section_reviews: Dict[str, Dict], job_description: str, resume_content: str) -> Dict:
     """
-    Generate detailed resume review and improvement suggestions.
+    Assemble a resume review from per-section reviews plus the locally computed Format and Keywords advice.
 
     Args:
+        parsed: Result of parse_resume()
+        section_reviews: Section name -> {"strengths", "weaknesses", "suggestions"}
+        job_description: Job context the review is for
         resume_content: Text content of the resume
-        job_description: Text content of the job description
-        custom_instructions: Optional custom instructions for the review
 
     Returns:
-        dict: Review results including strengths, weaknesses, and improvement suggestions
+        dict: {"strengths", "weaknesses", "improvement_suggestions": [{"section", "suggestions"}]}
     """
-    try:
-        # Truncate resume content for the prompt if it's too long
-        if len(resume_content) > MAX_RESUME_CONTENT_LENGTH:
-            logger.info(f"Truncating resume content for review from {len(resume_content)} to {MAX_RESUME_CONTENT_LENGTH} chars")
-            prompt_resume = resume_content[:MAX_RESUME_CONTENT_LENGTH] + "..."
-        else:
-            prompt_resume = resume_content
-
-        # Truncate job description if it's very long
-        if len(job_description) > MAX_JOB_DESCRIPTION_LENGTH:
-            logger.info(f"Truncating job description for review from {len(job_description)} to {MAX_JOB_DESCRIPTION_LENGTH} chars")
-            prompt_job = job_description[:MAX_JOB_DESCRIPTION_LENGTH] + "..."
-        else:
-            prompt_job = job_description
-
-        base_prompt = f"""
-        You are a professional resume reviewer and career coach. Review this resume against the job description
-        and provide detailed, actionable feedback to help improve the resume.
-
-        Resume content:
-        {prompt_resume}
-
-        Job description:
-        {prompt_job}
-
-        IMPORTANT: Your response must be a valid JSON object with the exact structure shown below.
-        Do not include any explanations, markdown, or text outside of the JSON object.
-
-        JSON structure to use:
-        {{
-            "strengths": [
-                "Detailed strength point 1",
-                "Detailed strength point 2",
-                "Detailed strength point 3"
-            ],
-            "weaknesses": [
-                "Area for improvement 1",
-                "Area for improvement 2",
-                "Area for improvement 3"
-            ],
-            "improvement_suggestions": [
-                {{
-                    "section": "Format",
-                    "suggestions": ["Specific suggestion 1", "Specific suggestion 2"]
-                }},
-                {{
-                    "section": "Content",
-                    "suggestions": ["Specific suggestion 1", "Specific suggestion 2"]
-                }},
-                {{
-                    "section": "Skills",
-                    "suggestions": ["Specific suggestion 1", "Specific suggestion 2"]
-                }},
-                {{
-                    "section": "Experience",
-                    "suggestions": ["Specific suggestion 1", "Specific suggestion 2"]
-                }},
-                {{
-                    "section": "Keywords",
-                    "suggestions": ["Specific suggestion 1", "Specific suggestion 2"]
-                }}
-            ]
-        }}
-        """
-
-        # Add custom instructions if provided
-        if custom_instructions and custom_instructions.strip():
-            prompt = base_prompt + f"\n\nAdditional customization requirements:\n{custom_instructions}"
-        else:
-            prompt = base_prompt
-
-        model = genai.GenerativeModel(GEMINI_MODEL)
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.7,
-                "top_p": 0.8,
-                "top_k": 40,
-                "max_output_tokens": 2048,
-            },
-        )
-
-        if response and response.text:
-            # Try to parse the response as JSON with more robust error handling
-            try:
-                # Clean up the response text to ensure it's valid JSON
-                cleaned_text = response.text.strip()
-
-                # Find JSON content using regex if needed
-                json_match = re.search(r"({[\s\S]*})", cleaned_text)
-                if json_match:
-                    cleaned_text = json_match.group(1)
-
-                # Parse the JSON
-                review_data = json.loads(cleaned_text)
-
-                # Validate the structure
-                if not isinstance(review_data, dict):
-                    return {"success": False, "error": "Response is not a valid JSON object"}
-
-                if "strengths" not in review_data or "weaknesses" not in review_data or "improvement_suggestions" not in review_data:
-                    return {"success": False, "error": "Response is missing required fields"}
-
-                # Ensure all sections are present with default values if needed
-                if not review_data.get("strengths"):
-                    review_data["strengths"] = ["Strong professional experience", "Clear presentation of skills", "Good organization"]
+    strengths, weaknesses, improvement_suggestions = [], [], []
+    for name in parsed["sections"]:
+        section_review = section_reviews.get(name)
+        if section_review is None:
+            continue
+        strengths.extend(section_review["strengths"][:2])
+        weaknesses.extend(section_review["weaknesses"][:2])
+        if section_review["suggestions"]:
+            improvement_suggestions.append({"section": parsed["headings"][name].title(), "suggestions": section_review["suggestions"]})
+
+    # Format and keyword advice is mechanical, so it comes from the local checks rather than the model
+    format_suggestions = [finding["message"] for finding in check_resume(resume_content)["findings"] if finding["severity"] != "info"]
+    if format_suggestions:
+        improvement_suggestions.append({"section": "Format", "suggestions": format_suggestions})
+    resume_skills = covered_skills(extract_skills(resume_content))
+    missing_keywords = [skill_name(skill) for skill in extract_skills(job_description) if skill not in resume_skills]
+    if missing_keywords:
+        improvement_suggestions.append({"section": "Keywords", "suggestions": [f"Mention these skills from the job description where you have them: {', '.join(missing_keywords[:8])}"]})
+
+    return {
+        "strengths": strengths[:REVIEW_MAX_POINTS] or ["Strong professional experience", "Clear presentation of skills", "Good organization"],
+        "weaknesses": weaknesses[:REVIEW_MAX_POINTS] or ["Could benefit from more quantifiable achievements", "Consider adding more relevant keywords", "Format could be more scannable"],
+        "improvement_suggestions": improvement_suggestions,
+    }
 
-                if not review_data.get("weaknesses"):
-                    review_data["weaknesses"] = ["Could benefit from more quantifiable achievements", "Consider adding more relevant keywords", "Format could be more scannable"]
 
-                sections = ["Format", "Content", "Skills", "Experience", "Keywords"]
-                existing_sections = [s["section"] for s in review_data.get("improvement_suggestions", [])]
+def _review_sections(parsed: Dict, names: List[str], job_description: str, custom_instructions: str) -> dict:
+    """
+    Ask the model to review some sections of a resume.
 
-                for section in sections:
-                    if section not in existing_sections:
-                        review_data.setdefault("improvement_suggestions", []).append({"section": section, "suggestions": ["Consider reviewing this section"]})
+    Args:
+        parsed: Result of parse_resume()
+        names: Section names to review
+        job_description: Job context the review is for
+        custom_instructions: Optional custom instructions for the review
 
-                # Clean up memory
-                del prompt
-                del response
-                gc.collect()
+    Returns:
+        dict: {"success", "sections": section name -> {"strengths", "weaknesses", "suggestions"}, "token_usage"}
+            or {"success": False, "error", "raw_response"?}
+    """
+    # Condense sections over their share of the budget, then trim the job description and instructions to it
+    allotment = input_allotment("resume_review", sections_text(parsed, names, keyed=True), job_description, custom_instructions)
+    resume_text, condense_report = condense_sections(parsed, names, allotment["resume"], keyed=True)
+    budgeted, token_usage = allocate_input_budget("resume_review", resume_text, job_description, custom_instructions)
+    if condense_report["condensed"]:
+        token_usage["condense"] = condense_report
+    prompt_resume = budgeted["resume"]
+    prompt_job = budgeted["job_description"]
+    custom_instructions = budgeted["instructions"]
+
+    prompt = render_prompt("resume_review", resume=prompt_resume, job_description=prompt_job, custom_instructions=custom_instructions_text(custom_instructions))
+
+    token_usage.update(estimate_prompt_tokens(prompt))
+
+    response = generate_content(
+        prompt,
+        generation_config={
+            "temperature": 0.7,
+            "top_p": 0.8,
+            "top_k": 40,
+            "max_output_tokens": 2048,
+        },
+        generator="resume_review",
+        validate=json_validator("sections"),
+    )
+
+    if not response or not response.text:
+        return {"success": False, "error": "Failed to generate resume review"}
+
+    record_usage(token_usage, response)
+    logger.info(f"Token usage for resume review of {', '.join(names)}: {token_usage}")
+
+    # Try to parse the response as JSON with more robust error handling
+    cleaned_text = response.text.strip()
+    try:
+        # Find JSON content using regex if needed
+        json_match = re.search(r"({[\s\S]*})", cleaned_text)
+        if json_match:
+            cleaned_text = json_match.group(1)
+
+        review_data = json.loads(cleaned_text)
+    except json.JSONDecodeError as e:
+        record_json_failure("resume_analyzer")
+        return {
+            "success": False,
+            "error": f"Invalid response format from AI model: {str(e)}",
+            "raw_response": cleaned_text[:500],  # Include part of the raw response for debugging
+        }
+
+    # Validate the structure
+    if not isinstance(review_data, dict) or not isinstance(review_data.get("sections"), list):
+        return {"success": False, "error": "Response is missing required fields"}
+
+    sections = {}
+    for entry in review_data["sections"]:
+        name = entry.get("section", "").strip("[] ").lower() if isinstance(entry, dict) and isinstance(entry.get("section"), str) else None
+        if name in names:
+            sections[name] = {field: [point for point in entry.get(field) or [] if isinstance(point, str)] for field in ("strengths", "weaknesses", "suggestions")}
+
+    return {"success": True, "sections": sections, "token_usage": token_usage}
+
+
+@timed_generator("resume_review")
+def generate_resume_review(resume_content: str, job_description: str, custom_instructions: str = "") -> dict:
+    """
+    Generate detailed resume review and improvement suggestions.
 
-                return {"success": True, "review": review_data}
+    The resume is reviewed section by section and each section's review is cached under
+    the section's content hash, so re-running a review after editing one section only
+    prompts the model for that section.
 
-            except json.JSONDecodeError as e:
-                # Clean up memory on error
-                gc.collect()
+    Args:
+        resume_content: Text content of the resume
+        job_description: Text content of the job description
+        custom_instructions: Optional custom instructions for the review
 
-                return {
-                    "success": False,
-                    "error": f"Invalid response format from AI model: {str(e)}",
-                    "raw_response": cleaned_text[:500],  # Include part of the raw response for debugging
-                }
-        else:
-            return {"success": False, "error": "Failed to generate resume review"}
+    Returns:
+        dict: Review results including strengths, weaknesses, and improvement suggestions,
+            plus the sections reviewed now ("reviewed_sections"), taken from the cache ("cached_sections")
+            and left out of the model's answer ("unreviewed_sections", not cached)
+    """
+    try:
+        parsed = parse_resume(resume_content)
+        context = content_hash(f"{template_key('resume_review')}\0{job_description_hash(job_description)}\0{custom_instructions}")
+        # Contact details are checked by the local ATS rules, not reviewed by the model
+        section_hashes = {name: section_hash for name, section_hash in parsed["hashes"].items() if name != "contact"}
+        section_reviews, missing = get_section_results("resume_review", context, section_hashes)
+
+        token_usage, reviewed = {}, []
+        if missing:
+            result = _review_sections(parsed, missing, job_description_for_prompt(job_description), custom_instructions)
+            if not result["success"]:
+                return result
+            token_usage = result["token_usage"]
+            # Only sections the model answered are cached; one it skipped (or the budget trimmed off)
+            # is asked about again on the next review
+            reviewed = [name for name in missing if name in result["sections"]]
+            for name in reviewed:
+                store_section_result("resume_review", context, name, section_hashes[name], result["sections"][name])
+                section_reviews[name] = result["sections"][name]
+
+        review_data = _merge_section_reviews(parsed, section_reviews, job_description, resume_content)
+        return {
+            "success": True,
+            "review": review_data,
+            "token_usage": token_usage,
+            "reviewed_sections": reviewed,
+            "cached_sections": [name for name in section_hashes if name not in missing],
+            "unreviewed_sections": [name for name in missing if name not in reviewed],
+        }
 
     except Exception as e:
-        # Clean up memory on error
-        gc.collect()
         return {"success": False, "error": f"Error generating resume review: {str(e)}"}
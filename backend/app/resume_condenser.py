@@ -0,0 +1,180 @@
+"""
+Resume condensing module.
+This module fits long resumes into a prompt's token budget by condensing them instead
+of cutting them off.
+
+A resume over its budget is split by section (long sections at entry boundaries), and
+every chunk is condensed into a compact factual digest by a call to the small model
+(GEMINI_SMALL_MODEL). The calls run concurrently, so the added latency is that of one
+small-model call whatever the length of the resume. Digests are cached per chunk, and
+recombined in resume order under the section headings. Short sections such as contact
+details are kept verbatim.
+"""
+
+import contextvars
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import BoundedCache, content_hash
+from .gemini_client import generate_content
+from .prompts import render_prompt, template_key
+from .resume_sections import is_bullet_line, parse_resume
+from .timing import timed_generator
+from .token_budget import estimate_tokens, truncate_to_tokens
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "condense" (default) condenses resumes over budget with the small model; "truncate" cuts them as before
+LONG_RESUME_MODE = os.getenv("LONG_RESUME_MODE", "condense").strip().lower()
+
+# Largest chunk sent to one condense call, and sections short enough to keep verbatim
+CONDENSE_CHUNK_TOKENS = int(os.getenv("CONDENSE_CHUNK_TOKENS", "700"))
+CONDENSE_VERBATIM_TOKENS = 120
+# Smallest digest a chunk is condensed to
+CONDENSE_MIN_DIGEST_TOKENS = 60
+
+CONDENSE_WORKERS = int(os.getenv("CONDENSE_WORKERS", "8"))
+CONDENSE_CACHE_MAX_ENTRIES = int(os.getenv("CONDENSE_CACHE_MAX_ENTRIES", "1024"))
+CONDENSE_CACHE_TTL_SECONDS = float(os.getenv("CONDENSE_CACHE_TTL_SECONDS", str(2 * 60 * 60)))
+
+_digests = BoundedCache(max_entries=CONDENSE_CACHE_MAX_ENTRIES, ttl_seconds=CONDENSE_CACHE_TTL_SECONDS)
+
+
+def _chunk_lines(lines: List[str], max_tokens: int) -> List[str]:
+    """
+    Split a section's lines into chunks of at most max_tokens (estimated).
+
+    Chunks break before a non-bullet line that follows a bullet, i.e. at the start of the
+    next role or project, unless a single entry is longer than max_tokens.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for line in lines:
+        tokens = estimate_tokens(line) + 1
+        starts_entry = bool(current) and not is_bullet_line(line) and is_bullet_line(current[-1])
+        if current and current_tokens + tokens > max_tokens and (starts_entry or current_tokens >= max_tokens):
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+@timed_generator("resume_condense")
+def condense_chunk(heading: str, text: str, max_tokens: int) -> Optional[str]:
+    """
+    Condense one resume chunk into a factual digest with the small model.
+
+    Args:
+        heading: Heading of the section the chunk belongs to
+        text: Chunk text
+        max_tokens: Target length of the digest
+
+    Returns:
+        str or None: The digest, or None when the model gave no usable answer
+    """
+    key = (template_key("resume_condense"), content_hash(f"{heading}\0{text}"), max_tokens)
+    digest = _digests.get(key)
+    if digest is not None:
+        return digest
+
+    words = max(20, int(max_tokens * 0.7))
+    prompt = render_prompt("resume_condense", heading=heading, words=words, text=text)
+    response = generate_content(prompt, generation_config={"temperature": 0.1, "max_output_tokens": max_tokens * 2}, generator="resume_condense")
+    if not response or not getattr(response, "text", None) or not response.text.strip():
+        return None
+
+    digest = truncate_to_tokens(response.text.strip(), max_tokens)
+    _digests.set(key, digest)
+    return digest
+
+
+def _condense_or_trim(heading: str, text: str, max_tokens: int) -> Tuple[str, bool]:
+    """Condense a chunk, falling back to trimming it when the call fails."""
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+    try:
+        digest = condense_chunk(heading, text, max_tokens)
+    except Exception as e:
+        logger.warning(f"Condensing a {heading} chunk failed, trimming it instead: {str(e)}")
+        digest = None
+    if digest is None:
+        return truncate_to_tokens(text, max_tokens), False
+    return digest, True
+
+
+def condense_sections(parsed: Dict[str, Any], names: Iterable[str], max_tokens: int, keyed: bool = False) -> Tuple[str, Dict[str, Any]]:
+    """
+    Render sections of a parsed resume within a token budget, condensing them if they do not fit.
+
+    Args:
+        parsed: Result of resume_sections.parse_resume()
+        names: Section names to include
+        max_tokens: Token budget of the rendered sections
+        keyed: Label each section with its name, as resume_sections.sections_text() does
+
+    Returns:
+        tuple: (text, report) where report has "condensed" (bool) and, when condensed,
+            "chunks", "condensed_chunks", "input_tokens" and "output_tokens"
+    """
+    wanted = set(names)
+    sections = [(name, text) for name, text in parsed["sections"].items() if name in wanted]
+
+    def render(parts: List[Tuple[str, str]]) -> str:
+        return "\n\n".join(f"{'[' + name + '] ' if keyed else ''}{parsed['headings'][name]}\n{text}" for name, text in parts)
+
+    full_text = render(sections)
+    input_tokens = estimate_tokens(full_text)
+    if LONG_RESUME_MODE != "condense" or input_tokens <= max_tokens:
+        return full_text, {"condensed": False}
+
+    # Short sections stay verbatim; the rest of the budget is shared by the chunks in proportion to their length
+    verbatim = {name for name, text in sections if estimate_tokens(text) <= CONDENSE_VERBATIM_TOKENS}
+    chunks = [(name, chunk) for name, text in sections if name not in verbatim for chunk in _chunk_lines(text.splitlines(), CONDENSE_CHUNK_TOKENS)]
+    overhead = estimate_tokens(render([(name, text) for name, text in sections if name in verbatim] + [(name, "") for name, _ in sections if name not in verbatim]))
+    available = max(max_tokens - overhead, CONDENSE_MIN_DIGEST_TOKENS * len(chunks))
+    chunk_tokens = [estimate_tokens(chunk) for _, chunk in chunks]
+    targets = [max(CONDENSE_MIN_DIGEST_TOKENS, int(available * tokens / max(sum(chunk_tokens), 1))) for tokens in chunk_tokens]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(CONDENSE_WORKERS, len(chunks)))) as executor:
+        # Each call runs in a copy of the request context so its timings reach the request
+        futures = [executor.submit(contextvars.copy_context().run, _condense_or_trim, parsed["headings"][name], chunk, target) for (name, chunk), target in zip(chunks, targets)]
+        results = [future.result() for future in futures]
+
+    condensed: Dict[str, List[str]] = {}
+    for (name, _), (digest, _) in zip(chunks, results):
+        condensed.setdefault(name, []).append(digest)
+    text = render([(name, section_text if name in verbatim else "\n".join(condensed[name])) for name, section_text in sections])
+
+    report = {
+        "condensed": True,
+        "chunks": len(chunks),
+        "condensed_chunks": sum(1 for _, ok in results if ok),
+        "input_tokens": input_tokens,
+        "output_tokens": estimate_tokens(text),
+    }
+    logger.info(f"Condensed resume from ~{input_tokens} to ~{report['output_tokens']} tokens in {len(chunks)} chunks")
+    return text, report
+
+
+def condense_resume(resume_content: str, max_tokens: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Fit a whole resume within a token budget, condensing it if it does not fit.
+
+    Args:
+        resume_content: Text content of the resume
+        max_tokens: Token budget of the resume in the prompt
+
+    Returns:
+        tuple: (resume text for the prompt, condense report; see condense_sections)
+    """
+    if LONG_RESUME_MODE != "condense" or estimate_tokens(resume_content) <= max_tokens:
+        return resume_content, {"condensed": False}
+    parsed = parse_resume(resume_content)
+    return condense_sections(parsed, parsed["sections"], max_tokens)
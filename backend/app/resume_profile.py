@@ -0,0 +1,217 @@
+"""
+Resume profile module.
+This module builds a compact profile of a resume (roles, years of experience, top skills,
+quantified achievements, education) that generators can put in their prompts instead of
+the raw resume text.
+
+A profile is built once per resume content hash, with one call to the small model
+(GEMINI_SMALL_MODEL), and cached. Skills always come from the local skill taxonomy, and
+every other field falls back to what the section parser finds when the call fails, so a
+profile is always available. Rendered, a profile is about 300 tokens: enough for cover
+letters and interview questions to speak to the candidate's actual background, and a
+fraction of the resume text the analyzers would otherwise resend on every call.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from .ats_rules import YEAR_PATTERN
+from .cache import BoundedCache, content_hash
+from .gemini_client import generate_content
+from .metrics import record_json_failure
+from .model_router import json_validator
+from .prompts import render_prompt, template_key
+from .resume_sections import parse_resume
+from .skill_taxonomy import extract_skills, skill_name
+from .timing import timed_generator
+from .token_budget import estimate_tokens, truncate_to_tokens
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "model" (default) builds profiles with the small model; "local" only uses the section parser
+RESUME_PROFILE_SOURCE = os.getenv("RESUME_PROFILE_SOURCE", "model").strip().lower()
+
+# Size of a rendered profile, and of the resume text sent to build one
+PROFILE_MAX_TOKENS = int(os.getenv("PROFILE_MAX_TOKENS", "300"))
+PROFILE_INPUT_TOKENS = int(os.getenv("PROFILE_INPUT_TOKENS", "3000"))
+
+PROFILE_MAX_ROLES = 4
+PROFILE_MAX_SKILLS = 12
+PROFILE_MAX_ACHIEVEMENTS = 5
+PROFILE_MAX_EDUCATION = 2
+PROFILE_ITEM_MAX_CHARS = 160
+PROFILE_ROLE_MAX_CHARS = 100
+
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "512"))
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", str(2 * 60 * 60)))
+
+CURRENT_ROLE_PATTERN = re.compile(r"\b(?:present|current|now|today)\b", re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r"\d")
+
+_profiles = BoundedCache(max_entries=PROFILE_CACHE_MAX_ENTRIES, ttl_seconds=PROFILE_CACHE_TTL_SECONDS)
+
+
+def _clip(text: Any, max_chars: int = PROFILE_ITEM_MAX_CHARS) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= max_chars else text[: max_chars - 3].rstrip() + "..."
+
+
+def _years_of_experience(parsed: Dict[str, Any]) -> Optional[int]:
+    """Span of the years in the experience section, counting "Present" as the current year."""
+    text = parsed["sections"].get("experience", "")
+    years = [int(year) for year in YEAR_PATTERN.findall(text)]
+    if CURRENT_ROLE_PATTERN.search(text):
+        years.append(time.localtime().tm_year)
+    return max(years) - min(years) if years else None
+
+
+def _local_profile(resume_content: str) -> Dict[str, Any]:
+    """Build a profile from the section parser and the skill taxonomy alone."""
+    parsed = parse_resume(resume_content)
+    # Entry headers already hold the employer and dates as written
+    roles = [{"title": header, "company": "", "dates": ""} for header in dict.fromkeys(_clip(entry["header"], PROFILE_ROLE_MAX_CHARS) for entry in parsed["experience"] if entry["header"])]
+    bullets = list(dict.fromkeys(bullet for name in ("experience", "projects") for entry in parsed[name] for bullet in entry["bullets"]))
+    summary = parsed["sections"].get("summary", "")
+
+    return {
+        "name": parsed["contact"]["name"],
+        "headline": _clip(summary.split(". ")[0]) if summary else (roles[0]["title"] if roles else ""),
+        "total_years": _years_of_experience(parsed),
+        "roles": roles[:PROFILE_MAX_ROLES],
+        "top_skills": top_skills(resume_content),
+        "achievements": [_clip(bullet) for bullet in bullets if NUMBER_PATTERN.search(bullet)][:PROFILE_MAX_ACHIEVEMENTS],
+        "education": list(dict.fromkeys(_clip(entry["header"]) for entry in parsed["education"] if entry["header"]))[:PROFILE_MAX_EDUCATION],
+        "source": "local",
+    }
+
+
+def top_skills(resume_content: str, limit: Optional[int] = PROFILE_MAX_SKILLS) -> List[str]:
+    """
+    Rank the taxonomy skills of a resume by number of mentions.
+
+    Args:
+        resume_content: Text content of the resume
+        limit: Maximum number of skills returned (None for all of them)
+
+    Returns:
+        list: Skill display names, most mentioned first (ties in order of first mention)
+    """
+    mentions = extract_skills(resume_content)
+    ranked = sorted(mentions, key=lambda skill_id: -mentions[skill_id])
+    return [skill_name(skill_id) for skill_id in ranked[:limit]]
+
+
+@timed_generator("resume_profile")
+def _model_profile(resume_content: str) -> Optional[Dict[str, Any]]:
+    """Ask the small model for the profile fields; None when it gives no usable answer."""
+    prompt = render_prompt(
+        "resume_profile",
+        max_roles=PROFILE_MAX_ROLES,
+        max_achievements=PROFILE_MAX_ACHIEVEMENTS,
+        max_education=PROFILE_MAX_EDUCATION,
+        resume=truncate_to_tokens(resume_content, PROFILE_INPUT_TOKENS),
+    )
+    response = generate_content(prompt, generation_config={"temperature": 0.1, "max_output_tokens": 1024}, generator="resume_profile", validate=json_validator())
+    if not response or not getattr(response, "text", None):
+        return None
+
+    json_match = re.search(r"({[\s\S]*})", response.text)
+    try:
+        data = json.loads(json_match.group(1) if json_match else response.text)
+    except json.JSONDecodeError:
+        record_json_failure("resume_profile")
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _merge_model_profile(profile: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+    """Overlay the model's answer on a local profile, keeping local values for missing or malformed fields."""
+    merged = dict(profile, source="model")
+    if isinstance(data.get("headline"), str) and data["headline"].strip():
+        merged["headline"] = _clip(data["headline"])
+    if isinstance(data.get("total_years"), (int, float)) and not isinstance(data["total_years"], bool) and 0 <= data["total_years"] < 70:
+        merged["total_years"] = int(data["total_years"])
+
+    roles = [role for role in data.get("roles") or [] if isinstance(role, dict) and isinstance(role.get("title"), str) and role["title"].strip()]
+    if roles:
+        merged["roles"] = [{field: _clip(role.get(field) or "") for field in ("title", "company", "dates")} for role in roles[:PROFILE_MAX_ROLES]]
+    for field, limit in (("achievements", PROFILE_MAX_ACHIEVEMENTS), ("education", PROFILE_MAX_EDUCATION)):
+        items = [_clip(item) for item in data.get(field) or [] if isinstance(item, str) and item.strip()]
+        if items:
+            merged[field] = items[:limit]
+    return merged
+
+
+def _build_profile(resume_content: str) -> Dict[str, Any]:
+    """Build a profile with the small model, over the local one so every field has a value."""
+    profile = _local_profile(resume_content)
+    data = None
+    if RESUME_PROFILE_SOURCE == "model":
+        try:
+            data = _model_profile(resume_content)
+        except Exception as e:
+            logger.warning(f"Building the resume profile with the model failed, using the local profile: {str(e)}")
+    if data is not None:
+        profile = _merge_model_profile(profile, data)
+
+    logger.info(f"Built {profile['source']} resume profile of ~{estimate_tokens(format_profile(profile))} tokens")
+    return profile
+
+
+def get_resume_profile(resume_content: str) -> Dict[str, Any]:
+    """
+    Return the profile of a resume, building it on first use.
+
+    Concurrent generators asking for the profile of the same resume share one build.
+
+    Args:
+        resume_content: Text content of the resume
+
+    Returns:
+        dict: {"name", "headline", "total_years", "roles": [{"title", "company", "dates"}],
+            "top_skills", "achievements", "education", "source": "model" | "local"}.
+            Callers share the cached dict and must not modify it.
+    """
+    # Profiles built with an earlier version of the prompt are not reused
+    key = (template_key("resume_profile"), content_hash(resume_content or ""))
+    return _profiles.get_or_build(key, lambda: _build_profile(resume_content or ""))
+
+
+def format_profile(profile: Dict[str, Any], max_tokens: int = PROFILE_MAX_TOKENS) -> str:
+    """
+    Render a profile as compact prompt text.
+
+    Args:
+        profile: Result of get_resume_profile()
+        max_tokens: Maximum length of the text
+
+    Returns:
+        str: One line per field, achievements as "- " lines
+    """
+    lines = []
+    if profile.get("name") or profile.get("headline"):
+        lines.append("Candidate: " + " - ".join(part for part in (profile.get("name"), profile.get("headline")) if part))
+    if profile.get("total_years") is not None:
+        lines.append(f"Experience: about {profile['total_years']} years")
+    if profile.get("roles"):
+        roles = [role["title"] + (f" at {role['company']}" if role.get("company") else "") + (f" ({role['dates']})" if role.get("dates") else "") for role in profile["roles"]]
+        lines.append("Roles: " + "; ".join(roles))
+    if profile.get("top_skills"):
+        lines.append("Top skills: " + ", ".join(profile["top_skills"]))
+    if profile.get("achievements"):
+        lines.append("Achievements:\n" + "\n".join(f"- {achievement}" for achievement in profile["achievements"]))
+    if profile.get("education"):
+        lines.append("Education: " + "; ".join(profile["education"]))
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+
+def resume_profile_text(resume_content: str) -> str:
+    """Return the rendered profile of a resume (see get_resume_profile and format_profile)."""
+    return format_profile(get_resume_profile(resume_content))
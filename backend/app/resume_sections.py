@@ -0,0 +1,231 @@
+"""
+Resume sections module.
+This module splits extracted resume text into its sections (contact, summary,
+experience entries, education, skills and any other standard section) and caches
+analysis results per section.
+
+A resume is parsed once per content hash. Each section carries its own content hash,
+so generators can key results by the sections they read: when a user edits only their
+Skills section, a re-run finds every other section's results in the cache and
+prompts the model for the Skills section alone.
+"""
+
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .ats_rules import BULLET_PATTERN, EMAIL_PATTERN, PHONE_PATTERN, SPECIAL_BULLET_PATTERN, YEAR_PATTERN, section_for_heading
+from .cache import BoundedCache, content_hash
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bounds of the parsed-resume cache and of the per-section result cache
+RESUME_SECTIONS_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_SECTIONS_CACHE_MAX_ENTRIES", "256"))
+SECTION_RESULTS_MAX_ENTRIES = int(os.getenv("SECTION_RESULTS_MAX_ENTRIES", "2048"))
+SECTION_RESULTS_TTL_SECONDS = float(os.getenv("SECTION_RESULTS_TTL_SECONDS", str(2 * 60 * 60)))
+
+# Unlabeled lines at the top of a resume longer than this are a summary, not contact details,
+# unless they hold an email address or a link
+CONTACT_LINE_MAX_CHARS = 90
+CONTACT_MAX_LINES = 6
+
+# Sections split into entries (one per role, project or degree)
+ENTRY_SECTIONS = ("experience", "projects", "education")
+
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+|\b[\w-]+\.(?:com|io|dev|me|org)/\S*", re.IGNORECASE)
+SKILL_SEPARATOR_PATTERN = re.compile(r"\s*(?:[,;|•·]|\s/\s)\s*")
+SKILL_LABEL_PATTERN = re.compile(r"^[^:]{1,30}:\s*")
+
+_sections_cache = BoundedCache(max_entries=RESUME_SECTIONS_CACHE_MAX_ENTRIES)
+_section_results = BoundedCache(max_entries=SECTION_RESULTS_MAX_ENTRIES, ttl_seconds=SECTION_RESULTS_TTL_SECONDS)
+
+
+def _strip_bullet(line: str) -> str:
+    line = BULLET_PATTERN.sub("", line, count=1)
+    return SPECIAL_BULLET_PATTERN.sub("", line, count=1).strip()
+
+
+def is_bullet_line(line: str) -> bool:
+    """Whether a line starts with a bullet (plain, numbered or decorative)."""
+    return bool(BULLET_PATTERN.match(line) or SPECIAL_BULLET_PATTERN.match(line))
+
+
+def _parse_entries(lines: List[str]) -> List[Dict[str, Any]]:
+    """
+    Split a section into entries: header lines (title, employer, dates) followed by bullets.
+
+    A header line after bullets, or a second dated header line, starts the next entry.
+    """
+    entries: List[Dict[str, Any]] = []
+    for line in lines:
+        if is_bullet_line(line):
+            if not entries:
+                entries.append({"header": [], "dates": [], "bullets": []})
+            entries[-1]["bullets"].append(_strip_bullet(line))
+            continue
+
+        dates = YEAR_PATTERN.findall(line)
+        current = entries[-1] if entries else None
+        if current is None or current["bullets"] or (dates and current["dates"]):
+            entries.append({"header": [], "dates": [], "bullets": []})
+            current = entries[-1]
+        current["header"].append(line.strip())
+        current["dates"].extend(dates)
+
+    return [{"header": " | ".join(entry["header"]), "dates": entry["dates"], "bullets": entry["bullets"]} for entry in entries]
+
+
+def _parse_skills(lines: List[str]) -> List[str]:
+    """Split a skills section into individual skills, dropping labels such as "Languages:"."""
+    skills: Dict[str, str] = {}
+    for line in lines:
+        for item in SKILL_SEPARATOR_PATTERN.split(SKILL_LABEL_PATTERN.sub("", _strip_bullet(line))):
+            item = item.strip(" .")
+            if item and len(item) <= 40:
+                skills.setdefault(item.lower(), item)
+    return list(skills.values())
+
+
+def _parse_contact(lines: List[str]) -> Dict[str, Any]:
+    text = "\n".join(lines)
+    email = EMAIL_PATTERN.search(text)
+    phone = PHONE_PATTERN.search(text)
+    return {
+        "name": lines[0].strip() if lines else "",
+        "email": email.group() if email else "",
+        "phone": phone.group().strip() if phone else "",
+        "links": URL_PATTERN.findall(text),
+    }
+
+
+def _section_name(heading: str, section: str) -> str:
+    """Name a section by its standard section, or by its own heading for the miscellaneous ones (awards, languages...)."""
+    if section != "other":
+        return section
+    return "_".join(re.findall(r"[a-z]+", heading.lower()))
+
+
+def parse_resume(resume_content: str) -> Dict[str, Any]:
+    """
+    Split resume text into sections, parsing each resume only once per content hash.
+
+    Lines before the first standard heading are the contact block (short lines at the
+    top) followed by an unlabeled summary. A resume with no standard headings at all is
+    kept as a single "content" section.
+
+    Args:
+        resume_content: Text content of the resume
+
+    Returns:
+        dict: {
+            "resume_hash": content hash of the text,
+            "sections": section name -> section text, in resume order,
+            "headings": section name -> heading as written,
+            "hashes": section name -> content hash of the section text,
+            "contact": {"name", "email", "phone", "links"},
+            "experience" / "projects" / "education": [{"header", "dates", "bullets"}],
+            "skills": [skill, ...]
+        }
+        Callers share the cached dict and must not modify it.
+    """
+    resume_hash = content_hash(resume_content or "")
+    parsed = _sections_cache.get(resume_hash)
+    if parsed is not None:
+        return parsed
+
+    lines = [line.rstrip() for line in (resume_content or "").splitlines() if line.strip()]
+    blocks: Dict[str, List[str]] = {}
+    headings: Dict[str, str] = {}
+    current = None
+    for line in lines:
+        section = section_for_heading(line)
+        if section is not None:
+            current = _section_name(line, section)
+            headings.setdefault(current, line.strip().rstrip(":"))
+            blocks.setdefault(current, [])
+        elif current is not None:
+            blocks[current].append(line)
+        else:
+            blocks.setdefault("preamble", []).append(line)
+
+    # Split the unlabeled top of the resume into contact details and a summary paragraph
+    preamble = blocks.pop("preamble", [])
+    contact_lines = []
+    for line in preamble[:CONTACT_MAX_LINES]:
+        if len(line) > CONTACT_LINE_MAX_CHARS and contact_lines and not (EMAIL_PATTERN.search(line) or URL_PATTERN.search(line)):
+            break
+        contact_lines.append(line)
+    rest = preamble[len(contact_lines) :]
+    ordered = {"contact": contact_lines}
+    if rest:
+        ordered["summary" if blocks else "content"] = rest
+    for name, block in blocks.items():
+        ordered[name] = ordered.get(name, []) + block
+
+    sections = {name: "\n".join(block) for name, block in ordered.items() if block}
+    parsed = {
+        "resume_hash": resume_hash,
+        "sections": sections,
+        "headings": {name: headings.get(name, name.replace("_", " ").title()) for name in sections},
+        "hashes": {name: content_hash(text) for name, text in sections.items()},
+        "contact": _parse_contact(contact_lines),
+        "skills": _parse_skills(ordered.get("skills", [])),
+    }
+    for name in ENTRY_SECTIONS:
+        parsed[name] = _parse_entries(ordered.get(name, []))
+
+    _sections_cache.set(resume_hash, parsed)
+    return parsed
+
+
+def sections_text(parsed: Dict[str, Any], names: Iterable[str], keyed: bool = False) -> str:
+    """
+    Render some sections of a parsed resume back to text, each under its heading.
+
+    Args:
+        parsed: Result of parse_resume()
+        names: Section names to include (unknown names are skipped)
+        keyed: Label each section with its name ("[skills] TECHNICAL SKILLS") so the
+            model can refer to it
+
+    Returns:
+        str: The sections in resume order
+    """
+    wanted = set(names)
+    return "\n\n".join(f"{'[' + name + '] ' if keyed else ''}{parsed['headings'][name]}\n{text}" for name, text in parsed["sections"].items() if name in wanted)
+
+
+def sections_hash(parsed: Dict[str, Any], names: Iterable[str]) -> str:
+    """Return one content hash over several sections (missing sections count as empty)."""
+    return content_hash("\0".join(f"{name}:{parsed['hashes'].get(name, '')}" for name in sorted(set(names))))
+
+
+def get_section_results(kind: str, context: str, parts: Dict[str, str]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Look up cached per-section results.
+
+    Args:
+        kind: Generator the results belong to ("resume_review", "ats_optimize")
+        context: Hash of every non-resume input the results depend on (job description, instructions)
+        parts: Result part name -> hash of the resume sections that part was generated from
+
+    Returns:
+        tuple: (part name -> cached result, names of the parts that must be generated)
+    """
+    cached, missing = {}, []
+    for part, part_hash in parts.items():
+        result = _section_results.get((kind, context, part, part_hash))
+        if result is None:
+            missing.append(part)
+        else:
+            cached[part] = result
+    return cached, missing
+
+
+def store_section_result(kind: str, context: str, part: str, part_hash: str, result: Any) -> None:
+    """Cache one result part under the hash of the sections it was generated from (see get_section_results)."""
+    _section_results.set((kind, context, part, part_hash), result)
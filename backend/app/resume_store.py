@@ -0,0 +1,76 @@
+"""
+Resume session store module.
+This module keeps the extracted text of uploaded resumes so clients can upload a
+resume once and reference it by a content-addressed id across all endpoints.
+"""
+
+import logging
+import os
+from typing import BinaryIO, Optional, Tuple
+
+from .cache import BoundedCache, content_hash
+from .resume_analyzer import extract_text_from_pdf, read_text_upload, upload_buffer
+from .timing import stage
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bounds of the local store of extracted resume text
+RESUME_STORE_MAX_ENTRIES = int(os.getenv("RESUME_STORE_MAX_ENTRIES", "256"))
+RESUME_STORE_MAX_BYTES = int(os.getenv("RESUME_STORE_MAX_BYTES", str(16 * 1024 * 1024)))
+RESUME_STORE_TTL_SECONDS = float(os.getenv("RESUME_STORE_TTL_SECONDS", str(2 * 60 * 60)))
+
+_resume_store = BoundedCache(max_entries=RESUME_STORE_MAX_ENTRIES, max_bytes=RESUME_STORE_MAX_BYTES, ttl_seconds=RESUME_STORE_TTL_SECONDS)
+
+
+def store_resume_upload(resume: BinaryIO) -> Tuple[str, str, bool]:
+    """
+    Extract a resume upload once and keep its text under a content-addressed id.
+
+    Uploading the same file again returns the stored text without re-extracting it.
+
+    Args:
+        resume: Uploaded resume file (PDF or TXT)
+
+    Returns:
+        tuple: (resume_id, resume_content, whether the text was already stored)
+
+    Raises:
+        ValueError: If the file cannot be read
+    """
+    with stage("hash_upload"), upload_buffer(resume) as buffer:
+        resume_id = content_hash(buffer)
+
+    resume_content = _resume_store.get(resume_id)
+    if resume_content is not None:
+        return resume_id, resume_content, True
+
+    if resume.filename.lower().endswith(".pdf"):
+        resume_content = extract_text_from_pdf(resume)
+    else:
+        try:
+            with stage("decode_text"):
+                resume_content = read_text_upload(resume)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Error reading text file: {str(e)}") from e
+
+    _resume_store.set(resume_id, resume_content)
+    logger.info(f"Stored resume {resume_id} ({len(resume_content)} chars)")
+    return resume_id, resume_content, False
+
+
+def get_stored_resume(resume_id: str) -> Optional[str]:
+    """
+    Look up the extracted text of a previously uploaded resume.
+
+    Args:
+        resume_id: Id returned when the resume was uploaded
+
+    Returns:
+        str or None: The resume text, or None if the id is unknown or expired
+    """
+    if not resume_id or not isinstance(resume_id, str):
+        return None
+    return _resume_store.get(resume_id.strip())
@@ -0,0 +1,282 @@
+"""
+Resume revisions module.
+This module recognizes an upload as a revision of the resume a session analyzed last,
+and re-analyzes only what the revision can have changed.
+
+Users iterate: upload, read the feedback, tweak two bullets, upload again. The new text
+is diffed line by line against the session's previous version; jobs whose skills and
+requirement terms the changed words do not touch keep their cached analysis,
+the others are sent to the model again in one batch, and a small edit keeps the cached
+ATS analysis with its score moved by the change in the local rule score. The response
+says what changed in the scores.
+"""
+
+import copy
+import difflib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set
+
+from .ats_analyzer import analyze_ats_compatibility
+from .ats_rules import check_resume
+from .cache import BoundedCache, content_hash
+from .jd_cleaner import clean_job_description
+from .job_requirements import extract_requirements_locally
+from .match_scorer import STOPWORDS, score_jobs, tokenize
+from .prompts import template_key
+from .resume_analyzer import analyze_resume_content, generate_analysis
+from .resume_sections import parse_resume
+from .skill_taxonomy import covered_skills, extract_skills
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Latest resume text per session, and analysis results per resume version
+REVISION_MAX_SESSIONS = int(os.getenv("REVISION_MAX_SESSIONS", "512"))
+REVISION_MAX_BYTES = int(os.getenv("REVISION_MAX_BYTES", str(16 * 1024 * 1024)))
+REVISION_TTL_SECONDS = float(os.getenv("REVISION_TTL_SECONDS", str(2 * 60 * 60)))
+REVISION_RESULTS_MAX_ENTRIES = int(os.getenv("REVISION_RESULTS_MAX_ENTRIES", "4096"))
+
+# A new upload whose lines are less similar than this to the previous one is a different resume
+REVISION_MIN_SIMILARITY = float(os.getenv("REVISION_MIN_SIMILARITY", "0.5"))
+
+# Above this share of changed lines the cached ATS analysis is no longer trusted
+REVISION_ATS_REUSE_MAX_CHANGE = float(os.getenv("REVISION_ATS_REUSE_MAX_CHANGE", "0.2"))
+
+# Words of resume bullets and postings alike that say nothing about a job's requirements
+GENERIC_WORDS = frozenset(
+    """
+    across achieved added best build building built created daily day delivered developed drove end every
+    help helped high improved increased introduced key large launched led made managed multiple new own owned
+    reduced several teams time various well worked world
+    """.split()
+)
+
+_sessions = BoundedCache(max_entries=REVISION_MAX_SESSIONS, max_bytes=REVISION_MAX_BYTES, ttl_seconds=REVISION_TTL_SECONDS, sizeof=lambda entry: len(entry["text"]))
+_results = BoundedCache(max_entries=REVISION_RESULTS_MAX_ENTRIES, ttl_seconds=REVISION_TTL_SECONDS)
+
+
+def session_key(api_key: str, session_id: Optional[str] = None) -> str:
+    """
+    Identify the session a resume belongs to without keeping the API key.
+
+    Args:
+        api_key: The caller's Gemini API key (one per user)
+        session_id: Optional client-chosen id separating several resumes of the same user
+
+    Returns:
+        str: Hash identifying the session
+    """
+    return content_hash(f"{api_key}\0{session_id or ''}")
+
+
+def _job_key(job: Dict, custom_instructions: str) -> str:
+    """Hash of everything besides the resume that a job's analysis depends on, the prompt version included."""
+    fields = {field: job.get(field) or "" for field in ("job_title", "company_name", "job_description", "job_link")}
+    return content_hash(json.dumps([template_key("analysis"), fields, custom_instructions or ""], sort_keys=True))
+
+
+def diff_resumes(previous: str, current: str) -> Dict[str, Any]:
+    """
+    Diff two versions of a resume line by line.
+
+    Args:
+        previous: Text of the previous version
+        current: Text of the new version
+
+    Returns:
+        dict: {"similarity": 0-1 share of matching lines, "added": [...], "removed": [...],
+            "changed_ratio": share of lines added or removed, "changed_sections": [...]}
+    """
+    previous_lines = [line.strip() for line in previous.splitlines() if line.strip()]
+    current_lines = [line.strip() for line in current.splitlines() if line.strip()]
+    matcher = difflib.SequenceMatcher(None, previous_lines, current_lines, autojunk=False)
+
+    added, removed = [], []
+    for tag, previous_start, previous_end, current_start, current_end in matcher.get_opcodes():
+        if tag in ("replace", "delete"):
+            removed.extend(previous_lines[previous_start:previous_end])
+        if tag in ("replace", "insert"):
+            added.extend(current_lines[current_start:current_end])
+
+    previous_hashes = parse_resume(previous)["hashes"]
+    current_hashes = parse_resume(current)["hashes"]
+    changed_sections = [name for name in dict.fromkeys(list(current_hashes) + list(previous_hashes)) if previous_hashes.get(name) != current_hashes.get(name)]
+    total_lines = max(len(previous_lines) + len(current_lines), 1)
+    return {
+        "similarity": matcher.ratio(),
+        "added": added,
+        "removed": removed,
+        "changed_ratio": (len(added) + len(removed)) / total_lines,
+        "changed_sections": changed_sections,
+    }
+
+
+def _terms(text: str) -> Set[str]:
+    """Return the words of a text that can name a requirement: no stopwords, generic words or numbers."""
+    return {token for token in tokenize(text) if token not in STOPWORDS and token not in GENERIC_WORDS and not token.replace(".", "").isdigit()}
+
+
+def _requirement_terms(job: Dict) -> Set[str]:
+    """Return the terms of a job's title and requirements (its whole posting without boilerplate when it has no sections)."""
+    description = job.get("job_description", "") or ""
+    requirements = extract_requirements_locally(description, job.get("job_title", "") or "")
+    if requirements["sections_found"]:
+        text = "\n".join([requirements["title"]] + requirements["requirements"] + requirements["responsibilities"] + requirements["preferred_skills"])
+    else:
+        text = f"{requirements['title']}\n{clean_job_description(description)[0]}"
+    return _terms(text)
+
+
+def affected_jobs(delta: Dict[str, Any], job_details: List[Dict]) -> List[int]:
+    """
+    Find the jobs a revision can change the analysis of.
+
+    Only the words and skills the revision added or removed count (a number changed in a
+    bullet moves nothing), and a job is affected when one of them is among its skills or
+    the terms of its title and requirements; edits elsewhere cannot move its match.
+
+    Args:
+        delta: Result of diff_resumes()
+        job_details: List of dictionaries containing job details
+
+    Returns:
+        list: Indexes of the affected jobs
+    """
+    added_text, removed_text = "\n".join(delta["added"]), "\n".join(delta["removed"])
+    changed_terms = _terms(added_text) ^ _terms(removed_text)
+    # A tool added to the resume also changes the broader skill it implies (Lambda -> AWS)
+    changed_skills = covered_skills(extract_skills(added_text)) ^ covered_skills(extract_skills(removed_text))
+
+    affected = []
+    for index, job in enumerate(job_details):
+        job_skills = covered_skills(extract_skills(f"{job.get('job_title', '')}\n{job.get('job_description', '')}"))
+        if changed_skills & job_skills or changed_terms & _requirement_terms(job):
+            affected.append(index)
+    return affected
+
+
+def _score_changes(previous_jobs: List[Optional[Dict]], jobs: List[Dict], reanalyzed: List[int]) -> List[Dict]:
+    """Summarize how each job's match moved between the previous and the new version."""
+    changes = []
+    for index, job in enumerate(jobs):
+        previous = previous_jobs[index]
+        change = {"job_title": job.get("job_title"), "company_name": job.get("company_name"), "match_percentage": job.get("match_percentage"), "reanalyzed": index in reanalyzed}
+        if previous is not None:
+            change["previous_match_percentage"] = previous.get("match_percentage")
+            if isinstance(job.get("match_percentage"), (int, float)) and isinstance(previous.get("match_percentage"), (int, float)):
+                change["change"] = job["match_percentage"] - previous["match_percentage"]
+            previous_skills = set(previous.get("matching_skills") or [])
+            current_skills = set(job.get("matching_skills") or [])
+            change["skills_gained"] = sorted(current_skills - previous_skills)
+            change["skills_lost"] = sorted(previous_skills - current_skills)
+        changes.append(change)
+    return changes
+
+
+def _analyze_revision(previous: Dict, resume_content: str, delta: Dict, job_details: List[Dict], custom_instructions: str) -> Dict[str, Any]:
+    """Re-analyze the affected jobs and, for a large edit, the ATS compatibility; reuse the rest."""
+    job_keys = [_job_key(job, custom_instructions) for job in job_details]
+    previous_jobs = [_results.get(("job", previous["resume_hash"], key)) for key in job_keys]
+    affected = set(affected_jobs(delta, job_details))
+    reanalyze = [index for index in range(len(job_details)) if index in affected or previous_jobs[index] is None]
+
+    jobs: List[Optional[Dict]] = [None if index in reanalyze else copy.deepcopy(previous_jobs[index]) for index in range(len(job_details))]
+    token_usage: Dict[str, Any] = {}
+    if reanalyze:
+        analysis_result = generate_analysis(resume_content, [job_details[index] for index in reanalyze], custom_instructions)
+        if not analysis_result["success"]:
+            return analysis_result
+        token_usage["analysis"] = analysis_result.get("token_usage", {})
+        for index, job in zip(reanalyze, analysis_result["jobs"]):
+            jobs[index] = job
+    # Jobs the model left out of its answer get their local score
+    unanswered = [index for index, job in enumerate(jobs) if job is None]
+    if unanswered:
+        for index, local_result in zip(unanswered, score_jobs(resume_content, [job_details[index] for index in unanswered])):
+            jobs[index] = local_result
+
+    result: Dict[str, Any] = {"success": True, "results": jobs}
+    revision: Dict[str, Any] = {
+        "previous_resume_id": previous["resume_id"],
+        "lines_added": len(delta["added"]),
+        "lines_removed": len(delta["removed"]),
+        "changed_sections": delta["changed_sections"],
+        "reanalyzed_jobs": reanalyze,
+        "score_changes": _score_changes(previous_jobs, jobs, reanalyze),
+    }
+
+    # Same condition as a full analysis: the ATS check runs when the first job has a description
+    if job_details and job_details[0].get("job_description"):
+        previous_ats = _results.get(("ats", template_key("ats_analysis"), previous["resume_hash"]))
+        if previous_ats is not None and delta["changed_ratio"] <= REVISION_ATS_REUSE_MAX_CHANGE:
+            # A small edit leaves the model's judgement of the content standing; the mechanical part is re-checked locally
+            ats_analysis = copy.deepcopy(previous_ats)
+            rule_check = check_resume(resume_content)
+            ats_analysis["ats_score"] = max(0, min(100, previous_ats["ats_score"] + rule_check["score"] - previous_ats["rule_check"]["score"]))
+            ats_analysis["rule_check"] = rule_check
+            reanalyzed_ats = False
+        else:
+            ats_result = analyze_ats_compatibility(resume_content)
+            ats_analysis = ats_result["analysis"] if ats_result["success"] else None
+            if ats_result["success"]:
+                token_usage["ats_analysis"] = ats_result.get("token_usage", {})
+            reanalyzed_ats = True
+        if ats_analysis is not None:
+            result["ats_analysis"] = ats_analysis
+            revision["ats_change"] = {"reanalyzed": reanalyzed_ats, "ats_score": ats_analysis["ats_score"]}
+            if previous_ats is not None:
+                revision["ats_change"]["previous_ats_score"] = previous_ats["ats_score"]
+                revision["ats_change"]["change"] = ats_analysis["ats_score"] - previous_ats["ats_score"]
+
+    result["token_usage"] = token_usage
+    result["revision"] = revision
+    return result
+
+
+def analyze_with_revisions(session: str, resume_id: Optional[str], resume_content: str, job_details: List[Dict], custom_instructions: str = "") -> Dict[str, Any]:
+    """
+    Analyze a resume against jobs, incrementally when it is a revision of the session's previous resume.
+
+    Args:
+        session: Result of session_key()
+        resume_id: Id of the stored resume, if it was uploaded
+        resume_content: Text content of the resume
+        job_details: List of dictionaries containing job details (title, company, description)
+        custom_instructions: Optional custom instructions for the review
+
+    Returns:
+        dict: The analyze_resume_content() result; for a revision it also has "revision"
+            with the lines and sections that changed, the jobs re-analyzed and the score changes
+    """
+    resume_hash = content_hash(resume_content)
+    previous = _sessions.get(session)
+
+    delta = None
+    if previous is not None:
+        delta = diff_resumes(previous["text"], resume_content)
+        if delta["similarity"] < REVISION_MIN_SIMILARITY:
+            logger.info(f"Upload is a new resume for the session (similarity {delta['similarity']:.2f})")
+            delta = None
+
+    if delta is None:
+        result = analyze_resume_content(resume_content, job_details, custom_instructions)
+    else:
+        logger.info(f"Upload is a revision: {len(delta['added'])} lines added, {len(delta['removed'])} removed, sections {delta['changed_sections']}")
+        result = _analyze_revision(previous, resume_content, delta, job_details, custom_instructions)
+
+    if not result.get("success", False):
+        return result
+
+    _sessions.set(session, {"resume_id": resume_id or resume_hash, "resume_hash": resume_hash, "text": resume_content})
+    for job, job_result in zip(job_details, result["results"]):
+        # Local fallback scores are not cached, so the next run asks the model again
+        if job_result.get("score_source") == "local":
+            continue
+        _results.set(("job", resume_hash, _job_key(job, custom_instructions)), copy.deepcopy(job_result))
+    if "ats_analysis" in result:
+        _results.set(("ats", template_key("ats_analysis"), resume_hash), copy.deepcopy(result["ats_analysis"]))
+    return result
@@ -1,20 +1,21 @@
 import json
 import logging
 import os
+import time
 
-import google.generativeai as genai
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Request, Response, g, jsonify, request, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 
-from .ats_analyzer import analyze_ats_compatibility, generate_optimized_resume_sections
-from .cover_letter import generate_cover_letter
-from .email_reply import generate_email_reply
-from .interview_evaluator import evaluate_interview_answers
-from .interview_preparer import generate_interview_preparation_materials, generate_interview_questions
-from .learning_recommender import generate_detailed_learning_plan, generate_learning_recommendations
-from .motivational_message import generate_motivational_letter
-from .resume_analyzer import analyze_resume, generate_resume_review
+from .gemini_client import configure as configure_gemini
+from .memory import allocation_tracker
+from .metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT, REGISTRY
+from .profiling import start_request_profile
+from .timing import current_recorder, log_slow_request, server_timing_header, stage, start_recording, stop_recording
 
 
+# Generator modules are imported inside the handlers that use them, so a cold worker
+# can answer health checks before paying for them
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,6 +26,30 @@ api_bp = Blueprint("api", __name__, url_prefix="/api")
 # Maximum file size (2MB)
 MAX_FILE_SIZE = 2 * 1024 * 1024  # 2MB in bytes
 
+# Room for the other multipart fields (job details, instructions) sent alongside the file
+MAX_FORM_FIELDS_SIZE = 256 * 1024
+
+# Maximum request body size, enforced from the Content-Length header before the body is read
+MAX_CONTENT_LENGTH = MAX_FILE_SIZE + MAX_FORM_FIELDS_SIZE
+
+# /api/rank-jobs takes up to MAX_RANKED_JOBS postings, so its form fields or JSON body may be larger
+MAX_RANKED_JOBS = int(os.getenv("MAX_RANKED_JOBS", "500"))
+RANK_JOBS_MAX_CONTENT_LENGTH = MAX_FILE_SIZE + int(os.getenv("RANK_JOBS_MAX_FIELDS_SIZE", str(4 * 1024 * 1024)))
+
+# Number of top-ranked jobs sent to the Gemini analysis by default, and at most
+RANK_JOBS_TOP_K = int(os.getenv("RANK_JOBS_TOP_K", "3"))
+MAX_RANK_JOBS_TOP_K = 5
+
+FILE_TOO_LARGE_ERROR = f"Resume file too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB"
+
+
+class ApiRequest(Request):
+    """Request whose body size limit depends on the route (rank-jobs accepts hundreds of postings)"""
+
+    @property
+    def max_content_length(self):
+        return RANK_JOBS_MAX_CONTENT_LENGTH if self.path == "/api/rank-jobs" else MAX_CONTENT_LENGTH
+
 
 def validate_api_key(api_key: str) -> bool:
     """
@@ -87,7 +112,7 @@ def configure_gemini_with_key(api_key: str) -> bool:
     """
     try:
         # Configure Gemini with the provided key
-        genai.configure(api_key=api_key)
+        configure_gemini(api_key)
         return True
     except Exception as e:
         logger.error(f"Error configuring Gemini API: {str(e)}")
@@ -104,6 +129,10 @@ def check_file_size(file) -> bool:
     Returns:
         bool: Whether file is within size limits
     """
+    # A body no larger than the limit cannot contain a file larger than it
+    if request.content_length is not None and request.content_length <= MAX_FILE_SIZE:
+        return True
+
     # Seek to end of file to determine size
     file.seek(0, os.SEEK_END)
     file_size = file.tell()
@@ -113,11 +142,194 @@ def check_file_size(file) -> bool:
     return file_size <= MAX_FILE_SIZE
 
 
+def get_request_data():
+    """
+    Get the fields of the request, whether sent as form data or as a JSON body.
+
+    Returns:
+        dict: The form fields or the parsed JSON object
+    """
+    # Reading the body for the first time buffers and parses it (multipart uploads included)
+    with stage("upload"):
+        if request.is_json:
+            data = request.get_json(silent=True)
+            return data if isinstance(data, dict) else {}
+        return request.form
+
+
+def parse_job_details(data):
+    """
+    Parse the job details of a request, sent as a JSON string (form data) or a JSON list.
+
+    Args:
+        data: Request fields from get_request_data()
+
+    Returns:
+        tuple: (job_details list, error) where error is a (response, status) tuple or None
+    """
+    # Get job details from the request
+    job_details_str = data.get("job_details", "[]")
+    if not job_details_str:
+        # For backwards compatibility, check job_links as well
+        job_details_str = data.get("job_links", "[]")
+
+    # JSON requests can send the job details as a list directly
+    if isinstance(job_details_str, (list, dict)):
+        job_details_str = json.dumps(job_details_str)
+
+    logger.info(f"Received job details: {job_details_str[:200]}")  # Print only first 200 chars
+
+    # Parse job details with better error handling
+    try:
+        job_details = json.loads(job_details_str)
+
+        # Ensure it's a list (even if a single job came through)
+        if not isinstance(job_details, list):
+            job_details = [job_details]  # Ensure it's always a list
+
+        logger.info(f"Parsed {len(job_details)} job details")
+
+    except json.JSONDecodeError as e:
+        # Log the error and problematic string for debugging
+        logger.error(f"JSON parsing error: {str(e)}")
+        logger.error(f"Problematic JSON string: {job_details_str[:100]}")
+        return None, (jsonify({"success": False, "error": f"Invalid job details format: {str(e)}"}), 400)
+
+    if not all(isinstance(job, dict) for job in job_details):
+        return None, (jsonify({"success": False, "error": "Invalid job details format: each job must be an object"}), 400)
+
+    return job_details, None
+
+
+def get_resume_from_request():
+    """
+    Resolve the resume text of a request.
+
+    The resume can be an uploaded file (which is also stored for later reference),
+    the `resume_id` of a previously uploaded resume, or raw `resume_text`.
+
+    Returns:
+        tuple: (resume_content, resume_id, error) where error is a (response, status) tuple or None
+    """
+    from .resume_analyzer import normalize_resume_text
+    from .resume_store import get_stored_resume, store_resume_upload
+
+    data = get_request_data()
+
+    if "resume" in request.files:
+        resume = request.files["resume"]
+        # Check file size
+        if not check_file_size(resume):
+            return None, None, (jsonify({"success": False, "error": FILE_TOO_LARGE_ERROR}), 400)
+
+        if not resume.filename.endswith((".pdf", ".txt")):
+            return None, None, (jsonify({"success": False, "error": "Invalid file format. Please upload PDF or TXT"}), 400)
+
+        logger.info(f"Received resume: {resume.filename}")
+        try:
+            resume_id, resume_content, _ = store_resume_upload(resume)
+        except ValueError as e:
+            return None, None, (jsonify({"success": False, "error": f"Error processing resume: {str(e)}"}), 400)
+        return resume_content, resume_id, None
+
+    resume_id = data.get("resume_id")
+    if resume_id:
+        resume_content = get_stored_resume(resume_id)
+        if resume_content is None:
+            return None, None, (jsonify({"success": False, "error": "Unknown or expired resume_id. Please upload the resume again"}), 404)
+        return resume_content, resume_id, None
+
+    resume_text = data.get("resume_text")
+    if isinstance(resume_text, str) and resume_text.strip():
+        if len(resume_text) > MAX_FILE_SIZE:
+            return None, None, (jsonify({"success": False, "error": FILE_TOO_LARGE_ERROR}), 400)
+        return normalize_resume_text(resume_text), None, None
+
+    logger.error("No resume received")
+    return None, None, (jsonify({"success": False, "error": "No resume file provided"}), 400)
+
+
+def get_resume_profile_from_request(data):
+    """
+    Resolve the optional resume of a generator request into its profile digest.
+
+    Generators that work from the job alone (letters, interview questions) are
+    personalized when the request also sends a resume (`resume_id`, `resume_text` or a file).
+
+    Args:
+        data: Request fields
+
+    Returns:
+        tuple: (profile text, "" when no resume was sent, error) where error is a (response, status) tuple or None
+    """
+    from .resume_profile import resume_profile_text
+
+    if "resume" not in request.files and not data.get("resume_id") and not data.get("resume_text"):
+        return "", None
+
+    resume_content, _, error = get_resume_from_request()
+    if error:
+        return None, error
+    return resume_profile_text(resume_content), None
+
+
+@api_bp.app_errorhandler(RequestEntityTooLarge)
+def request_too_large(error):
+    """Return the API's JSON error format when a request body exceeds MAX_CONTENT_LENGTH"""
+    return jsonify({"success": False, "error": FILE_TOO_LARGE_ERROR}), 413
+
+
+@api_bp.before_request
+def start_request_metrics():
+    """Start timing the request and its stages; registered first so rejected requests are measured too"""
+    g.request_started = time.perf_counter()
+    g.stage_timing_token = start_recording()
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    if allocation_tracker is not None:
+        g.allocation_state = allocation_tracker.begin_request()
+
+
+@api_bp.after_request
+def record_response_status(response):
+    """Remember the response status and report the stages timed so far in a Server-Timing header"""
+    g.response_status = response.status_code
+    recorder = current_recorder()
+    if recorder is not None:
+        response.headers["Server-Timing"] = server_timing_header(recorder)
+    return response
+
+
+@api_bp.teardown_request
+def record_request_metrics(error=None):
+    """Record the request latency by route, once the response (including a streamed body) is complete"""
+    started = g.pop("request_started", None)
+    if started is None:
+        return
+
+    HTTP_REQUESTS_IN_FLIGHT.dec()
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    status = g.pop("response_status", 500)
+    HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, route=route, method=request.method, status=str(status))
+
+    recorder = stop_recording(g.pop("stage_timing_token"))
+    if recorder is not None:
+        log_slow_request(recorder, route, request.method, status)
+
+    allocation_state = g.pop("allocation_state", None)
+    if allocation_state is not None:
+        allocations = allocation_tracker.end_request(route, allocation_state)
+        logger.info(f"Allocations for {request.method} {route}: peak {allocations['peak'] / 1024:.0f} KB, retained {allocations['retained'] / 1024:.0f} KB")
+
+
 @api_bp.before_request
 def before_request():
-    """Middleware to check API key for all requests except health check"""
-    # Skip API key validation for health check endpoint and OPTIONS requests
-    if request.path == "/api/health" or request.method == "OPTIONS":
+    """Middleware to check API key for all requests except health check and metrics"""
+    # Reject oversized uploads from the Content-Length header, before the body is buffered
+    if request.content_length is not None and request.content_length > request.max_content_length:
+        return jsonify({"success": False, "error": FILE_TOO_LARGE_ERROR}), 413
+
+    # Skip API key validation for health check and metrics endpoints and OPTIONS requests
+    if request.path in ("/api/health", "/api/metrics") or request.method == "OPTIONS":
         return
 
     # Get and validate API key
@@ -126,6 +338,45 @@ def before_request():
         return jsonify({"success": False, "error": "Missing or invalid API key"}), 401
 
 
+@api_bp.before_request
+def start_profiling():
+    """Profile the request when profiling is enabled and the X-Profile header asks for it"""
+    label = (request.url_rule.rule if request.url_rule is not None else request.path).strip("/").replace("/", "-")
+    profile = start_request_profile(request.headers, label)
+    if profile is not None:
+        g.request_profile = profile
+
+
+@api_bp.after_request
+def finish_profiling(response):
+    """Return the profile of a profiled request as a download, or write it to a file"""
+    profile = g.get("request_profile")
+    if profile is None or response.is_streamed:
+        # Streamed bodies are generated after this hook; their profile is written on teardown
+        return response
+
+    g.pop("request_profile")
+    profile.stop()
+    if profile.output == "download":
+        filename, content, mimetype = profile.artifact()
+        artifact = Response(content, mimetype=mimetype)
+        artifact.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        artifact.headers["X-Profile-Status"] = str(response.status_code)
+        return artifact
+
+    response.headers["X-Profile-Artifact"] = os.path.basename(profile.save())
+    return response
+
+
+@api_bp.teardown_request
+def finish_streamed_profiling(error=None):
+    """Write the profile of a streamed response once its body has been generated"""
+    profile = g.pop("request_profile", None)
+    if profile is not None:
+        profile.stop()
+        profile.save()
+
+
 @api_bp.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
@@ -137,70 +388,81 @@ def health_check():
     ), 200
 
 
-@api_bp.route("/analyze", methods=["POST"])
-def analyze():
-    """Endpoint to analyze resume against job descriptions"""
-    # Get and validate API key
-    api_key = get_api_key_from_request()
-    if not api_key:
-        return jsonify({"success": False, "error": "Missing or invalid API key"}), 401
+@api_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Metrics endpoint in the Prometheus text exposition format"""
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
 
-    # Configure Gemini with the key
-    if not configure_gemini_with_key(api_key):
-        return jsonify({"success": False, "error": "Failed to configure API"}), 500
 
-    if "resume" not in request.files:
-        logger.error("No resume file received")
+@api_bp.route("/allocations", methods=["GET"])
+def allocations():
+    """Per-endpoint allocation report, available when ALLOCATION_TRACKING is enabled"""
+    if allocation_tracker is None:
+        return jsonify({"success": False, "error": "Allocation tracking is disabled. Set ALLOCATION_TRACKING=true"}), 404
+    return jsonify({"success": True, "endpoints": allocation_tracker.report()}), 200
+
+
+@api_bp.route("/resumes", methods=["POST"])
+def upload_resume():
+    """Endpoint to upload a resume once and get an id to reference it by in other endpoints"""
+    with stage("upload"):
+        has_resume = "resume" in request.files
+    if not has_resume:
         return jsonify({"success": False, "error": "No resume file provided"}), 400
 
-    resume = request.files["resume"]
-    # Check file size
-    if not check_file_size(resume):
-        return jsonify({"success": False, "error": f"Resume file too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB"}), 400
+    resume_content, resume_id, error = get_resume_from_request()
+    if error:
+        return error
 
-    # Get job details from the request
-    job_details_str = request.form.get("job_details", "[]")
-    if not job_details_str:
-        # For backwards compatibility, check job_links as well
-        job_details_str = request.form.get("job_links", "[]")
+    return jsonify({"success": True, "resume_id": resume_id, "characters": len(resume_content)}), 200
 
-    logger.info(f"Received resume: {resume.filename}")
-    logger.info(f"Received job details: {job_details_str[:200]}")  # Print only first 200 chars
 
-    # Parse job details with better error handling
-    try:
-        job_details = json.loads(job_details_str)
+@api_bp.route("/analyze", methods=["POST"])
+def analyze():
+    """Endpoint to analyze resume against job descriptions (mode=fast returns the local score only)"""
+    from .revisions import analyze_with_revisions, session_key
 
-        # Log the parsed job details for debugging
-        logger.info(f"Parsed job details: {job_details}")
+    # Get and validate API key
+    api_key = get_api_key_from_request()
+    if not api_key:
+        return jsonify({"success": False, "error": "Missing or invalid API key"}), 401
 
-        # Ensure it's a list (even if a single job came through)
-        if not isinstance(job_details, list):
-            job_details = [job_details]  # Ensure it's always a list
+    data = get_request_data()
+    mode = data.get("mode", "full")
+    if mode not in ("fast", "full"):
+        return jsonify({"success": False, "error": "Invalid mode. Use 'fast' or 'full'"}), 400
 
-    except json.JSONDecodeError as e:
-        # Log the error and problematic string for debugging
-        logger.error(f"JSON parsing error: {str(e)}")
-        logger.error(f"Problematic JSON string: {job_details_str[:100]}")
-        return jsonify({"success": False, "error": f"Invalid job details format: {str(e)}"}), 400
+    # Configure Gemini with the key (the fast mode never calls it)
+    if mode == "full" and not configure_gemini_with_key(api_key):
+        return jsonify({"success": False, "error": "Failed to configure API"}), 500
+
+    job_details, error = parse_job_details(data)
+    if error:
+        return error
 
     # Get custom instructions if provided
-    custom_instructions = request.form.get("custom_instructions", "")
+    custom_instructions = data.get("custom_instructions", "")
+
+    resume_content, resume_id, error = get_resume_from_request()
+    if error:
+        return error
+
+    if mode == "fast":
+        from .match_scorer import score_jobs
 
-    if not resume.filename.endswith((".pdf", ".txt")):
-        return (
-            jsonify(
-                {
-                    "success": False,
-                    "error": "Invalid file format. Please upload PDF or TXT",
-                }
-            ),
-            400,
-        )
+        with stage("local_score"):
+            result = {"success": True, "mode": "fast", "results": score_jobs(resume_content, job_details)}
+        if resume_id:
+            result["resume_id"] = resume_id
+        return jsonify(result), 200
 
-    result = analyze_resume(resume, job_details, custom_instructions)
+    # A revision of the session's previous resume only re-analyzes what the edit can have changed
+    session = session_key(api_key, request.headers.get("X-Session-Id") or data.get("session_id"))
+    result = analyze_with_revisions(session, resume_id, resume_content, job_details, custom_instructions)
 
     if result.get("success", False):
+        if resume_id:
+            result["resume_id"] = resume_id
         return jsonify(result), 200
     else:
         # Include more detailed error information
@@ -209,40 +471,103 @@ def analyze():
         return jsonify(result), 400
 
 
-@api_bp.route("/ats-check", methods=["POST"])
-def ats_check():
-    """Endpoint to analyze resume for ATS compatibility"""
+@api_bp.route("/rank-jobs", methods=["POST"])
+def rank_jobs():
+    """Endpoint to rank many job postings for one resume locally and analyze the best matches with Gemini"""
+    from .match_scorer import rank_jobs as rank_jobs_locally
+    from .resume_analyzer import generate_analysis
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
         return jsonify({"success": False, "error": "Missing or invalid API key"}), 401
 
-    # Configure Gemini with the key
-    if not configure_gemini_with_key(api_key):
-        return jsonify({"success": False, "error": "Failed to configure API"}), 500
+    data = get_request_data()
+    job_details, error = parse_job_details(data)
+    if error:
+        return error
+    if not job_details:
+        return jsonify({"success": False, "error": "No job details provided"}), 400
+    if len(job_details) > MAX_RANKED_JOBS:
+        return jsonify({"success": False, "error": f"Too many jobs. Maximum is {MAX_RANKED_JOBS}"}), 400
 
-    if "resume" not in request.files:
-        return jsonify({"success": False, "error": "No resume file provided"}), 400
+    try:
+        top_k = int(data.get("top_k", RANK_JOBS_TOP_K))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "top_k must be an integer"}), 400
+    if not 0 <= top_k <= MAX_RANK_JOBS_TOP_K:
+        return jsonify({"success": False, "error": f"top_k must be between 0 and {MAX_RANK_JOBS_TOP_K}"}), 400
+
+    custom_instructions = data.get("custom_instructions", "")
+
+    resume_content, resume_id, error = get_resume_from_request()
+    if error:
+        return error
+
+    with stage("local_rank"):
+        ranked = rank_jobs_locally(resume_content, job_details)
+    result = {"success": True, "total_jobs": len(ranked), "ranked": ranked, "analysis": []}
+    if resume_id:
+        result["resume_id"] = resume_id
+
+    # Only the best matches go through the Gemini analysis
+    top_jobs = [job_details[entry["index"]] for entry in ranked[:top_k]]
+    if top_jobs:
+        if not configure_gemini_with_key(api_key):
+            return jsonify({"success": False, "error": "Failed to configure API"}), 500
+
+        analysis_result = generate_analysis(resume_content, top_jobs, custom_instructions)
+        if analysis_result.get("success", False):
+            for entry, job_analysis in zip(ranked, analysis_result["jobs"]):
+                job_analysis["rank"] = entry["rank"]
+                job_analysis["index"] = entry["index"]
+            result["analysis"] = analysis_result["jobs"]
+            result["token_usage"] = analysis_result.get("token_usage", {})
+        else:
+            # The local ranking is still useful when the detailed analysis fails
+            logger.error(f"Analysis of the top {len(top_jobs)} jobs failed: {analysis_result.get('error')}")
+            result["analysis_error"] = analysis_result.get("error", "Unknown error")
 
-    resume = request.files["resume"]
-    # Check file size
-    if not check_file_size(resume):
-        return jsonify({"success": False, "error": f"Resume file too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB"}), 400
+    return jsonify(result), 200
 
-    if not resume.filename.endswith((".pdf", ".txt")):
-        return jsonify({"success": False, "error": "Invalid file format. Please upload PDF or TXT"}), 400
 
-    try:
-        # Extract resume text
-        if resume.filename.endswith(".pdf"):
-            from .resume_analyzer import extract_text_from_pdf
+@api_bp.route("/ats-check", methods=["POST"])
+def ats_check():
+    """Endpoint to analyze resume for ATS compatibility (mode=fast returns the local rule check only)"""
+    from .ats_analyzer import analyze_ats_compatibility
+    from .ats_rules import check_resume
 
-            resume_content = extract_text_from_pdf(resume)
-        else:
-            resume_content = resume.read().decode("utf-8")
+    # Get and validate API key
+    api_key = get_api_key_from_request()
+    if not api_key:
+        return jsonify({"success": False, "error": "Missing or invalid API key"}), 401
+
+    mode = get_request_data().get("mode", "full")
+    if mode not in ("fast", "full"):
+        return jsonify({"success": False, "error": "Invalid mode. Use 'fast' or 'full'"}), 400
+
+    # Configure Gemini with the key (the fast mode never calls it)
+    if mode == "full" and not configure_gemini_with_key(api_key):
+        return jsonify({"success": False, "error": "Failed to configure API"}), 500
 
-        # Analyze ATS compatibility
-        result = analyze_ats_compatibility(resume_content)
+    resume_content, resume_id, error = get_resume_from_request()
+    if error:
+        return error
+
+    try:
+        with stage("ats_rules"):
+            rule_check = check_resume(resume_content)
+
+        if mode == "fast":
+            result = {"success": True, "mode": "fast", "rule_check": rule_check}
+            if resume_id:
+                result["resume_id"] = resume_id
+            return jsonify(result), 200
+
+        # Analyze ATS compatibility, with the rule findings handed to the model
+        result = analyze_ats_compatibility(resume_content, rule_check)
+        if resume_id:
+            result["resume_id"] = resume_id
         return jsonify(result), 200 if result.get("success", False) else 400
 
     except Exception as e:
@@ -252,6 +577,8 @@ def ats_check():
 @api_bp.route("/ats-optimize", methods=["POST"])
 def ats_optimize():
     """Endpoint to get ATS-optimized resume sections"""
+    from .ats_analyzer import generate_optimized_resume_sections
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -261,33 +588,21 @@ def ats_optimize():
     if not configure_gemini_with_key(api_key):
         return jsonify({"success": False, "error": "Failed to configure API"}), 500
 
-    if "resume" not in request.files:
-        return jsonify({"success": False, "error": "No resume file provided"}), 400
-
-    if "job_description" not in request.form:
+    data = get_request_data()
+    if "job_description" not in data:
         return jsonify({"success": False, "error": "No job description provided"}), 400
 
-    resume = request.files["resume"]
-    # Check file size
-    if not check_file_size(resume):
-        return jsonify({"success": False, "error": f"Resume file too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB"}), 400
-
-    job_description = request.form["job_description"]
+    job_description = data["job_description"]
 
-    if not resume.filename.endswith((".pdf", ".txt")):
-        return jsonify({"success": False, "error": "Invalid file format. Please upload PDF or TXT"}), 400
+    resume_content, resume_id, error = get_resume_from_request()
+    if error:
+        return error
 
     try:
-        # Extract resume text
-        if resume.filename.endswith(".pdf"):
-            from .resume_analyzer import extract_text_from_pdf
-
-            resume_content = extract_text_from_pdf(resume)
-        else:
-            resume_content = resume.read().decode("utf-8")
-
         # Generate optimized sections
         result = generate_optimized_resume_sections(resume_content, job_description)
+        if resume_id:
+            result["resume_id"] = resume_id
         return jsonify(result), 200 if result.get("success", False) else 400
 
     except Exception as e:
@@ -297,6 +612,8 @@ def ats_optimize():
 @api_bp.route("/learning-recommendations", methods=["POST"])
 def learning_recommendations():
     """Endpoint to get learning recommendations for skills"""
+    from .learning_recommender import generate_learning_recommendations
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -317,6 +634,8 @@ def learning_recommendations():
 @api_bp.route("/learning-plan", methods=["POST"])
 def learning_plan():
     """Endpoint to get a detailed learning plan for a skill"""
+    from .learning_recommender import generate_detailed_learning_plan
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -337,6 +656,8 @@ def learning_plan():
 @api_bp.route("/cover-letter", methods=["POST"])
 def generate_letter():
     """Endpoint to generate a cover letter"""
+    from .cover_letter import generate_cover_letter
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -359,13 +680,19 @@ def generate_letter():
     # Format job details for the cover letter generator
     job_details = {"company_name": data["company_name"], "job_title": data["job_title"], "job_description": data["job_description"], "job_link": data.get("job_link", "")}
 
-    result = generate_cover_letter(job_details, custom_instruction, language)
+    resume_profile, error = get_resume_profile_from_request(data)
+    if error:
+        return error
+
+    result = generate_cover_letter(job_details, custom_instruction, language, resume_profile)
     return jsonify(result), 200 if result.get("success", False) else 400
 
 
 @api_bp.route("/motivational-letter", methods=["POST"])
 def motivational_letter():
     """Endpoint to generate a motivational letter"""
+    from .motivational_message import generate_motivational_letter
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -395,13 +722,19 @@ def motivational_letter():
     # Create job details dictionary
     job_details = {"job_title": data["job_title"], "job_description": job_description, "company_name": company_name}
 
-    result = generate_motivational_letter(job_details)
+    resume_profile, error = get_resume_profile_from_request(data)
+    if error:
+        return error
+
+    result = generate_motivational_letter(job_details, resume_profile)
     return jsonify(result), 200 if result.get("success", False) else 400
 
 
 @api_bp.route("/email-reply", methods=["POST"])
 def email_reply():
     """Endpoint to generate an email reply"""
+    from .email_reply import generate_email_reply
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -428,6 +761,9 @@ def email_reply():
 @api_bp.route("/review-resume", methods=["POST"])
 def review_resume():
     """Endpoint to get detailed resume review"""
+    from .application_pack import build_job_context
+    from .resume_analyzer import generate_resume_review
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -437,48 +773,30 @@ def review_resume():
     if not configure_gemini_with_key(api_key):
         return jsonify({"success": False, "error": "Failed to configure API"}), 500
 
-    if "resume" not in request.files:
-        return jsonify({"success": False, "error": "No resume file provided"}), 400
-
-    if "job_description" not in request.form:
+    data = get_request_data()
+    if "job_description" not in data:
         return jsonify({"success": False, "error": "No job description provided"}), 400
 
-    resume = request.files["resume"]
-    # Check file size
-    if not check_file_size(resume):
-        return jsonify({"success": False, "error": f"Resume file too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB"}), 400
-
-    job_description = request.form["job_description"]
-    job_title = request.form.get("job_title", "")
-    company_name = request.form.get("company_name", "")
+    job_description = data["job_description"]
+    job_title = data.get("job_title", "")
+    company_name = data.get("company_name", "")
 
     # Get custom instructions if provided
-    custom_instructions = request.form.get("custom_instructions", "")
+    custom_instructions = data.get("custom_instructions", "")
 
-    if not resume.filename.endswith((".pdf", ".txt")):
-        return jsonify({"success": False, "error": "Invalid file format. Please upload PDF or TXT"}), 400
+    resume_content, resume_id, error = get_resume_from_request()
+    if error:
+        return error
 
     try:
-        # Extract resume text
-        if resume.filename.endswith(".pdf"):
-            from .resume_analyzer import extract_text_from_pdf
-
-            resume_content = extract_text_from_pdf(resume)
-        else:
-            resume_content = resume.read().decode("utf-8")
-
         # Add job title and company name to context if provided
-        job_context = job_description
-        if job_title and company_name:
-            job_context = f"Job Title: {job_title}\nCompany: {company_name}\n\n{job_description}"
-        elif job_title:
-            job_context = f"Job Title: {job_title}\n\n{job_description}"
-        elif company_name:
-            job_context = f"Company: {company_name}\n\n{job_description}"
+        job_context = build_job_context({"job_title": job_title, "company_name": company_name, "job_description": job_description})
 
         # Generate review
         review_result = generate_resume_review(resume_content, job_context, custom_instructions)
         if review_result.get("success", False):
+            if resume_id:
+                review_result["resume_id"] = resume_id
             return jsonify(review_result), 200
         else:
             # Return more detailed error for debugging
@@ -490,6 +808,55 @@ def review_resume():
         return jsonify({"success": False, "error": f"Error processing resume: {str(e)}"}), 400
 
 
+@api_bp.route("/application-pack", methods=["POST"])
+def application_pack():
+    """Endpoint to generate a full application pack for one resume and one job, streamed section by section"""
+    from .application_pack import build_application_pack_stages, run_application_pack
+
+    # Get and validate API key
+    api_key = get_api_key_from_request()
+    if not api_key:
+        return jsonify({"success": False, "error": "Missing or invalid API key"}), 401
+
+    # Configure Gemini with the key
+    if not configure_gemini_with_key(api_key):
+        return jsonify({"success": False, "error": "Failed to configure API"}), 500
+
+    data = get_request_data()
+    if not all(data.get(key) for key in ["company_name", "job_title", "job_description"]):
+        return jsonify({"success": False, "error": "Missing required job details"}), 400
+
+    job_details = {"job_title": data["job_title"], "company_name": data["company_name"], "job_description": data["job_description"], "job_link": data.get("job_link", "")}
+    custom_instructions = data.get("custom_instructions", "")
+    language = data.get("language", "en")
+
+    # Extract the resume once for every section
+    extract_started = time.perf_counter()
+    resume_content, resume_id, error = get_resume_from_request()
+    if error:
+        return error
+    timings = {"resume": round((time.perf_counter() - extract_started) * 1000, 1)}
+
+    logger.info(f"Generating application pack for {job_details['job_title']} at {job_details['company_name']}")
+    events = run_application_pack(build_application_pack_stages(resume_content, job_details, custom_instructions, language), timings)
+
+    # Clients that cannot consume a stream can ask for a single JSON response
+    if request.args.get("stream", "true").lower() == "false":
+        sections = {}
+        for event in events:
+            if event["section"] == "summary":
+                return jsonify({"success": event["success"], "resume_id": resume_id, "sections": sections, "timings": event["timings"]}), 200
+            sections[event["section"]] = event["result"]
+
+    def generate():
+        # Stream one JSON object per line, as each section completes
+        yield json.dumps({"section": "resume", "success": True, "resume_id": resume_id, "elapsed_ms": timings["resume"]}) + "\n"
+        for event in events:
+            yield json.dumps(event) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
 @api_bp.route("/supported-languages", methods=["GET"])
 def get_supported_languages():
     """Endpoint to get supported languages for cover letter generation"""
@@ -512,9 +879,27 @@ def get_email_tones():
     return jsonify({"success": True, "tones": email_tones}), 200
 
 
+@api_bp.route("/prompts", methods=["GET"])
+def get_prompts():
+    """Endpoint to list the prompt templates with their versions, cache keys and instruction tokens"""
+    from .prompts import describe_templates
+
+    return jsonify({"success": True, "templates": describe_templates()}), 200
+
+
+@api_bp.route("/model-routing", methods=["GET"])
+def get_model_routing():
+    """Endpoint to get the model routing rules and the latency observed per model"""
+    from .model_router import describe_routing
+
+    return jsonify({"success": True, "routing": describe_routing()}), 200
+
+
 @api_bp.route("/interview-questions", methods=["POST"])
 def interview_questions():
     """Endpoint to generate interview questions based on job details"""
+    from .interview_preparer import generate_interview_questions
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -532,13 +917,19 @@ def interview_questions():
     job_details = {"job_title": data["job_title"], "company_name": data["company_name"], "job_description": data.get("job_description", ""), "job_link": data.get("job_link", "")}
 
     logger.info(f"Generating interview questions for {job_details['job_title']} at {job_details['company_name']}")
-    result = generate_interview_questions(job_details)
+    resume_profile, error = get_resume_profile_from_request(data)
+    if error:
+        return error
+
+    result = generate_interview_questions(job_details, resume_profile)
     return jsonify(result), 200 if result.get("success", False) else 400
 
 
 @api_bp.route("/interview-preparation", methods=["POST"])
 def interview_preparation():
     """Endpoint to generate comprehensive interview preparation materials"""
+    from .interview_preparer import generate_interview_preparation_materials
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
@@ -556,13 +947,19 @@ def interview_preparation():
     job_details = {"job_title": data["job_title"], "company_name": data["company_name"], "job_description": data.get("job_description", ""), "job_link": data.get("job_link", "")}
 
     logger.info(f"Generating interview preparation materials for {job_details['job_title']} at {job_details['company_name']}")
-    result = generate_interview_preparation_materials(job_details)
+    resume_profile, error = get_resume_profile_from_request(data)
+    if error:
+        return error
+
+    result = generate_interview_preparation_materials(job_details, resume_profile)
     return jsonify(result), 200 if result.get("success", False) else 400
 
 
 @api_bp.route("/evaluate-answers", methods=["POST"])
 def evaluate_answers():
     """Endpoint to evaluate interview answers"""
+    from .interview_evaluator import evaluate_interview_answers
+
     # Get and validate API key
     api_key = get_api_key_from_request()
     if not api_key:
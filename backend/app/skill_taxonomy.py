@@ -0,0 +1,233 @@
+"""
+Skill taxonomy module.
+This module maps the many names of a skill ("JS", "JavaScript", "ECMAScript") to one
+canonical id, using the taxonomy bundled in data/skill_taxonomy.json.
+
+Extraction compiles every alias into a single trie-shaped regular expression, so a
+text is scanned once, in C, however many aliases there are: each position follows at
+most one branch of the trie instead of trying every alias in turn. Skill names returned
+by the model are normalized with the same aliases before they feed recommendations,
+caches and scoring.
+"""
+
+import json
+import logging
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "skill_taxonomy.json"))
+
+# An ambiguous alias ("Go", "R", "Spring") only counts with its exact capitalization and
+# within this many characters of another skill, i.e. in a list of skills
+AMBIGUOUS_CONTEXT_CHARS = 40
+
+# Characters that continue a word: an alias must not be preceded or followed by one
+_WORD_CHARS = r"\w+#&"
+_WHITESPACE = re.compile(r"\s+")
+# An ambiguous alias inside a hyphenated compound ("Go-to-Market", "Spring-loaded", "pre-C")
+# is part of another word, not the skill
+_HYPHEN_BEFORE = re.compile(r"\w-$")
+_HYPHEN_AFTER = re.compile(r"^-\w")
+
+
+def normalize_alias(text: str) -> str:
+    """Lowercase a skill name and collapse its whitespace, the form aliases are indexed by."""
+    return _WHITESPACE.sub(" ", (text or "").strip().lower())
+
+
+def _compile_trie(aliases: Iterable[str]) -> "re.Pattern":
+    """
+    Compile aliases into one regular expression shaped like their trie.
+
+    Shared prefixes are matched once, children are tried only after their prefix matched,
+    and optional suffixes are greedy, so the longest alias at a position wins.
+
+    Args:
+        aliases: Normalized aliases
+
+    Returns:
+        re.Pattern: Pattern matching any alias on word boundaries of a lowercased text
+    """
+    trie: Dict = {}
+    for alias in aliases:
+        node = trie
+        for char in alias:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        branches = []
+        for char in sorted(child for child in node if child):
+            token = r"\s+" if char == " " else re.escape(char)
+            branches.append(token + build(node[char]))
+        if not branches:
+            return ""
+        alternation = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A complete alias can stop here; greedy "?" still tries the longer ones first
+        return f"(?:{alternation})?" if "" in node else alternation
+
+    return re.compile(f"(?<![{_WORD_CHARS}])(?:{build(trie)})(?![{_WORD_CHARS}])")
+
+
+class SkillTaxonomy:
+    """Canonical skills with their aliases and a compiled matcher over all of them."""
+
+    def __init__(self, skills: List[Dict]):
+        """
+        Args:
+            skills: Taxonomy entries with "id", "name", "category", "aliases",
+                optional "ambiguous_aliases" (matched case-sensitively, in context) and an
+                optional "parent" (the broader skill a tool implies: Lambda -> AWS)
+        """
+        self.skills: Dict[str, Dict] = {}
+        self._aliases: Dict[str, str] = {}
+        self._ambiguous: Dict[str, str] = {}
+        # Names a skill can be referred to on its own (ids and display names included)
+        self._names: Dict[str, str] = {}
+        for skill in skills:
+            self.skills[skill["id"]] = {"id": skill["id"], "name": skill["name"], "category": skill.get("category", ""), "parent": skill.get("parent")}
+            for alias in skill.get("aliases", []):
+                self._aliases.setdefault(normalize_alias(alias), skill["id"])
+            for alias in skill.get("ambiguous_aliases", []):
+                self._ambiguous[alias] = skill["id"]
+            for alias in [skill["id"], skill["name"]] + skill.get("aliases", []) + skill.get("ambiguous_aliases", []):
+                self._names.setdefault(normalize_alias(alias), skill["id"])
+
+        self._pattern = _compile_trie(set(self._aliases) | {normalize_alias(alias) for alias in self._ambiguous})
+
+    def extract(self, text: str) -> Dict[str, int]:
+        """
+        Find the skills mentioned in a text.
+
+        Args:
+            text: Resume, job description or any other text
+
+        Returns:
+            dict: Canonical skill id -> number of mentions, in order of first mention
+        """
+        if not text:
+            return {}
+
+        lowered = text.lower()
+        certain, ambiguous = [], []
+        for match in self._pattern.finditer(lowered):
+            alias = normalize_alias(match.group())
+            skill_id = self._aliases.get(alias)
+            if skill_id is not None:
+                certain.append((match.start(), skill_id))
+            else:
+                original = _WHITESPACE.sub(" ", text[match.start() : match.end()])
+                in_compound = _HYPHEN_BEFORE.search(text[max(0, match.start() - 2) : match.start()]) or _HYPHEN_AFTER.match(text[match.end() : match.end() + 2])
+                if original in self._ambiguous and not in_compound:
+                    ambiguous.append((match.start(), self._ambiguous[original]))
+
+        mentions = certain + [(position, skill_id) for position, skill_id in ambiguous if any(abs(position - other) <= AMBIGUOUS_CONTEXT_CHARS for other, _ in certain)]
+        return dict(Counter(skill_id for _, skill_id in sorted(mentions)))
+
+    def canonical_id(self, name: str) -> Optional[str]:
+        """
+        Return the canonical id of a skill name, or None when the name is not in the taxonomy.
+
+        Exact aliases are tried first (ambiguous ones included: a name on its own is not
+        ambiguous), then a name that mentions exactly one known skill ("Python 3.11",
+        "Kubernetes (K8s)") resolves to that skill.
+        """
+        alias = normalize_alias(name)
+        if alias in self._names:
+            return self._names[alias]
+
+        mentioned = set(self.extract(name))
+        return mentioned.pop() if len(mentioned) == 1 else None
+
+    def name(self, skill_id: str) -> str:
+        """Return the display name of a canonical id (the id itself when unknown)."""
+        skill = self.skills.get(skill_id)
+        return skill["name"] if skill else skill_id
+
+    def covered(self, skill_ids: Iterable[str]) -> Set[str]:
+        """Return the skills with the broader skills they imply (a resume listing Lambda covers AWS)."""
+        covered = set()
+        for skill_id in skill_ids:
+            while skill_id is not None and skill_id not in covered:
+                covered.add(skill_id)
+                skill_id = self.skills.get(skill_id, {}).get("parent")
+        return covered
+
+
+def load_taxonomy(path: str = SKILL_TAXONOMY_PATH) -> SkillTaxonomy:
+    """
+    Load a skill taxonomy file.
+
+    Args:
+        path: JSON file with a "skills" list
+
+    Returns:
+        SkillTaxonomy: The taxonomy and its compiled matcher
+    """
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    taxonomy = SkillTaxonomy(data["skills"])
+    logger.info(f"Loaded {len(taxonomy.skills)} skills from {path}")
+    return taxonomy
+
+
+_taxonomy = load_taxonomy()
+
+
+def extract_skills(text: str) -> Dict[str, int]:
+    """Find the canonical skills mentioned in a text (see SkillTaxonomy.extract)."""
+    return _taxonomy.extract(text)
+
+
+def skill_name(skill_id: str) -> str:
+    """Return the display name of a canonical skill id."""
+    return _taxonomy.name(skill_id)
+
+
+def covered_skills(skill_ids: Iterable[str]) -> Set[str]:
+    """Return the skills with the broader skills they imply (see SkillTaxonomy.covered)."""
+    return _taxonomy.covered(skill_ids)
+
+
+def normalize_skill(name: str) -> Dict[str, str]:
+    """
+    Map a skill name, typically one returned by the model, to its canonical form.
+
+    Args:
+        name: Skill name as written by the user or the model
+
+    Returns:
+        dict: {"id", "name"}; names outside the taxonomy keep their text, with a
+            normalized id so they still deduplicate and cache consistently
+    """
+    skill_id = _taxonomy.canonical_id(name)
+    if skill_id is not None:
+        return {"id": skill_id, "name": _taxonomy.name(skill_id)}
+    cleaned = _WHITESPACE.sub(" ", str(name or "")).strip()
+    return {"id": "custom:" + normalize_alias(cleaned), "name": cleaned}
+
+
+def normalize_skills(names: Iterable[str]) -> List[Dict[str, str]]:
+    """
+    Normalize a list of skill names, dropping empty names and duplicates (aliases included).
+
+    Args:
+        names: Skill names
+
+    Returns:
+        list: {"id", "name"} dicts in the order the skills first appear
+    """
+    normalized: Dict[str, Dict[str, str]] = {}
+    for name in names:
+        if not isinstance(name, str) or not name.strip():
+            continue
+        skill = normalize_skill(name)
+        normalized.setdefault(skill["id"], skill)
+    return list(normalized.values())
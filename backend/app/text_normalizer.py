@@ -0,0 +1,226 @@
+"""
+Extracted text normalization module.
+This module cleans the text PDF extraction returns before it is stored and sent to prompts.
+
+PDF text carries typesetting artifacts that cost tokens and split words: ligatures ("ﬁ", "ﬂ"),
+non-breaking and zero-width spaces, words hyphenated across line breaks, runs of spaces
+from justified or positioned text, and the header and footer repeated on every page.
+Normalization is a few regular expression passes over each document (see
+`make bench-normalize` for its throughput and savings).
+
+What the ATS rules read is kept: bullets and decorative symbols are left as they are,
+unextractable glyphs ((cid:N), U+FFFD) too, and a wide gap between two words (a column or
+table artifact) becomes a single tab rather than a space.
+"""
+
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Tuple
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Lines at the top and at the bottom of a page searched for a repeated header or footer
+PAGE_FURNITURE_LINES = 3
+# Share of the pages a line must repeat on to be a header or footer
+PAGE_FURNITURE_MIN_SHARE = 0.6
+# Pages a line must repeat on when all of its numbers are ignored, not just the page numbers,
+# so that a date range ending two pages ("2019 - 2021", "2015 - 2018") is never taken as a footer
+PAGE_FURNITURE_MIN_PAGES_ANY_DIGITS = 3
+
+PAGE_NUMBER_PATTERN = re.compile(r"^(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$|^[-–]\s*\d{1,3}\s*[-–]$", re.IGNORECASE)
+DIGITS_PATTERN = re.compile(r"\d+")
+
+# Characters NFKC keeps that only add tokens: invisible characters, typographic quotes and hyphens
+CHARACTER_REPLACEMENTS = str.maketrans(
+    {
+        "\u200b": "",
+        "\u200c": "",
+        "\u200d": "",
+        "\u2060": "",
+        "\ufeff": "",
+        "\u2018": "'",
+        "\u2019": "'",
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u2010": "-",
+        "\u2212": "-",
+    }
+)
+
+# A word broken at the end of a line: "experi-" / "ence"; a soft hyphen is always a break
+LINE_HYPHEN_PATTERN = re.compile(r"([A-Za-z]+)(-|\u00ad)[ \t]*\n[ \t]*([a-z]+)")
+SOFT_HYPHEN = "\u00ad"
+WORD_PATTERN = re.compile(r"[A-Za-z]+")
+HYPHENATED_WORD_PATTERN = re.compile(r"[A-Za-z]+-[A-Za-z]+")
+# Endings that never start a word of their own, so "manage-" / "ment" is one word
+SUFFIX_PATTERN = re.compile(r"(?:tion|sion|ment|ness|ing|ence|ance|ity|ive|ed|er|al|ly|ous|able|ible|ize|ise|ist|ure|ship)s?$")
+
+# A gap of 4+ spaces or a tab between two words is a column boundary; shorter runs are spacing
+COLUMN_GAP_PATTERN = re.compile(r"(?<=\S)(?: {4,}|[ \t]*\t[ \t]*)(?=\S)")
+SPACE_RUN_PATTERN = re.compile(r" {2,}")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+
+
+def _furniture_key(line: str, page_number: int, page_count: int) -> str:
+    """Compare header and footer lines without their page numbers ("Page 2 of 3") and spacing."""
+    line = " ".join(line.split()).lower()
+    return DIGITS_PATTERN.sub(lambda match: "#" if int(match.group()) in (page_number, page_count) else match.group(), line)
+
+
+def _loose_furniture_key(line: str) -> str:
+    """Compare header and footer lines without any of their numbers."""
+    return DIGITS_PATTERN.sub("#", " ".join(line.split()).lower())
+
+
+def strip_page_furniture(pages: List[str]) -> Tuple[List[str], int]:
+    """
+    Remove page numbers and the headers and footers repeated across pages.
+
+    A line near the top or the bottom of a page is a header or footer when it repeats on
+    most pages, identical apart from its page number, or on at least
+    PAGE_FURNITURE_MIN_PAGES_ANY_DIGITS pages when all of its numbers are ignored. It is
+    kept where it first appears, since headers often hold the name and contact details,
+    and removed from the other pages. Lines that are only a page number are removed.
+
+    Args:
+        pages: Text of each page, in order
+
+    Returns:
+        tuple: (page texts without the furniture, number of lines removed)
+    """
+    page_lines = [page.splitlines() for page in pages]
+    zones = []
+    for page_number, lines in enumerate(page_lines, start=1):
+        filled = [index for index, line in enumerate(lines) if line.strip()]
+        zone = {}
+        for side, indexes in (("top", filled[:PAGE_FURNITURE_LINES]), ("bottom", filled[-PAGE_FURNITURE_LINES:])):
+            zone[side] = [(index, _furniture_key(lines[index], page_number, len(pages)), _loose_furniture_key(lines[index])) for index in indexes]
+        zones.append(zone)
+
+    repeated = set()
+    if len(pages) >= 2:
+        counts: Dict[Tuple[str, str, str], int] = {}
+        for zone in zones:
+            for side, entries in zone.items():
+                keys = {("exact", side, key) for _, key, _ in entries} | {("loose", side, loose_key) for _, _, loose_key in entries}
+                for entry in keys:
+                    counts[entry] = counts.get(entry, 0) + 1
+        min_pages = max(2, PAGE_FURNITURE_MIN_SHARE * len(pages))
+        min_pages_loose = max(PAGE_FURNITURE_MIN_PAGES_ANY_DIGITS, min_pages)
+        repeated = {entry for entry, count in counts.items() if count >= (min_pages if entry[0] == "exact" else min_pages_loose)}
+
+    seen, removed, cleaned = set(), 0, []
+    for lines, zone in zip(page_lines, zones):
+        drop = set()
+        for side, entries in zone.items():
+            for index, key, loose_key in entries:
+                if PAGE_NUMBER_PATTERN.match(lines[index].strip()):
+                    drop.add(index)
+                    continue
+                entry = next((entry for entry in (("exact", side, key), ("loose", side, loose_key)) if entry in repeated), None)
+                if entry is not None:
+                    if entry in seen:
+                        drop.add(index)
+                    seen.add(entry)
+        removed += len(drop)
+        cleaned.append("\n".join(line for index, line in enumerate(lines) if index not in drop))
+    return cleaned, removed
+
+
+def normalize_unicode(text: str) -> str:
+    """
+    Apply NFKC normalization (ligatures, full-width forms, non-breaking spaces) and drop invisible characters.
+
+    Args:
+        text: Extracted text
+
+    Returns:
+        str: Normalized text; soft hyphens are kept for dehyphenate()
+    """
+    return unicodedata.normalize("NFKC", text).translate(CHARACTER_REPLACEMENTS)
+
+
+def dehyphenate(text: str) -> Tuple[str, int]:
+    """
+    Rejoin words hyphenated across line breaks.
+
+    A hyphen at a line break is dropped when the joined word occurs elsewhere in the text
+    or the second part is a word ending ("manage-" / "ment"), and kept when the text has the
+    hyphenated form elsewhere or nothing settles it ("cross-" / "functional"). The rest of
+    the line stays on the next line.
+
+    Args:
+        text: Unicode-normalized text
+
+    Returns:
+        tuple: (text, number of words rejoined)
+    """
+    if not LINE_HYPHEN_PATTERN.search(text):
+        return text.replace(SOFT_HYPHEN, ""), 0
+    vocabulary = {word.lower() for word in WORD_PATTERN.findall(text)}
+    hyphenated = {word.lower() for word in HYPHENATED_WORD_PATTERN.findall(text)}
+    joined = 0
+
+    def rejoin(match: "re.Match") -> str:
+        nonlocal joined
+        head, hyphen, tail = match.groups()
+        word = f"{head}{tail}"
+        keep = hyphen != SOFT_HYPHEN and word.lower() not in vocabulary and (f"{head}-{tail}".lower() in hyphenated or not SUFFIX_PATTERN.fullmatch(tail))
+        if keep:
+            return f"{head}-{tail}\n"
+        joined += 1
+        return word + "\n"
+
+    text = LINE_HYPHEN_PATTERN.sub(rejoin, text)
+    return text.replace(SOFT_HYPHEN, ""), joined
+
+
+def collapse_whitespace(text: str) -> str:
+    """
+    Collapse runs of spaces, keeping column gaps as a single tab, strip line ends and limit blank lines to one.
+
+    Args:
+        text: Text to collapse
+
+    Returns:
+        str: Collapsed text
+    """
+    lines = []
+    for line in text.split("\n"):
+        line = SPACE_RUN_PATTERN.sub(" ", COLUMN_GAP_PATTERN.sub("\t", line.strip().replace("\r", "")))
+        lines.append(line)
+    return BLANK_LINES_PATTERN.sub("\n\n", "\n".join(lines)).strip()
+
+
+def normalize_pages(pages: List[str]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Normalize the page texts of an extracted PDF into one document.
+
+    Args:
+        pages: Text of each page, in order
+
+    Returns:
+        tuple: (normalized text, report with "input_chars", "output_chars",
+            "furniture_lines_removed" and "words_rejoined")
+    """
+    input_chars = sum(len(page) for page in pages)
+    pages, furniture = strip_page_furniture(pages)
+    text = normalize_unicode("\n".join(page for page in pages if page.strip()))
+    text, rejoined = dehyphenate(text)
+    text = collapse_whitespace(text)
+    report = {
+        "input_chars": input_chars,
+        "output_chars": len(text),
+        "furniture_lines_removed": furniture,
+        "words_rejoined": rejoined,
+    }
+    return text, report
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text that has no pages (e.g. a pasted or plain-text resume): Unicode, hyphenation and whitespace."""
+    return collapse_whitespace(dehyphenate(normalize_unicode(text or ""))[0])
@@ -0,0 +1,243 @@
+"""
+Stage timing module.
+This module times the stages of a request (upload parsing, PDF extraction, prompt
+construction, Gemini calls, response parsing) and reports them in a Server-Timing
+header and, for requests slower than SLOW_REQUEST_THRESHOLD_MS, in a structured log line.
+
+Timings are collected per request through a context variable, so generator modules
+record stages without knowing about Flask. Outside a request nothing is recorded.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Requests taking longer than this are logged with their stage breakdown
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "5000"))
+
+
+class StageRecorder:
+    """Accumulated duration and count of each stage of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._stages: Dict[str, list] = {}
+        # Application pack stages record from worker threads
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stages.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def timings(self) -> Dict[str, float]:
+        """Return stage name -> total milliseconds, in the order stages first ran."""
+        with self._lock:
+            return {name: round(seconds * 1000, 1) for name, (seconds, _) in self._stages.items()}
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: count for name, (_, count) in self._stages.items()}
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+
+class _GeneratorFrame:
+    """Timestamps of one generator call, split into prompt, Gemini and parse time by its Gemini calls."""
+
+    __slots__ = ("started", "model_started", "model_ended", "model_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.model_started = None
+        self.model_ended = None
+        self.model_seconds = 0.0
+
+
+_recorder: contextvars.ContextVar[Optional[StageRecorder]] = contextvars.ContextVar("stage_recorder", default=None)
+_generator_frame: contextvars.ContextVar[Optional[_GeneratorFrame]] = contextvars.ContextVar("generator_frame", default=None)
+
+
+def start_recording() -> contextvars.Token:
+    """
+    Start collecting stage timings for the current request.
+
+    Returns:
+        Token: Pass it to stop_recording when the request is done
+    """
+    return _recorder.set(StageRecorder())
+
+
+def current_recorder() -> Optional[StageRecorder]:
+    """Return the recorder of the current request, if any."""
+    return _recorder.get()
+
+
+def stop_recording(token: contextvars.Token) -> Optional[StageRecorder]:
+    """
+    Stop collecting stage timings and return what was collected.
+
+    Args:
+        token: Token returned by start_recording
+
+    Returns:
+        StageRecorder or None: The recorder of the finished request
+    """
+    recorder = _recorder.get()
+    try:
+        _recorder.reset(token)
+    except ValueError:
+        # Streamed responses finish in a different context than the one recording started in
+        _recorder.set(None)
+    return recorder
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """
+    Add the duration of a stage to the current request's timings.
+
+    Args:
+        name: Stage name (letters, digits, "_" and "." only, as used in Server-Timing)
+        seconds: Duration of the stage
+    """
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time the enclosed block as a stage of the current request.
+
+    Args:
+        name: Stage name (letters, digits, "_" and "." only, as used in Server-Timing)
+    """
+    if _recorder.get() is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def record_model_call(started: float, ended: float) -> None:
+    """
+    Attribute a Gemini call to the generator that made it.
+
+    Inside a function decorated with timed_generator, the call splits the generator's time
+    into prompt construction (before the first call), Gemini and parsing (after the last call).
+    Outside one it is recorded as a plain "gemini" stage.
+
+    Args:
+        started: perf_counter value when the call started
+        ended: perf_counter value when the call returned or failed
+    """
+    frame = _generator_frame.get()
+    if frame is None:
+        record_stage("gemini", ended - started)
+        return
+
+    if frame.model_started is None:
+        frame.model_started = started
+    frame.model_ended = ended
+    frame.model_seconds += ended - started
+
+
+def timed_generator(name: str) -> Callable:
+    """
+    Decorate a generator function so its prompt, Gemini and parse time are recorded as stages.
+
+    Stages are named "<name>.prompt", "<name>.gemini" and "<name>.parse".
+
+    Args:
+        name: Generator name used as the stage prefix
+
+    Returns:
+        callable: The decorator
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _recorder.get() is None:
+                return func(*args, **kwargs)
+
+            frame = _GeneratorFrame()
+            token = _generator_frame.set(frame)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _generator_frame.reset(token)
+                ended = time.perf_counter()
+                if frame.model_started is None:
+                    record_stage(f"{name}.prompt", ended - frame.started)
+                else:
+                    record_stage(f"{name}.prompt", frame.model_started - frame.started)
+                    record_stage(f"{name}.gemini", frame.model_seconds)
+                    record_stage(f"{name}.parse", ended - frame.model_ended)
+
+        return wrapper
+
+    return decorator
+
+
+def server_timing_header(recorder: StageRecorder) -> str:
+    """
+    Format the stages recorded so far as a Server-Timing header value.
+
+    Args:
+        recorder: Recorder of the current request
+
+    Returns:
+        str: e.g. 'upload;dur=3.2, extract_pdf;dur=41.0, total;dur=2510.4'
+    """
+    entries = [f"{name};dur={ms}" for name, ms in recorder.timings().items()]
+    entries.append(f"total;dur={recorder.elapsed_ms()}")
+    return ", ".join(entries)
+
+
+def log_slow_request(recorder: StageRecorder, route: str, method: str, status: int) -> None:
+    """
+    Log the stage breakdown of a request as one JSON line if it exceeded SLOW_REQUEST_THRESHOLD_MS.
+
+    Args:
+        recorder: Recorder of the finished request
+        route: Route rule of the request
+        method: HTTP method
+        status: Response status code
+    """
+    total_ms = recorder.elapsed_ms()
+    if total_ms < SLOW_REQUEST_THRESHOLD_MS:
+        return
+
+    logger.warning(
+        json.dumps(
+            {
+                "event": "slow_request",
+                "route": route,
+                "method": method,
+                "status": status,
+                "total_ms": total_ms,
+                "threshold_ms": SLOW_REQUEST_THRESHOLD_MS,
+                "stages": recorder.timings(),
+                "counts": {name: count for name, count in recorder.counts().items() if count > 1},
+            }
+        )
+    )
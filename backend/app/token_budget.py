@@ -0,0 +1,284 @@
+"""
+Token budgeting module.
+This module estimates prompt tokens locally and splits each endpoint's input token
+budget between the resume, the job description and the custom instructions, so
+inputs are trimmed by tokens rather than by a fixed number of characters.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .gemini_config import GEMINI_MODEL
+
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Average token cost per script for Gemini's tokenizer: Latin text packs about four
+# characters per token, CJK ideographs, kana and hangul cost about one token each,
+# and other scripts (Cyrillic, Arabic, accented text...) fall in between.
+ASCII_CHARS_PER_TOKEN = 4.0
+CJK_TOKENS_PER_CHAR = 1.0
+OTHER_CHARS_PER_TOKEN = 2.5
+
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]+")
+
+# Input budget per endpoint: (total tokens for the variable inputs, resume share, job description share, instructions share).
+# Shares a part does not need are handed to the parts that do. Totals can be tuned per deployment.
+ENDPOINT_INPUT_BUDGETS: Dict[str, Tuple[int, float, float, float]] = {
+    "analysis": (int(os.getenv("TOKEN_BUDGET_ANALYSIS", "2500")), 0.6, 0.3, 0.1),
+    "resume_review": (int(os.getenv("TOKEN_BUDGET_RESUME_REVIEW", "2200")), 0.6, 0.3, 0.1),
+    "ats_analysis": (int(os.getenv("TOKEN_BUDGET_ATS_ANALYSIS", "1800")), 1.0, 0.0, 0.0),
+    "ats_optimize": (int(os.getenv("TOKEN_BUDGET_ATS_OPTIMIZE", "2200")), 0.55, 0.45, 0.0),
+    "interview_questions": (int(os.getenv("TOKEN_BUDGET_INTERVIEW_QUESTIONS", "400")), 0.0, 1.0, 0.0),
+    "cover_letter": (int(os.getenv("TOKEN_BUDGET_COVER_LETTER", "1200")), 0.0, 0.8, 0.2),
+}
+# Tokens each job description of an analysis keeps at least, on top of the endpoint budget when
+# its share is too small for all the jobs: the 1500 characters per job sent before token budgets
+ANALYSIS_JOB_MIN_TOKENS = int(os.getenv("TOKEN_BUDGET_ANALYSIS_PER_JOB", "375"))
+
+# Multiplier applied to the raw estimate, calibrated against the model's token counter
+_calibration_factor = float(os.getenv("TOKEN_ESTIMATE_FACTOR", "1.0"))
+_calibration_lock = threading.Lock()
+CALIBRATION_SMOOTHING = 0.1
+
+
+def _raw_estimate(text: str) -> float:
+    """Estimate tokens from character classes, before calibration."""
+    if not text:
+        return 0.0
+
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    cjk_chars = len(text) - len(CJK_PATTERN.sub("", text)) if ascii_chars < len(text) else 0
+    other_chars = len(text) - ascii_chars - cjk_chars
+    return ascii_chars / ASCII_CHARS_PER_TOKEN + cjk_chars * CJK_TOKENS_PER_CHAR + other_chars / OTHER_CHARS_PER_TOKEN
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens the model will count for a text, without an API call.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(_raw_estimate(text) * _calibration_factor)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Trim a text to an estimated token budget, cutting at a word or line boundary.
+
+    Args:
+        text: Text to trim
+        max_tokens: Maximum estimated tokens to keep
+
+    Returns:
+        str: The text itself if it fits, otherwise its longest fitting prefix followed by "..."
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    # Start from the proportional cut and step back until the prefix fits
+    cut = int(len(text) * max_tokens / tokens)
+    while cut > 0 and estimate_tokens(text[:cut]) > max_tokens:
+        cut = int(cut * 0.95)
+
+    # Prefer not to split a word when a boundary is close by
+    boundary = max(text.rfind("\n", 0, cut), text.rfind(" ", 0, cut))
+    if boundary > cut * 0.9:
+        cut = boundary
+
+    return text[:cut].rstrip() + "..."
+
+
+def split_budget(total: int, needs: Dict[str, int], weights: Optional[Dict[str, float]] = None) -> Dict[str, int]:
+    """
+    Split a token budget between parts, handing what one part does not need to the others.
+
+    Args:
+        total: Tokens available
+        needs: Part name -> tokens the part would use untrimmed
+        weights: Optional part name -> relative share (equal shares by default)
+
+    Returns:
+        dict: Part name -> tokens allotted (never more than the part needs)
+    """
+    weights = {name: (weights or {}).get(name, 1.0) for name in needs}
+    allotted = {name: 0 for name in needs}
+    remaining = total
+    pending = {name for name, need in needs.items() if need > 0 and weights[name] > 0}
+
+    while pending and remaining > 0:
+        weight_sum = sum(weights[name] for name in pending)
+        granted = 0
+        for name in sorted(pending):
+            share = int(remaining * weights[name] / weight_sum)
+            grant = min(share, needs[name] - allotted[name])
+            allotted[name] += grant
+            granted += grant
+        remaining -= granted
+        pending = {name for name in pending if allotted[name] < needs[name]}
+        if granted == 0:
+            break
+
+    return allotted
+
+
+def input_allotment(endpoint: str, resume: str = "", job_description: str = "", instructions: str = "", job_floor: int = 0) -> Dict[str, int]:
+    """
+    Split an endpoint's token budget between its variable inputs.
+
+    Args:
+        endpoint: Key of ENDPOINT_INPUT_BUDGETS
+        resume: Resume text
+        job_description: Job description text
+        instructions: Custom instructions
+        job_floor: Tokens the job description keeps at least, added to the budget when its
+            share is smaller (several jobs share one job description budget)
+
+    Returns:
+        dict: "resume", "job_description", "instructions" -> tokens allotted (never more than the part needs)
+    """
+    total, resume_share, job_share, instructions_share = ENDPOINT_INPUT_BUDGETS[endpoint]
+    needs = {"resume": estimate_tokens(resume or ""), "job_description": estimate_tokens(job_description or ""), "instructions": estimate_tokens(instructions or "")}
+    allotted = split_budget(total, needs, {"resume": resume_share, "job_description": job_share, "instructions": instructions_share})
+    allotted["job_description"] = max(allotted["job_description"], min(job_floor, needs["job_description"]))
+    return allotted
+
+
+def allocate_input_budget(endpoint: str, resume: str = "", job_description: str = "", instructions: str = "", job_floor: int = 0) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Trim the variable inputs of a prompt to the endpoint's token budget.
+
+    Args:
+        endpoint: Key of ENDPOINT_INPUT_BUDGETS
+        resume: Resume text
+        job_description: Job description text
+        instructions: Custom instructions
+        job_floor: Tokens the job description keeps at least (see input_allotment)
+
+    Returns:
+        tuple: (trimmed parts keyed "resume", "job_description" and "instructions",
+                token usage report with the budget and the tokens each part uses)
+    """
+    # Imported here: the cleaner measures text with this module
+    from .jd_cleaner import fit_job_description
+
+    total = ENDPOINT_INPUT_BUDGETS[endpoint][0]
+    texts = {"resume": resume or "", "job_description": job_description or "", "instructions": instructions or ""}
+    needs = {name: estimate_tokens(text) for name, text in texts.items()}
+    allotted = input_allotment(endpoint, resume, job_description, instructions, job_floor)
+
+    parts = {}
+    for name, text in texts.items():
+        # A job description keeps its requirements first rather than its opening paragraphs
+        trim = fit_job_description if name == "job_description" else truncate_to_tokens
+        parts[name] = text if allotted[name] >= needs[name] else trim(text, allotted[name])
+        if parts[name] is not text:
+            logger.info(f"Trimming {name} for {endpoint} from ~{needs[name]} to {allotted[name]} tokens")
+
+    usage = {"budget": max(total, sum(allotted.values())), **{name: estimate_tokens(text) for name, text in parts.items()}}
+    usage["trimmed"] = [name for name in texts if parts[name] is not texts[name]]
+    return parts, usage
+
+
+def estimate_prompt_tokens(prompt: str) -> Dict[str, Any]:
+    """
+    Estimate the tokens of a prompt for a usage report, with the calibration factor applied.
+
+    The factor is recorded with the estimate because concurrent requests keep moving it:
+    calibrating later against the current factor would misjudge what the estimate was.
+
+    Args:
+        prompt: Prompt about to be sent
+
+    Returns:
+        dict: {"prompt_estimate", "estimate_factor"}, to merge into the usage report
+    """
+    factor = _calibration_factor
+    return {"prompt_estimate": math.ceil(_raw_estimate(prompt) * factor), "estimate_factor": factor}
+
+
+def observe_token_count(raw_estimate: float, actual_tokens: int) -> None:
+    """
+    Nudge the calibration factor towards a token count reported by the model.
+
+    Args:
+        raw_estimate: Local estimate made for a prompt, before calibration
+        actual_tokens: Token count the model reported for the same prompt
+    """
+    global _calibration_factor
+    if raw_estimate <= 0 or actual_tokens <= 0:
+        return
+
+    with _calibration_lock:
+        observed = actual_tokens / raw_estimate
+        _calibration_factor = min(2.0, max(0.5, (1 - CALIBRATION_SMOOTHING) * _calibration_factor + CALIBRATION_SMOOTHING * observed))
+
+
+def record_usage(token_usage: Dict[str, Any], response: Any) -> Dict[str, Any]:
+    """
+    Add the model-reported token counts of a response to a usage report and calibrate with them.
+
+    Args:
+        token_usage: Usage report, with the "prompt_estimate" and "estimate_factor" of the
+            prompt sent (see estimate_prompt_tokens)
+        response: Response returned by generate_content
+
+    Returns:
+        dict: The updated usage report
+    """
+    usage_metadata = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage_metadata, "prompt_token_count", 0) or 0
+    if prompt_tokens:
+        token_usage["prompt_tokens"] = prompt_tokens
+        token_usage["output_tokens"] = getattr(usage_metadata, "candidates_token_count", 0) or 0
+        if token_usage.get("estimate_factor"):
+            observe_token_count(token_usage.get("prompt_estimate", 0) / token_usage["estimate_factor"], prompt_tokens)
+    return token_usage
+
+
+def calibrate_token_estimator(samples: Iterable[str], model_name: str = GEMINI_MODEL) -> float:
+    """
+    Calibrate the estimator against the model's own token counter (one count_tokens call per sample).
+
+    Requires Gemini to be configured with an API key.
+
+    Args:
+        samples: Representative texts (resumes, job descriptions)
+        model_name: Model whose tokenizer to match
+
+    Returns:
+        float: The new calibration factor
+    """
+    global _calibration_factor
+    import google.generativeai as genai
+
+    model = genai.GenerativeModel(model_name)
+    raw_total = 0.0
+    actual_total = 0
+    for sample in samples:
+        raw_total += _raw_estimate(sample)
+        actual_total += model.count_tokens(sample).total_tokens
+
+    if raw_total > 0 and actual_total > 0:
+        with _calibration_lock:
+            _calibration_factor = actual_total / raw_total
+        logger.info(f"Token estimator calibrated for {model_name}: factor {_calibration_factor:.3f}")
+    return _calibration_factor
+
+
+def get_calibration_factor() -> float:
+    """Return the calibration factor currently applied to estimates."""
+    return _calibration_factor
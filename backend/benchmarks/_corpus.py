@@ -0,0 +1,146 @@
+"""
+Shared fixture corpus helpers for the backend benchmarks.
+
+The corpus lives in benchmarks/fixtures/. Plain-text resumes are rendered into
+single- and two-column PDFs on the fly (with a page footer, like most exported
+resumes), so the benchmarks need no binary fixtures in the repository. Any real
+.pdf files dropped into fixtures/resumes/ are picked up as well.
+"""
+
+import os
+import sys
+import textwrap
+from typing import List, Optional, Tuple
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+FIXTURES_DIR = os.path.join(BENCHMARKS_DIR, "fixtures")
+RESUME_FIXTURES_DIR = os.path.join(FIXTURES_DIR, "resumes")
+JOB_POSTING_FIXTURES_DIR = os.path.join(FIXTURES_DIR, "job_postings")
+
+# Make the `app` package importable when a benchmark is run as a script
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 54
+FONT_SIZE = 10
+LEADING = 13
+COLUMN_GAP = 24
+
+
+def _escape_pdf_text(line: str) -> bytes:
+    """Encode a line for a PDF string literal using the WinAnsi encoding of the base-14 fonts."""
+    encoded = line.encode("cp1252", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def render_pdf(text: str, columns: int = 1, footer: Optional[str] = None) -> bytes:
+    """
+    Render plain text into a minimal multi-page PDF.
+
+    Args:
+        text: Text to render, one PDF line per wrapped input line
+        columns: Number of text columns per page (1 or 2)
+        footer: Optional footer printed at the bottom of every page ("{page}" is replaced)
+
+    Returns:
+        bytes: The PDF document
+    """
+    column_width = (PAGE_WIDTH - 2 * MARGIN - (columns - 1) * COLUMN_GAP) / columns
+    wrap_at = max(20, int(column_width / (FONT_SIZE * 0.5)))
+    lines = []
+    for raw_line in text.splitlines():
+        lines.extend(textwrap.wrap(raw_line, wrap_at) or [""])
+
+    lines_per_column = int((PAGE_HEIGHT - 2 * MARGIN - LEADING) / LEADING)
+    lines_per_page = lines_per_column * columns
+    pages = [lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_refs = []
+    for page_number, page_lines in enumerate(pages, start=1):
+        stream = [f"BT /F1 {FONT_SIZE} Tf {LEADING} TL".encode()]
+        for column in range(columns):
+            column_lines = page_lines[column * lines_per_column : (column + 1) * lines_per_column]
+            if not column_lines:
+                continue
+            x = MARGIN + column * (column_width + COLUMN_GAP)
+            stream.append(f"1 0 0 1 {x:.1f} {PAGE_HEIGHT - MARGIN} Tm".encode())
+            stream.extend(b"(" + _escape_pdf_text(line) + b") '" for line in column_lines)
+        if footer:
+            stream.append(f"1 0 0 1 {MARGIN} {MARGIN / 2:.1f} Tm".encode())
+            stream.append(b"(" + _escape_pdf_text(footer.replace("{page}", str(page_number))) + b") Tj")
+        stream.append(b"ET")
+        content = b"\n".join(stream)
+
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] /Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>".encode())
+        page_refs.append(len(objects))
+
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_refs)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def load_resume_corpus(corpus_dir: str = RESUME_FIXTURES_DIR, repeat_text: int = 2) -> List[Tuple[str, bytes, Optional[str]]]:
+    """
+    Build the PDF corpus used by the extraction benchmarks.
+
+    Every .txt fixture is rendered as a single-column and a two-column PDF (its text
+    repeated `repeat_text` times so documents span several pages). Every .pdf fixture
+    is used as-is.
+
+    Args:
+        corpus_dir: Directory containing the .txt and .pdf fixtures
+        repeat_text: How many times each text fixture is repeated before rendering
+
+    Returns:
+        list: (name, pdf_bytes, reference_text or None) tuples
+    """
+    corpus = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        path = os.path.join(corpus_dir, filename)
+        stem, extension = os.path.splitext(filename)
+        if extension == ".txt":
+            with open(path, encoding="utf-8") as handle:
+                text = "\n\n".join([handle.read()] * repeat_text)
+            footer = f"{text.splitlines()[0]} - Page {{page}}"
+            for columns in (1, 2):
+                corpus.append((f"{stem}-{columns}col", render_pdf(text, columns=columns, footer=footer), text + "\n" + footer))
+        elif extension == ".pdf":
+            with open(path, "rb") as handle:
+                corpus.append((stem, handle.read(), None))
+    return corpus
+
+
+def load_job_postings(corpus_dir: str = JOB_POSTING_FIXTURES_DIR) -> List[Tuple[str, str]]:
+    """
+    Load the job posting fixtures (company blurb, requirements, benefits and legal text
+    laid out like the common job boards).
+
+    Args:
+        corpus_dir: Directory containing the .txt postings
+
+    Returns:
+        list: (name, text) tuples
+    """
+    postings = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(corpus_dir, filename), encoding="utf-8") as handle:
+                postings.append((os.path.splitext(filename)[0], handle.read()))
+    return postings
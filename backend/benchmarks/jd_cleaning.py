@@ -0,0 +1,64 @@
+"""
+Measure what job description cleaning saves and keeps.
+
+For every job posting fixture, reports the tokens of the raw posting, of the posting
+without its boilerplate, and of the extracted requirements, with the time the cleaner
+takes. A posting without sections needs the small model for its requirements; without
+it the prompts carry the cleaned posting, which is what its "reqs" column counts. It then fits each posting to a per-job token budget both by cutting it (the
+previous behaviour) and with the cleaner, and reports how many of the posting's
+requirement lines survive each.
+
+Usage (from backend/):
+    python benchmarks/jd_cleaning.py [--budget 200]
+"""
+
+import argparse
+import time
+
+from _corpus import load_job_postings
+
+
+def main() -> None:
+    from app.jd_cleaner import clean_job_description, fit_job_description, split_blocks
+    from app.job_requirements import extract_requirements_locally, format_requirements
+    from app.token_budget import estimate_tokens, truncate_to_tokens
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=200, help="Token budget of one job description in the prompt")
+    parser.add_argument("--repeat", type=int, default=200, help="Cleaning runs per posting for the timing")
+    args = parser.parse_args()
+
+    postings = load_job_postings()
+    print(f"{'posting':<34} {'raw':>5} {'clean':>6} {'saved':>6} {'reqs':>5} {'us':>6}   {'kept at ' + str(args.budget) + ' tokens: cut':>24} {'cleaner':>8}")
+    totals = {"raw": 0, "clean": 0, "requirements": 0, "lines": 0, "cut": 0, "fit": 0}
+    for name, text in postings:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            cleaned, report = clean_job_description(text)
+        clean_us = (time.perf_counter() - started) * 1e6 / args.repeat
+        requirements = extract_requirements_locally(text)
+        requirements_tokens = estimate_tokens(format_requirements(requirements)) if requirements["sections_found"] else report["output_tokens"]
+
+        # Requirement lines that survive fitting the posting to the budget
+        lines = [line for block in split_blocks(text) if block["kind"] == "required" for line in block["lines"]]
+        cut, fitted = truncate_to_tokens(text, args.budget), fit_job_description(text, args.budget)
+        kept_cut = sum(1 for line in lines if line in cut)
+        kept_fit = sum(1 for line in lines if line in fitted)
+
+        saved = 1 - report["output_tokens"] / max(report["input_tokens"], 1)
+        print(
+            f"{name:<34} {report['input_tokens']:>5} {report['output_tokens']:>6} {saved:>6.0%} {requirements_tokens:>5} {clean_us:>6.0f}"
+            f"   {f'{kept_cut}/{len(lines)}':>24} {f'{kept_fit}/{len(lines)}':>8}"
+        )
+        for key, value in (("raw", report["input_tokens"]), ("clean", report["output_tokens"]), ("requirements", requirements_tokens), ("lines", len(lines)), ("cut", kept_cut), ("fit", kept_fit)):
+            totals[key] += value
+
+    print(
+        f"\nBoilerplate removed: {totals['raw'] - totals['clean']} of {totals['raw']} tokens ({1 - totals['clean'] / max(totals['raw'], 1):.0%}); "
+        f"extracted requirements: {totals['requirements']} tokens ({1 - totals['requirements'] / max(totals['raw'], 1):.0%} smaller than the postings)"
+    )
+    print(f"Requirement lines kept within {args.budget} tokens: {totals['cut']}/{totals['lines']} when cut, {totals['fit']}/{totals['lines']} with the cleaner")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark the registered PDF text-extraction backends on the fixture corpus.
+
+For every installed backend this reports throughput (pages/sec), peak memory and
+text quality (characters extracted and broken-word ratio), so a deployment can
+pick the fastest engine whose output is still acceptable and set it with
+PDF_EXTRACTION_BACKEND.
+
+Usage (from backend/):
+    python benchmarks/pdf_extraction.py [--backends pypdf2,pymupdf] [--repeat 5] [--json]
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import queue as queue_module
+import re
+import resource
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from _corpus import RESUME_FIXTURES_DIR, load_resume_corpus
+
+
+WORD_PATTERN = re.compile(r"[A-Za-z]+")
+
+# Seconds to wait for a backend's results before its process is considered stuck
+BACKEND_TIMEOUT_SECONDS = 600
+
+# Short tokens that are real words rather than fragments of split ones
+SHORT_WORDS = {"a", "i", "an", "as", "at", "be", "by", "do", "go", "in", "is", "it", "of", "on", "or", "to", "up", "we"}
+SHORT_WORDS |= {"ci", "cd", "ml", "ms", "tb", "pm", "ny", "ca", "wa", "tx", "ma", "il", "bs", "ba"}
+
+
+def broken_word_ratio(text: str, reference_text: Optional[str]) -> float:
+    """
+    Estimate the share of extracted words that were split or glued together.
+
+    With a reference text, a word is broken when it does not occur in the reference
+    vocabulary. Without one, a word is broken when it is a one- or two-letter
+    fragment that is not a common short word.
+    """
+    words = [word.lower() for word in WORD_PATTERN.findall(text)]
+    if not words:
+        return 1.0
+
+    if reference_text is not None:
+        vocabulary = {word.lower() for word in WORD_PATTERN.findall(reference_text)}
+        broken = sum(1 for word in words if word not in vocabulary)
+    else:
+        broken = sum(1 for word in words if len(word) <= 2 and word not in SHORT_WORDS)
+    return broken / len(words)
+
+
+def _run_backend(backend: str, corpus_dir: str, repeat: int, queue: multiprocessing.Queue) -> None:
+    """Benchmark one backend in a fresh process so peak RSS is attributable to it."""
+    from app.resume_analyzer import PDF_EXTRACTION_BACKENDS
+
+    # Look the backend up directly: get_pdf_backend() would fall back to the default one
+    _, extractor = PDF_EXTRACTION_BACKENDS[backend]
+    corpus = load_resume_corpus(corpus_dir)
+
+    # Warm up imports and caches before measuring
+    extractor(io.BytesIO(corpus[0][1]))
+    baseline_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    tracemalloc.start()
+    pages = 0
+    chars = 0
+    ratios = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _, pdf_bytes, reference_text in corpus:
+            page_texts = extractor(io.BytesIO(pdf_bytes))
+            text = "\n".join(page_texts)
+            pages += len(page_texts)
+            chars += len(text)
+            ratios.append(broken_word_ratio(text, reference_text))
+    elapsed = time.perf_counter() - started
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put(
+        {
+            "backend": backend,
+            "documents": len(corpus) * repeat,
+            "pages": pages,
+            "seconds": round(elapsed, 4),
+            "pages_per_sec": round(pages / elapsed, 1) if elapsed else 0.0,
+            "python_peak_kb": python_peak // 1024,
+            "rss_growth_kb": max(0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss_kb),
+            "chars_per_document": chars // max(1, len(corpus) * repeat),
+            "broken_word_ratio": round(sum(ratios) / len(ratios), 4),
+        }
+    )
+
+
+def _wait_for_result(backend: str, process: multiprocessing.Process, queue: multiprocessing.Queue) -> Dict:
+    """Wait for a backend's results, failing as soon as its process dies or after BACKEND_TIMEOUT_SECONDS."""
+    deadline = time.monotonic() + BACKEND_TIMEOUT_SECONDS
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except queue_module.Empty:
+            if process.is_alive() and time.monotonic() < deadline:
+                continue
+            process.terminate()
+            process.join()
+            raise RuntimeError(f"Backend {backend} produced no results (exit code {process.exitcode})") from None
+
+
+def run_benchmark(backends: List[str], corpus_dir: str, repeat: int) -> List[Dict]:
+    """Benchmark each backend in its own process and collect the results."""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for backend in backends:
+        queue = context.Queue()
+        process = context.Process(target=_run_backend, args=(backend, corpus_dir, repeat, queue))
+        process.start()
+        results.append(_wait_for_result(backend, process, queue))
+        process.join()
+    return results
+
+
+def main() -> None:
+    from app.resume_analyzer import available_pdf_backends
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=",".join(available_pdf_backends()), help="Comma-separated backends to compare (default: all installed)")
+    parser.add_argument("--corpus", default=RESUME_FIXTURES_DIR, help="Directory with .txt/.pdf resume fixtures")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the corpus per backend")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    installed = set(available_pdf_backends())
+    backends = [name.strip().lower() for name in args.backends.split(",") if name.strip()]
+    skipped = [name for name in backends if name not in installed]
+    results = run_benchmark([name for name in backends if name in installed], args.corpus, args.repeat)
+
+    if args.json:
+        print(json.dumps({"results": results, "skipped": skipped}, indent=2))
+        return
+
+    header = f"{'backend':<10} {'pages/s':>9} {'py peak KB':>11} {'RSS +KB':>9} {'chars/doc':>10} {'broken':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in sorted(results, key=lambda r: r["pages_per_sec"], reverse=True):
+        print(f"{row['backend']:<10} {row['pages_per_sec']:>9} {row['python_peak_kb']:>11} {row['rss_growth_kb']:>9} {row['chars_per_document']:>10} {row['broken_word_ratio']:>8.2%}")
+    if skipped:
+        print(f"\nSkipped (unknown or not installed): {', '.join(skipped)}")
+
+
+if __name__ == "__main__":
+    main()
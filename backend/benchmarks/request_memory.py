@@ -0,0 +1,255 @@
+"""
+Measure the latency and memory of Gemini-backed requests end to end, in process.
+
+The Flask test client replays resume reviews, multi-job analyses and resume uploads
+against the real request path (upload parsing, PDF extraction, prompt building, JSON
+parsing) with the Gemini model replaced by canned replies, so no API key or network is
+needed and only the backend's own cost is measured. Each endpoint is run twice:
+
+- a timing pass without tracing: p50/p95 latency and the RSS growth over the pass
+- an allocation pass with app.memory.AllocationTracker: average and max tracemalloc
+  peak per request, bytes still allocated after the pass, the lines retaining them,
+  and the garbage a full collection finds afterwards (objects left in reference cycles)
+  with what it is made of
+
+With --compare-gc every endpoint is also run on an app that makes the full collections
+the request path used to force (FORCED_COLLECTIONS per request, as many as the removed
+gc.collect() calls on that path), so the before and after numbers come from one run.
+
+The cyclic garbage left per request (2 KB or less) comes from libraries, not from the
+app: PyPDF2 parses stream dictionaries with a self-referencing nested function (about a
+dozen closures per PDF), the pypdf backend leaves bound methods and name objects of the
+parsed document in cycles instead, and werkzeug's URL matcher defines a recursive
+closure once per request. The collector's normal generational passes free all of it. The request the test client keeps for each response (environ and Request
+pointing at each other) is a test-client artifact; Flask breaks that cycle for the
+requests it serves, and the benchmark does the same for the client's copy.
+
+Usage (from backend/):
+    python benchmarks/request_memory.py [--requests 40] [--compare-gc] [--json]
+"""
+
+import argparse
+import gc
+import io
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+import types
+import uuid
+from collections import Counter
+from typing import Callable, Dict, List
+
+from _corpus import load_resume_corpus
+
+
+FAKE_API_KEY = "benchmark-key-0000000000000000"
+
+ANALYSIS_REPLY = json.dumps(
+    {
+        "jobs": [
+            {
+                "job_title": "Backend Engineer",
+                "company_name": "Example Corp",
+                "match_percentage": 78,
+                "matching_skills": ["Python", "Flask", "PostgreSQL"],
+                "missing_skills": ["Kubernetes"],
+                "recommendations": ["Quantify the impact of the API migration"],
+            }
+        ]
+    }
+)
+REVIEW_REPLY = json.dumps(
+    {
+        "sections": [
+            {"section": "experience", "strengths": ["Clear impact statements"], "weaknesses": ["Few metrics in older roles"], "suggestions": ["Lead with outcomes"]},
+            {"section": "skills", "strengths": ["Relevant stack"], "weaknesses": [], "suggestions": ["Group skills by area"]},
+        ]
+    }
+)
+ATS_REPLY = json.dumps({"ats_score": 82, "format_issues": [], "keyword_analysis": {}, "recommendations": []})
+# Full collections the request path forced per request before they were removed: one after
+# PDF extraction, and two more in the analysis and the review
+FORCED_COLLECTIONS = {"/api/review-resume": 3, "/api/analyze": 3, "/api/resumes": 1}
+# Requests replayed to identify the objects left in reference cycles
+CYCLE_SOURCE_REQUESTS = 5
+JOB_DESCRIPTION = "We are hiring a backend engineer to build Python and Flask services on PostgreSQL, deployed with Docker and Kubernetes. " * 8
+
+
+def install_fake_model() -> None:
+    """Replace the Gemini model with one that answers every prompt with a canned JSON reply."""
+    import google.generativeai as genai
+
+    class FakeModel:
+        def __init__(self, model_name: str, *args, **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, prompt: str, generation_config=None, **kwargs):
+            if '"jobs"' in prompt:
+                text = ANALYSIS_REPLY
+            elif '"strengths"' in prompt:
+                text = REVIEW_REPLY
+            else:
+                text = ATS_REPLY
+            usage = types.SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+            return types.SimpleNamespace(text=text, usage_metadata=usage)
+
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = FakeModel
+
+
+def build_requests(corpus: List[tuple]) -> Dict[str, Callable[[int], Dict]]:
+    """Return endpoint -> function building the test-client kwargs of its i-th request."""
+
+    def upload(index: int) -> tuple:
+        name, pdf_bytes, _ = corpus[index % len(corpus)]
+        # A unique trailer gives every upload its own content hash, as real traffic does
+        return io.BytesIO(pdf_bytes + f"\n% {uuid.uuid4().hex}\n".encode()), f"{name}.pdf"
+
+    jobs = json.dumps([{"job_title": f"Engineer {i}", "company_name": "Example Corp", "job_description": JOB_DESCRIPTION} for i in range(3)])
+    return {
+        # A distinct job title per request keeps the per-section review cache from answering instead of the model
+        "/api/review-resume": lambda index: {"data": {"resume": upload(index), "job_description": JOB_DESCRIPTION, "job_title": f"Backend Engineer {index}"}},
+        "/api/analyze": lambda index: {"data": {"resume": upload(index), "job_details": jobs}},
+        "/api/resumes": lambda index: {"data": {"resume": upload(index)}},
+    }
+
+
+def post(client, endpoint: str, **kwargs):
+    """Post a request and break the cycle between the test client's copy of the request and its environ."""
+    response = client.post(endpoint, headers={"X-API-KEY": FAKE_API_KEY}, content_type="multipart/form-data", **kwargs)
+    # Flask does this for the request it serves; the test client's own Request is left to the collector
+    response.request.environ["werkzeug.request"] = None
+    return response
+
+
+def cyclic_garbage_sources(client, endpoint: str, build: Callable[[int], Dict]) -> Dict[str, float]:
+    """Count the objects a few requests leave in reference cycles, per request, by type (functions by name)."""
+    gc.collect()
+    gc.set_debug(gc.DEBUG_SAVEALL)
+    try:
+        for index in range(CYCLE_SOURCE_REQUESTS):
+            post(client, endpoint, **build(index))
+        gc.collect()
+        sources = Counter(f"{obj.__module__}.{obj.__qualname__}" if isinstance(obj, types.FunctionType) else type(obj).__name__ for obj in gc.garbage)
+    finally:
+        gc.set_debug(0)
+        gc.garbage.clear()
+    return {source: count / CYCLE_SOURCE_REQUESTS for source, count in sources.most_common(4)}
+
+
+def run_endpoint(client, endpoint: str, build: Callable[[int], Dict], requests: int) -> Dict:
+    """Time an endpoint, then replay it under allocation tracking."""
+    from app.memory import AllocationTracker, current_rss_bytes
+
+    # Warm up imports, caches and the allocator before measuring
+    for index in range(3):
+        post(client, endpoint, **build(index))
+
+    latencies = []
+    rss_before = current_rss_bytes()
+    for index in range(requests):
+        kwargs = build(index)
+        started = time.perf_counter()
+        response = post(client, endpoint, **kwargs)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f"{endpoint} returned {response.status_code}: {response.get_data(as_text=True)[:300]}")
+    rss_growth = current_rss_bytes() - rss_before
+
+    tracker = AllocationTracker(frames=10, top=5)
+    tracker.start()
+    gc.collect()
+    traced_before, _ = tracemalloc.get_traced_memory()
+    for index in range(requests):
+        kwargs = build(index)
+        state = tracker.begin_request()
+        post(client, endpoint, **kwargs)
+        tracker.end_request(endpoint, state)
+    report = tracker.report()[endpoint]
+    # What a full collection still finds after the pass is garbage the requests left in reference cycles
+    traced_after, _ = tracemalloc.get_traced_memory()
+    unreachable = gc.collect()
+    traced_collected, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    quantiles = statistics.quantiles(latencies, n=20)
+    return {
+        "endpoint": endpoint,
+        "requests": requests,
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(quantiles[18], 2),
+        "rss_growth_kb": rss_growth // 1024,
+        "peak_avg_kb": report["peak_avg_bytes"] // 1024,
+        "peak_max_kb": report["peak_max_bytes"] // 1024,
+        "retained_kb": (traced_collected - traced_before) // 1024,
+        "cyclic_garbage_kb": (traced_after - traced_collected) // 1024,
+        "cyclic_garbage_objects": unreachable,
+        "cyclic_garbage_sources": cyclic_garbage_sources(client, endpoint, build),
+        "top_retaining_sites": {site: size // 1024 for site, size in report["top_retaining_sites"].items()},
+    }
+
+
+def forced_gc_client():
+    """Build a test client for an app that makes the full collections the request path used to force."""
+    from flask import request
+
+    from app import create_app
+
+    app = create_app()
+
+    @app.after_request
+    def collect(response):
+        for _ in range(FORCED_COLLECTIONS.get(request.path, 0)):
+            gc.collect()
+        return response
+
+    return app.test_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40, help="Requests per endpoint and pass")
+    parser.add_argument("--compare-gc", action="store_true", help="Also run every endpoint with the full collections the request path used to force")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    install_fake_model()
+
+    from app import create_app
+
+    client = create_app().test_client()
+    corpus = load_resume_corpus()
+    modes = [("current", client)] + ([("forced gc", forced_gc_client())] if args.compare_gc else [])
+    results = []
+    for endpoint, build in build_requests(corpus).items():
+        for mode, mode_client in modes:
+            results.append({"mode": mode, **run_endpoint(mode_client, endpoint, build, args.requests)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    header = f"{'endpoint':<20} {'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'RSS +KB':>8} {'peak avg KB':>11} {'peak max KB':>11} {'retained KB':>11} {'cyclic KB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['endpoint']:<20} {r['mode']:<10} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['rss_growth_kb']:>8} {r['peak_avg_kb']:>11} {r['peak_max_kb']:>11} "
+            f"{r['retained_kb']:>11} {r['cyclic_garbage_kb']:>9}"
+        )
+    print(f"\nObjects left in reference cycles per request (cyclic KB is the total over {args.requests} requests):")
+    for r in results:
+        if r["mode"] == "current":
+            print(f"  {r['endpoint']:<20} " + ", ".join(f"{count:g} {source}" for source, count in r["cyclic_garbage_sources"].items()))
+    print("\nTop retaining lines (KB, allocation pass):")
+    for r in results:
+        if r["mode"] == "current":
+            for site, size in r["top_retaining_sites"].items():
+                print(f"  {r['endpoint']:<20} {size:>6}  {site}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measure skill extraction on the fixtures and check the skills it finds.
+
+For every resume and job posting fixture, reports the time the taxonomy matcher takes
+and the skills it finds. Some fixtures have known answers: ambiguous aliases that must
+match ("Go" in a list of languages) and ones that must not ("Go" in "Go-to-Market").
+With --check the script exits non-zero when one of them is wrong; `make check-skills`
+runs it that way.
+
+Usage (from backend/):
+    python benchmarks/skill_extraction.py [--repeat 200] [--check]
+"""
+
+import argparse
+import sys
+import time
+
+from _corpus import JOB_POSTING_FIXTURES_DIR, RESUME_FIXTURES_DIR, load_job_postings
+
+
+# Fixture -> (skill ids that must be found, skill ids that must not be)
+EXPECTED_SKILLS = {
+    "software_engineer": (["python", "go", "java", "typescript", "sql"], []),
+    "product_manager": (["product-management", "sql", "figma"], ["go"]),
+    "data_scientist": (["python", "r", "spark"], []),
+    "backend_engineer-greenhouse": (["go", "python", "sql"], []),
+    "product_manager-lever": (["product-management", "sql"], ["go"]),
+}
+
+
+def main() -> int:
+    from app.skill_taxonomy import extract_skills
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Extraction runs per fixture for the timing")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if a fixture's expected skills are wrong")
+    args = parser.parse_args()
+
+    failures = []
+    fixtures = load_job_postings(RESUME_FIXTURES_DIR) + load_job_postings(JOB_POSTING_FIXTURES_DIR)
+    print(f"{'fixture':<30} {'us':>7} {'skills':>6}  found")
+    for name, text in fixtures:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            skills = extract_skills(text)
+        extract_us = (time.perf_counter() - started) * 1e6 / args.repeat
+        print(f"{name:<30} {extract_us:>7.1f} {len(skills):>6}  {', '.join(skills)}")
+
+        required, forbidden = EXPECTED_SKILLS.get(name, ([], []))
+        failures += [f"{name}: {skill} not found" for skill in required if skill not in skills]
+        failures += [f"{name}: {skill} found but not mentioned" for skill in forbidden if skill in skills]
+
+    print(f"\nExpected skills: {'OK' if not failures else 'WRONG'}")
+    for failure in failures:
+        print(f"  {failure}")
+
+    if args.check and failures:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
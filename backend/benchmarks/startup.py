@@ -0,0 +1,169 @@
+"""
+Measure cold-start cost and enforce the startup budget.
+
+Each run starts a fresh interpreter (as a recycled or scaled-from-zero worker does),
+creates the app and answers one /api/health request. The benchmark reports:
+
+- time to first healthy response, from process spawn (interpreter startup included)
+- a `python -X importtime` breakdown of the slowest top-level imports
+- the cost deferred to the first Gemini-backed request (generator modules and SDK)
+
+With --check it exits non-zero when the median time to first healthy response exceeds
+the budget, or when a heavy dependency (google.generativeai, PyPDF2, numpy, dotenv) is
+imported before the first API request. `make check-startup` runs it that way in CI.
+
+Usage (from backend/):
+    python benchmarks/startup.py [--runs 5] [--budget-ms 1000] [--check] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from _corpus import BACKEND_DIR
+
+
+# Median time to first healthy response allowed by --check
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+# Modules that must not be imported until a request needs them
+DEFERRED_MODULES = ("google.generativeai", "PyPDF2", "numpy", "dotenv")
+
+# Written to stderr between startup and the first request's imports
+FIRST_REQUEST_MARKER = "--- first request ---"
+
+# Runs in the child interpreter: boot, answer a health check, then load what the first API request would
+CHILD_SCRIPT = """
+import json, sys, time
+from app import create_app
+client = create_app().test_client()
+response = client.get("/api/health")
+healthy_at = time.time()
+loaded = sorted(name for name in {deferred!r} if name in sys.modules)
+sys.stderr.write("{marker}\\n")
+sys.stderr.flush()
+started = time.perf_counter()
+import app.resume_analyzer, google.generativeai
+first_request_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{"status": response.status_code, "healthy_at": healthy_at, "loaded": loaded, "first_request_import_ms": first_request_ms}}))
+"""
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """
+    Return package -> cumulative import milliseconds from `-X importtime` output.
+
+    A package's time includes what its own imports pulled in (flask includes werkzeug),
+    so the totals overlap; they show which packages are worth deferring.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            entries.append((len(name) - len(name.lstrip()), name.strip().split(".")[0], int(cumulative) / 1000))
+
+    # Children are printed before their parent: walk backwards so parents come first,
+    # and count a module only when it is not imported by a module of the same package
+    totals: Dict[str, float] = {}
+    ancestors = []
+    for depth, package, cumulative in reversed(entries):
+        while ancestors and ancestors[-1][0] >= depth:
+            ancestors.pop()
+        if not ancestors or ancestors[-1][1] != package:
+            totals[package] = totals.get(package, 0.0) + cumulative
+        ancestors.append((depth, package))
+    return totals
+
+
+def total_import_ms(stderr: str) -> float:
+    """Return the cumulative milliseconds of the top-level imports in `-X importtime` output."""
+    total = 0.0
+    for line in stderr.splitlines():
+        if line.startswith("import time:"):
+            _, cumulative, name = line[len("import time:") :].split("|")
+            if cumulative.strip().isdigit() and not name.startswith("  "):
+                total += int(cumulative) / 1000
+    return total
+
+
+def measure_once(env: Dict[str, str]) -> Dict:
+    """Boot the app in a fresh interpreter and time it."""
+    script = CHILD_SCRIPT.format(deferred=DEFERRED_MODULES, marker=FIRST_REQUEST_MARKER)
+    spawned_at = time.time()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=False)
+    if completed.returncode != 0:
+        raise RuntimeError(f"App failed to start:\n{completed.stderr[-2000:]}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    # Imports made after the health check belong to the first request, not to startup
+    startup_stderr = completed.stderr.split(FIRST_REQUEST_MARKER)[0]
+    return {
+        "status": result["status"],
+        "first_healthy_ms": (result["healthy_at"] - spawned_at) * 1000,
+        "first_request_import_ms": result["first_request_import_ms"],
+        "loaded": result["loaded"],
+        "imports": parse_importtime(startup_stderr),
+        "import_ms": total_import_ms(startup_stderr),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="Median time to first healthy response allowed")
+    parser.add_argument("--environment", default="production", help="FLASK_ENV of the measured app (production skips .env loading)")
+    parser.add_argument("--top", type=int, default=12, help="Number of packages to list")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if the budget is exceeded or a deferred module is imported at startup")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    env = {**os.environ, "FLASK_ENV": args.environment}
+    runs: List[Dict] = [measure_once(env) for _ in range(args.runs)]
+
+    first_healthy = [run["first_healthy_ms"] for run in runs]
+    imports: Dict[str, List[float]] = {}
+    for run in runs:
+        for name, ms in run["imports"].items():
+            imports.setdefault(name, []).append(ms)
+    slowest = sorted(((statistics.median(values), name) for name, values in imports.items()), reverse=True)[: args.top]
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+
+    summary = {
+        "runs": args.runs,
+        "first_healthy_ms": {"median": statistics.median(first_healthy), "min": min(first_healthy), "max": max(first_healthy)},
+        "startup_import_ms": statistics.median(run["import_ms"] for run in runs),
+        "first_request_import_ms": statistics.median(run["first_request_import_ms"] for run in runs),
+        "slowest_imports_ms": {name: round(ms, 1) for ms, name in slowest},
+        "deferred_modules_loaded_at_startup": loaded,
+        "budget_ms": args.budget_ms,
+    }
+    within_budget = summary["first_healthy_ms"]["median"] <= args.budget_ms and all(run["status"] == 200 for run in runs)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        healthy = summary["first_healthy_ms"]
+        print(f"Time to first healthy response: median {healthy['median']:.0f} ms (min {healthy['min']:.0f}, max {healthy['max']:.0f}) over {args.runs} runs")
+        print(f"Imports before the first response: {summary['startup_import_ms']:.0f} ms")
+        print(f"Imports deferred to the first API request: {summary['first_request_import_ms']:.0f} ms")
+        print("\nSlowest packages imported at startup (cumulative):")
+        for ms, name in slowest:
+            print(f"  {ms:8.1f} ms  {name}")
+        print(f"\nBudget: {args.budget_ms:.0f} ms -> {'OK' if within_budget else 'EXCEEDED'}")
+        if loaded:
+            print(f"Imported at startup but should be deferred: {', '.join(loaded)}")
+
+    if args.check and (not within_budget or loaded):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Measure the throughput and savings of extracted-text normalization.
+
+Every PDF of the fixture corpus is extracted once with the chosen backend, then
+normalized `--repeat` times. For each document this reports throughput (MB/s of
+extracted text) and the reduction in characters and estimated tokens, with the
+header/footer lines removed and the hyphenated words rejoined.
+
+The rendered fixtures come from clean text, so each is also run through a simulated
+typesetting pass (ligatures, justified spacing, non-breaking spaces, words hyphenated
+at line ends, a running header and page numbers): the "typeset" rows show what
+normalization saves on PDFs exported from word processors and LaTeX.
+
+Usage (from backend/):
+    python benchmarks/text_normalization.py [--backend pypdf2] [--repeat 50]
+"""
+
+import argparse
+import io
+import re
+import time
+from typing import List
+
+from _corpus import RESUME_FIXTURES_DIR, load_resume_corpus
+
+
+LIGATURES = (("ffi", "ﬃ"), ("ff", "ﬀ"), ("fi", "ﬁ"), ("fl", "ﬂ"))
+HYPHENATE_MIN_LETTERS = 9
+LONG_WORD_PATTERN = re.compile(r"\b([a-z]{%d,})$" % HYPHENATE_MIN_LETTERS)
+
+
+def typeset(pages: List[str], header: str) -> List[str]:
+    """Add the artifacts of typeset PDFs to clean page texts."""
+    typeset_pages = []
+    for page_number, page in enumerate(pages, start=1):
+        lines = page.splitlines()
+        for index in range(len(lines) - 1):
+            # Break a long last word across the line end, as justified text does
+            match = LONG_WORD_PATTERN.search(lines[index])
+            if match and lines[index + 1][:1].isalpha():
+                word = match.group(1)
+                lines[index] = lines[index][: match.start()] + word[: len(word) // 2] + "-"
+                lines[index + 1] = word[len(word) // 2 :] + " " + lines[index + 1]
+        for index, line in enumerate(lines):
+            for letters, ligature in LIGATURES:
+                line = line.replace(letters, ligature)
+            # Justified lines are padded with extra spaces, and some spaces are non-breaking
+            lines[index] = line.replace(" ", "  ") if index % 2 else line.replace(", ", ",\u00a0")
+        typeset_pages.append("\n".join([header, ""] + lines + ["", f"Page {page_number} of {len(pages)}"]))
+    return typeset_pages
+
+
+def main() -> None:
+    from app.resume_analyzer import extract_pages_from_pdf, resolve_pdf_backend_name
+    from app.text_normalizer import normalize_pages
+    from app.token_budget import estimate_tokens
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default=None, help="PDF extraction backend (default: PDF_EXTRACTION_BACKEND)")
+    parser.add_argument("--corpus", default=RESUME_FIXTURES_DIR, help="Directory with .txt/.pdf resume fixtures")
+    parser.add_argument("--repeat", type=int, default=50, help="Normalization runs per document for the timing")
+    args = parser.parse_args()
+
+    backend = resolve_pdf_backend_name(args.backend)
+    documents = []
+    for name, pdf_bytes, _ in load_resume_corpus(args.corpus):
+        pages = extract_pages_from_pdf(io.BytesIO(pdf_bytes), backend)
+        documents.append((name, pages))
+        documents.append((f"{name} (typeset)", typeset(pages, f"{name.split('-')[0].replace('_', ' ').title()} - Resume")))
+
+    print(f"Backend: {backend}\n")
+    header = f"{'document':<36} {'MB/s':>7} {'chars':>7} {'-chars':>7} {'tokens':>7} {'-tokens':>8} {'hdr/ftr':>8} {'rejoined':>9}"
+    print(header)
+    print("-" * len(header))
+    totals = {"bytes": 0, "seconds": 0.0, "chars": 0, "output_chars": 0, "tokens": 0, "output_tokens": 0}
+    for name, pages in documents:
+        raw = "".join(page + "\n" for page in pages if page)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            text, report = normalize_pages(pages)
+        seconds = (time.perf_counter() - started) / args.repeat
+        size = len(raw.encode("utf-8"))
+        tokens, output_tokens = estimate_tokens(raw), estimate_tokens(text)
+
+        print(
+            f"{name:<36} {size / seconds / 1e6:>7.1f} {len(raw):>7} {1 - len(text) / max(len(raw), 1):>7.1%} {tokens:>7} {1 - output_tokens / max(tokens, 1):>8.1%}"
+            f" {report['furniture_lines_removed']:>8} {report['words_rejoined']:>9}"
+        )
+        for key, value in (("bytes", size), ("seconds", seconds), ("chars", len(raw)), ("output_chars", len(text)), ("tokens", tokens), ("output_tokens", output_tokens)):
+            totals[key] += value
+
+    print(
+        f"\nOverall: {totals['bytes'] / totals['seconds'] / 1e6:.1f} MB/s, characters -{1 - totals['output_chars'] / max(totals['chars'], 1):.1%}, "
+        f"tokens -{1 - totals['output_tokens'] / max(totals['tokens'], 1):.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare the local token estimator with the model's token counter.
+
+Counts every resume and token-sample fixture with the local estimator and, when
+GEMINI_API_KEY is set, with the model's count_tokens endpoint. Prints the error
+per sample and the calibration factor to set as TOKEN_ESTIMATE_FACTOR. Without a
+key it only reports the local estimates.
+
+Usage (from backend/):
+    GEMINI_API_KEY=... python benchmarks/token_calibration.py [--model gemini-3.5-flash]
+"""
+
+import argparse
+import os
+import time
+
+from _corpus import FIXTURES_DIR, RESUME_FIXTURES_DIR
+
+
+def load_samples():
+    """Load (name, text) pairs from the resume and token-sample fixtures."""
+    samples = []
+    for directory in (RESUME_FIXTURES_DIR, os.path.join(FIXTURES_DIR, "token_samples")):
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith(".txt"):
+                with open(os.path.join(directory, filename), encoding="utf-8") as handle:
+                    samples.append((filename, handle.read()))
+    return samples
+
+
+def main() -> None:
+    from app.gemini_config import GEMINI_MODEL
+    from app.token_budget import estimate_tokens
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=GEMINI_MODEL, help="Model whose token counter to calibrate against")
+    args = parser.parse_args()
+
+    samples = load_samples()
+    api_key = os.getenv("GEMINI_API_KEY")
+    model = None
+    if api_key:
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(args.model)
+
+    started = time.perf_counter()
+    estimates = [estimate_tokens(text) for _, text in samples]
+    estimate_us = (time.perf_counter() - started) * 1e6 / len(samples)
+
+    print(f"{'sample':<28} {'chars':>6} {'estimate':>9} {'actual':>7} {'error':>7}")
+    estimated_total = 0
+    actual_total = 0
+    for (name, text), estimate in zip(samples, estimates):
+        actual = model.count_tokens(text).total_tokens if model else None
+        if actual:
+            estimated_total += estimate
+            actual_total += actual
+        error = f"{(estimate - actual) / actual:+.1%}" if actual else "-"
+        print(f"{name:<28} {len(text):>6} {estimate:>9} {actual or '-':>7} {error:>7}")
+
+    print(f"\nLocal estimator: {estimate_us:.1f} us per sample")
+    if actual_total:
+        from app.token_budget import get_calibration_factor
+
+        print(f"Suggested TOKEN_ESTIMATE_FACTOR for {args.model}: {get_calibration_factor() * actual_total / estimated_total:.3f}")
+    else:
+        print("Set GEMINI_API_KEY to compare against the model's token counter.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Measure the peak memory each resume upload costs the API process.
+
+Every upload is replayed in a fresh process against /api/ats-check (with the
+Gemini call replaced by a no-op so only upload handling and extraction are
+measured), after a warm-up request that loads the modules the route imports lazily.
+Each case runs twice: with the current zero-copy handling, and with a "copy" mode that
+reproduces the previous behaviour (BytesIO copy of the PDF, read().decode() of text
+files). Oversized uploads show the Content-Length rejection, which returns 413 before
+the body is read.
+
+The request peak hides the copy: the copied bytes are freed before the later stages
+allocate several times the upload, so both modes peak at the same place. The same
+process then measures the stages on their own: reading the upload (decoding a text
+file, extracting the pages of a PDF), where zero-copy and copy differ; normalizing the
+text; and the local ATS rule check, which allocates the most and sets the request peak.
+
+Usage (from backend/):
+    python benchmarks/upload_memory.py [--json]
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import queue as queue_module
+import resource
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from _corpus import RESUME_FIXTURES_DIR, render_pdf
+
+
+FAKE_API_KEY = "benchmark-key-0000000000000000"
+# Seconds to wait for a measurement before the child process is considered stuck
+MEASURE_TIMEOUT_SECONDS = 120
+
+
+def _build_cases() -> List[Tuple[str, str, bytes]]:
+    """Build (name, filename, payload) upload cases of increasing size."""
+    with open(f"{RESUME_FIXTURES_DIR}/software_engineer.txt", "rb") as handle:
+        resume = handle.read()
+
+    def repeated(size: int) -> bytes:
+        return (resume * (size // len(resume) + 1))[:size]
+
+    return [
+        ("txt-100KB", "resume.txt", repeated(100 * 1024)),
+        ("txt-400KB", "resume.txt", repeated(400 * 1024)),
+        ("txt-1.5MB", "resume.txt", repeated(1536 * 1024)),
+        ("pdf-small", "resume.pdf", render_pdf(resume.decode("utf-8"))),
+        ("pdf-multipage", "resume.pdf", render_pdf(repeated(256 * 1024).decode("utf-8", errors="ignore"))),
+        ("txt-3MB-rejected", "resume.txt", repeated(3 * 1024 * 1024)),
+    ]
+
+
+def _stage_peak_kb(run: Callable[[], Any]) -> Tuple[Any, int]:
+    """Run one stage and return its result with the peak memory it allocated, in KB."""
+    tracemalloc.start()
+    result = run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak // 1024
+
+
+def _measure_stages(environ: Dict, filename: str) -> Dict[str, int]:
+    """Measure reading, normalizing and rule-checking an upload on their own, outside the request."""
+    from werkzeug.wrappers import Request
+
+    from app import resume_analyzer
+    from app.ats_rules import check_resume
+    from app.text_normalizer import normalize_pages
+
+    # The form is parsed as in the route: the file is spooled, in memory below 500 KB
+    file = Request(environ).files["resume"]
+    if filename.endswith(".pdf"):
+        pages, read_kb = _stage_peak_kb(lambda: resume_analyzer.extract_pages_from_pdf(file))
+        (text, _), normalize_kb = _stage_peak_kb(lambda: normalize_pages(pages))
+    else:
+        # read_text_upload() with the normalization left out
+        raw_text, read_kb = _stage_peak_kb(lambda: resume_analyzer.upload_text(file))
+        text, normalize_kb = _stage_peak_kb(lambda: resume_analyzer.normalize_text(raw_text))
+    _, rules_kb = _stage_peak_kb(lambda: check_resume(text))
+    return {"read_peak_kb": read_kb, "normalize_peak_kb": normalize_kb, "rules_peak_kb": rules_kb}
+
+
+def _measure_upload(filename: str, payload: bytes, copy_mode: bool, queue: multiprocessing.Queue) -> None:
+    """Replay one upload in this (fresh) process and report its memory cost."""
+    import logging
+
+    from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+    from app import ats_analyzer, create_app, resume_analyzer, resume_store
+
+    def upload_text(file):
+        with resume_analyzer.upload_buffer(file) as buffer:
+            return str(buffer, "utf-8")
+
+    resume_analyzer.upload_text = upload_text
+
+    logging.disable(logging.INFO)
+
+    # The route imports the analyzer when it is called, so the stub goes on the analyzer module
+    ats_analyzer.analyze_ats_compatibility = lambda resume_content, rule_check=None: {"success": True, "analysis": {"chars": len(resume_content)}}
+    if copy_mode:
+
+        def copied_stream(file):
+            stream = getattr(file, "stream", file)
+            stream.seek(0)
+            return io.BytesIO(stream.read())
+
+        def copied_text(file):
+            file.seek(0)
+            return file.read().decode("utf-8")
+
+        def decoded_copy(file):
+            return resume_analyzer.normalize_resume_text(copied_text(file))
+
+        resume_analyzer.upload_stream = copied_stream
+        resume_analyzer.upload_text = copied_text
+        resume_store.read_text_upload = decoded_copy
+
+    app = create_app()
+    # Warm up with a tiny upload of the same type first, so the modules the route imports on its
+    # first call (the Gemini SDK, the ATS rules, the skill taxonomy, the PDF library) are not
+    # counted against the upload
+    warm_up_file = (io.BytesIO(render_pdf("Warm up")), "warm_up.pdf") if filename.endswith(".pdf") else (io.BytesIO(b"Warm up"), "warm_up.txt")
+    warm_up = EnvironBuilder(path="/api/ats-check", method="POST", headers={"X-API-KEY": FAKE_API_KEY}, data={"resume": warm_up_file})
+    run_wsgi_app(app.wsgi_app, warm_up.get_environ(), buffered=True)
+
+    builder = EnvironBuilder(path="/api/ats-check", method="POST", headers={"X-API-KEY": FAKE_API_KEY}, data={"resume": (io.BytesIO(payload), filename)})
+    environ = builder.get_environ()
+    stage_environ = EnvironBuilder(path="/api/ats-check", method="POST", data={"resume": (io.BytesIO(payload), filename)}).get_environ()
+    del payload
+
+    baseline_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    _, status, _ = run_wsgi_app(app.wsgi_app, environ, buffered=True)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "status": int(status.split()[0]),
+        "python_peak_kb": python_peak // 1024,
+        "rss_growth_kb": max(0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss_kb),
+    }
+    # After the request, so its RSS high-water mark is not moved by the stages
+    if result["status"] == 200:
+        result.update(_measure_stages(stage_environ, filename))
+    queue.put(result)
+
+
+def run_benchmark() -> List[Dict]:
+    """Measure every upload case in zero-copy and copy modes."""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for name, filename, payload in _build_cases():
+        row = {"case": name, "upload_kb": len(payload) // 1024}
+        for mode, copy_mode in (("zero_copy", False), ("copy", True)):
+            queue = context.Queue()
+            process = context.Process(target=_measure_upload, args=(filename, payload, copy_mode, queue))
+            process.start()
+            try:
+                row[mode] = queue.get(timeout=MEASURE_TIMEOUT_SECONDS)
+            except queue_module.Empty:
+                process.terminate()
+                process.join()
+                raise RuntimeError(f"{name} ({mode}) produced no measurement within {MEASURE_TIMEOUT_SECONDS}s (exit code {process.exitcode})") from None
+            process.join()
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark()
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    header = (
+        f"{'case':<18} {'upload KB':>9} {'status':>6} {'RSS +KB':>8} {'py peak KB':>10} {'copy RSS +KB':>12} {'copy py peak KB':>15}"
+        f"   {'read KB':>7} {'copy read KB':>12} {'normalize KB':>12} {'rules KB':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        zero_copy, copy = row["zero_copy"], row["copy"]
+        stages = f"   {zero_copy['read_peak_kb']:>7} {copy['read_peak_kb']:>12} {zero_copy['normalize_peak_kb']:>12} {zero_copy['rules_peak_kb']:>8}" if "read_peak_kb" in zero_copy else ""
+        print(
+            f"{row['case']:<18} {row['upload_kb']:>9} {zero_copy['status']:>6} {zero_copy['rss_growth_kb']:>8} {zero_copy['python_peak_kb']:>10} "
+            f"{copy['rss_growth_kb']:>12} {copy['python_peak_kb']:>15}{stages}"
+        )
+
+
+if __name__ == "__main__":
+    main()
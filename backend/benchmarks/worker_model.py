@@ -0,0 +1,172 @@
+"""
+Compare gunicorn worker models: count-based recycling versus preloading with RSS recycling.
+
+For each GUNICORN_RECYCLE_MODE this starts gunicorn with gunicorn_config.py, sends a
+request mix from several client threads, and reports latency percentiles, worker
+restarts, and steady-state memory of the whole server (master and workers): summed
+RSS, and summed PSS, which counts pages shared copy-on-write once.
+
+The mix needs no Gemini API key: resume uploads (PDF extraction, resume store), health
+checks, and ATS optimization requests without a job description, which configure the
+Gemini client (loading the SDK like a real request) and are then rejected before any
+Gemini call. The Gemini round trip itself is the same in both modes and is left out.
+
+Usage (from backend/):
+    python benchmarks/worker_model.py [--modes count,rss] [--requests 300] [--concurrency 4] [--workers 2] [--json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
+
+from _corpus import BACKEND_DIR, RESUME_FIXTURES_DIR, load_resume_corpus
+
+
+# Any well-formed key passes the API key check; the requests sent never reach Gemini
+API_KEY = "benchmark-key-" + "x" * 24
+
+
+def multipart_body(filename: str, content: bytes) -> tuple:
+    """Encode a resume upload as a multipart/form-data body."""
+    boundary = uuid.uuid4().hex
+    head = f'--{boundary}\r\nContent-Disposition: form-data; name="resume"; filename="{filename}"\r\nContent-Type: application/pdf\r\n\r\n'.encode()
+    return head + content + f"\r\n--{boundary}--\r\n".encode(), f"multipart/form-data; boundary={boundary}"
+
+
+def send(base_url: str, index: int, corpus: List[tuple]) -> float:
+    """Send one request of the mix and return its latency in milliseconds."""
+    if index % 4 == 3:
+        request = urllib.request.Request(f"{base_url}/api/health")
+    elif index % 4 == 2:
+        request = urllib.request.Request(f"{base_url}/api/ats-optimize", data=b"{}", headers={"Content-Type": "application/json", "X-API-KEY": API_KEY})
+    else:
+        name, pdf_bytes, _ = corpus[index % len(corpus)]
+        # A unique trailer gives every upload its own content hash, so the resume store keeps growing
+        body, content_type = multipart_body(f"{name}.pdf", pdf_bytes + f"\n% {uuid.uuid4().hex}\n".encode())
+        request = urllib.request.Request(f"{base_url}/api/resumes", data=body, headers={"Content-Type": content_type, "X-API-KEY": API_KEY})
+
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        e.read()
+    return (time.perf_counter() - started) * 1000
+
+
+def server_pids(master_pid: int) -> List[int]:
+    """Return the master pid and the pids of its current workers."""
+    try:
+        with open(f"/proc/{master_pid}/task/{master_pid}/children") as handle:
+            return [master_pid] + [int(pid) for pid in handle.read().split()]
+    except OSError:
+        return [master_pid]
+
+
+def wait_until_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("gunicorn did not become healthy")
+
+
+def run_mode(mode: str, args: argparse.Namespace, corpus: List[tuple], port: int) -> Dict:
+    """Start gunicorn in one recycle mode, drive load through it and collect the results."""
+    from app.memory import memory_breakdown
+
+    env = {**os.environ, "GUNICORN_RECYCLE_MODE": mode, "PORT": str(port), "WEB_CONCURRENCY": str(args.workers), "FLASK_ENV": "production"}
+    server = subprocess.Popen(
+        [shutil.which("gunicorn") or "gunicorn", "app:create_app()", "--config", "gunicorn_config.py", "--access-logfile", "/dev/null"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    samples: List[Dict[str, int]] = []
+    workers_seen: Set[int] = set()
+    done = threading.Event()
+
+    def sample_memory() -> None:
+        while not done.wait(0.25):
+            pids = server_pids(server.pid)
+            workers_seen.update(pids[1:])
+            breakdowns = [memory_breakdown(pid) for pid in pids]
+            samples.append({key: sum(b[key] for b in breakdowns) for key in ("rss", "pss")})
+
+    try:
+        wait_until_healthy(base_url)
+        sampler = threading.Thread(target=sample_memory, daemon=True)
+        sampler.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            latencies = list(executor.map(lambda index: send(base_url, index, corpus), range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        sampler.join()
+    finally:
+        done.set()
+        server.terminate()
+        server.wait(timeout=30)
+
+    # Steady state: the second half of the run, once every worker has warmed up
+    steady = samples[len(samples) // 2 :] or samples
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(quantiles[49], 1),
+        "p95_ms": round(quantiles[94], 1),
+        "p99_ms": round(quantiles[98], 1),
+        "max_ms": round(max(latencies), 1),
+        "workers_started": len(workers_seen),
+        "steady_rss_mb": round(statistics.median(s["rss"] for s in steady) / 2**20, 1) if steady else None,
+        "steady_pss_mb": round(statistics.median(s["pss"] for s in steady) / 2**20, 1) if steady else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="count,rss", help="Comma-separated GUNICORN_RECYCLE_MODE values to compare")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent client threads")
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers (WEB_CONCURRENCY)")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the first server (each mode uses the next one)")
+    parser.add_argument("--corpus", default=RESUME_FIXTURES_DIR, help="Directory of resume fixtures")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        print("Memory figures need /proc; only latencies are meaningful on this platform.")
+
+    corpus = load_resume_corpus(args.corpus)
+    results = [run_mode(mode.strip(), args, corpus, args.port + offset) for offset, mode in enumerate(args.modes.split(","))]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<6} {'rps':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'workers':>8} {'RSS MB':>8} {'PSS MB':>8}")
+    for r in results:
+        print(f"{r['mode']:<6} {r['throughput_rps']:>6} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['max_ms']:>8} {r['workers_started']:>8} {r['steady_rss_mb']:>8} {r['steady_pss_mb']:>8}")
+
+
+if __name__ == "__main__":
+    main()
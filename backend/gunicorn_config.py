@@ -1,9 +1,20 @@
 """
 Gunicorn configuration for production deployment.
+
+Two worker models are available, selected with GUNICORN_RECYCLE_MODE:
+
+  * rss (default): the app and its heavy dependencies are preloaded in the master and
+    frozen out of the garbage collector, so forked workers share those pages
+    copy-on-write. A worker is recycled only when its RSS crosses WORKER_RSS_CEILING_MB.
+  * count: the previous model - no preloading, and every worker is recycled after
+    WORKER_MAX_REQUESTS (default 10) requests.
+
+Compare them with `make bench-workers`.
 """
 
+import gc
+import importlib
 import os
-import multiprocessing
 
 # Bind to PORT if provided by environment (like on Render)
 port = os.getenv("PORT", "8000")
@@ -11,7 +22,7 @@ bind = f"0.0.0.0:{port}"
 
 # Worker configuration - optimize for memory usage on free tier
 # Use single worker to stay within resource limits
-workers = 1
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
 worker_class = "sync"
 
 # Optimize timeouts for Gemini API calls
@@ -27,7 +38,81 @@ loglevel = "info"
 # Reload on code changes - can disable in production
 reload = False  # Set to False for production
 
-# Memory optimization settings 
-max_requests = 10      # Restart workers after handling max_requests to free memory
+# Memory optimization settings
+recycle_mode = os.getenv("GUNICORN_RECYCLE_MODE", "rss").strip().lower()
+if recycle_mode not in ("rss", "count"):
+    recycle_mode = "rss"
+
+if recycle_mode == "count":
+    preload_app = os.getenv("PRELOAD_APP", "false").lower() == "true"
+    max_requests = int(os.getenv("WORKER_MAX_REQUESTS", "10"))  # Restart workers after handling max_requests to free memory
+else:
+    preload_app = os.getenv("PRELOAD_APP", "true").lower() == "true"
+    max_requests = int(os.getenv("WORKER_MAX_REQUESTS", "0"))  # Optional backstop; 0 disables count-based recycling
 max_requests_jitter = 5  # Add randomness to max_requests to avoid all workers restarting at once
-worker_tmp_dir = "/tmp"  # Use /tmp for worker heartbeat to reduce disk I/O
\ No newline at end of file
+worker_tmp_dir = "/tmp"  # Use /tmp for worker heartbeat to reduce disk I/O
+
+# Recycle a worker after the request that pushes its RSS over this ceiling
+worker_rss_ceiling_mb = float(os.getenv("WORKER_RSS_CEILING_MB", "350"))
+
+# Modules the app imports lazily; with preload_app they are imported once in the master instead
+preload_modules = [
+    "google.generativeai",
+    "PyPDF2",
+    "numpy",
+    "app.application_pack",
+    "app.ats_analyzer",
+    "app.cover_letter",
+    "app.email_reply",
+    "app.interview_evaluator",
+    "app.interview_preparer",
+    "app.learning_recommender",
+    "app.match_scorer",
+    "app.motivational_message",
+    "app.resume_analyzer",
+    "app.resume_store",
+]
+
+
+def when_ready(server):
+    """Warm up the preloaded master before workers are forked from it"""
+    if not preload_app:
+        return
+
+    for module in preload_modules:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            server.log.warning(f"Could not preload {module}: {e}")
+
+    # Move everything allocated so far out of the collector's reach: workers then never
+    # write to these objects' GC headers, so the pages stay shared with the master
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Preloaded {len(preload_modules)} modules and froze {gc.get_freeze_count()} objects before forking workers")
+
+
+def post_fork(server, worker):
+    """Warn when a fresh worker already exceeds the ceiling, which would recycle it after every request"""
+    if recycle_mode != "rss" or worker_rss_ceiling_mb <= 0:
+        return
+
+    from app.memory import current_rss_bytes
+
+    rss_mb = current_rss_bytes() / (1024 * 1024)
+    if rss_mb > worker_rss_ceiling_mb * 0.8:
+        server.log.warning(f"Fresh worker RSS is {rss_mb:.0f} MB, close to WORKER_RSS_CEILING_MB={worker_rss_ceiling_mb:.0f}; raise the ceiling")
+
+
+def post_request(worker, req, environ, resp):
+    """Recycle the worker once its memory crosses the ceiling (rss mode)"""
+    if recycle_mode != "rss" or worker_rss_ceiling_mb <= 0:
+        return
+
+    from app.memory import current_rss_bytes
+
+    rss_mb = current_rss_bytes() / (1024 * 1024)
+    if rss_mb > worker_rss_ceiling_mb:
+        worker.log.warning(f"Worker {worker.pid} RSS {rss_mb:.0f} MB exceeds {worker_rss_ceiling_mb:.0f} MB, recycling after this request")
+        # The worker finishes its current request, exits, and the master forks a fresh one
+        worker.alive = False